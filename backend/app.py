@@ -1,67 +1,217 @@
 """
 Main Flask application for The Lazy Coder backend
 """
+import os
+import threading
+
 from flask import Flask
 from flask_cors import CORS
 
 from .config import config
+from .services.admission import AdmissionController
 from .services.session_manager import SessionManager
 from .services.audio_handler import AudioHandler
+from .services.audio_preprocessor import AudioPreprocessor
+from .services.batch_transcription import BatchTranscriber
 from .services.nova3_stt import Nova3STTService
+from .services.stt_providers import create_stt_provider
+from .services.transcription_jobs import TranscriptionJobQueue
+from .services.transcript_cache import TranscriptCache
+from .services.streaming_stt import create_streaming_backend
 from .routes.monitoring import create_monitoring_routes
+from .routes.streaming import create_streaming_routes
 from .routes.health import health_bp
+from .routes.metrics import metrics_bp
+from .services.metrics import METRICS
+
+# Guards starting background threads once per process
+_background_lock = threading.Lock()
 
-def create_app(config_name='default'):
-    """Application factory pattern"""
+def create_app(config_name='default', config_overrides=None, start_background=True):
+    """
+    Application factory pattern
+    
+    Args:
+        config_name: Key into the config mapping
+        config_overrides: Settings applied over the selected config
+        start_background: Start the session reaper and folder watchers now. Pass
+            False when the app is built before forking workers; they then start
+            on each worker's first request (or start_background_services()).
+    """
     app = Flask(__name__)
     
     # Load configuration
     app.config.from_object(config[config_name])
+    if config_overrides:
+        app.config.update(config_overrides)
+    
+    # Bodies over MAX_UPLOAD_BYTES are refused by Werkzeug even without a Content-Length
+    app.config['MAX_CONTENT_LENGTH'] = app.config['MAX_UPLOAD_BYTES'] or None
     
     # Enable CORS
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
     # Initialize services
+    METRICS.enabled = app.config['METRICS_ENABLED']
     session_manager = SessionManager(app.config)
-    audio_handler = AudioHandler()
-    stt_service = Nova3STTService()
+    preprocessor = None
+    if app.config['AUDIO_PREPROCESS'] != 'off':
+        preprocessor = AudioPreprocessor(
+            sample_rate=app.config['AUDIO_SAMPLE_RATE'],
+            silence_threshold_db=app.config['AUDIO_SILENCE_THRESHOLD_DB'],
+            padding_ms=app.config['AUDIO_SILENCE_PADDING_MS'],
+            ffmpeg_path=app.config['FFMPEG_PATH'],
+            max_seconds=app.config['AUDIO_PREPROCESS_MAX_SECONDS'],
+            min_saving=app.config['AUDIO_PREPROCESS_MIN_SAVING']
+        )
+        if not preprocessor.available:
+            print("Warning: numpy is not installed; audio preprocessing is disabled")
+            preprocessor = None
+        elif not preprocessor.ffmpeg:
+            print("Warning: ffmpeg not found; only WAV uploads are preprocessed")
+    audio_handler = AudioHandler(spill_threshold=app.config['AUDIO_SPILL_THRESHOLD'], preprocessor=preprocessor)
+    transcript_cache = None
+    if app.config['TRANSCRIPT_CACHE_ENTRIES'] > 0:
+        transcript_cache = TranscriptCache(
+            max_entries=app.config['TRANSCRIPT_CACHE_ENTRIES'],
+            max_bytes=app.config['TRANSCRIPT_CACHE_MAX_BYTES'],
+            ttl=app.config['TRANSCRIPT_CACHE_TTL'],
+            cache_dir=app.config['TRANSCRIPT_CACHE_DIR'] or None
+        )
+    stt_service = Nova3STTService(
+        monitored_path=app.config['DEFAULT_PROJECT_PATH'] or None,
+        index_cache_dir=app.config['INDEX_CACHE_DIR'],
+        scan_workers=app.config['SCAN_WORKERS'],
+        provider=create_stt_provider(app.config['STT_PROVIDER'], app.config),
+        transcript_cache=transcript_cache,
+        max_projects=app.config['MAX_LOADED_PROJECTS'],
+        max_index_bytes=app.config['MAX_INDEX_BYTES']
+    )
+    stt_service.enable_folder_watch(
+        mode=app.config['FOLDER_WATCH_MODE'],
+        poll_interval=app.config['FOLDER_POLL_INTERVAL'],
+        on_events=session_manager.record_events
+    )
+    
+    def release_project_indexes(ended_sessions):
+        # Drop a project's index once no active session uses it; it is rebuilt on next use.
+        # Checked under the registry lock so a set-context racing this keeps its index.
+        for path in {session.path for session in ended_sessions}:
+            stt_service.mappers.discard_unless(path, lambda key: key in session_manager.active_paths())
+    
+    session_manager.on_sessions_ended = release_project_indexes
+    job_queue = TranscriptionJobQueue(
+        stt_service,
+        audio_handler,
+        max_concurrency=app.config['TRANSCRIBE_MAX_CONCURRENCY'],
+        queue_depth=app.config['TRANSCRIBE_QUEUE_DEPTH'],
+        queue_timeout=app.config['TRANSCRIBE_QUEUE_TIMEOUT'],
+        result_ttl=app.config['TRANSCRIBE_JOB_TTL']
+    )
+    admission = AdmissionController(
+        max_in_flight=app.config['MAX_INFLIGHT_TRANSCRIPTIONS'],
+        max_buffered_bytes=app.config['MAX_BUFFERED_UPLOAD_BYTES'],
+        max_upload_bytes=app.config['MAX_UPLOAD_BYTES']
+    )
+    batch_transcriber = BatchTranscriber(
+        stt_service,
+        audio_handler,
+        max_concurrency=app.config['BATCH_MAX_CONCURRENCY'],
+        max_items=app.config['BATCH_MAX_ITEMS'],
+        manifest_root=app.config['BATCH_MANIFEST_ROOT'] or None
+    )
     
     # Register blueprints
     app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
     
     # Create and register monitoring routes with dependencies
-    monitoring_routes = create_monitoring_routes(session_manager, audio_handler, stt_service)
+    monitoring_routes = create_monitoring_routes(session_manager, audio_handler, stt_service, job_queue,
+                                                 batch_transcriber, admission)
     app.register_blueprint(monitoring_routes)
     
+    # Live transcription WebSocket (skipped when flask-sock is not installed)
+    streaming_backend_name = app.config['STREAMING_STT_BACKEND'] or (
+        'fake' if app.config['STT_PROVIDER'] == 'local' else 'deepgram')
+    streaming_backend = create_streaming_backend(streaming_backend_name, stt_service.provider)
+    streaming_routes = create_streaming_routes(
+        session_manager,
+        stt_service,
+        streaming_backend,
+        idle_timeout=app.config['STREAM_IDLE_TIMEOUT']
+    )
+    if streaming_routes:
+        app.register_blueprint(streaming_routes)
+    
     # Make services available to routes (if needed)
     app.session_manager = session_manager
     app.audio_handler = audio_handler
     app.stt_service = stt_service
+    app.job_queue = job_queue
+    app.batch_transcriber = batch_transcriber
+    app.admission = admission
+    
+    if start_background:
+        start_background_services(app)
+    else:
+        # Threads started in a parent do not survive fork, so each worker starts its own
+        stt_service.mappers.watching = False
+        app.before_request(lambda: start_background_services(app))
     
     return app
 
-def main():
-    """Main entry point"""
-    import os
+def start_background_services(app):
+    """Start the session reaper and folder watchers, and warm up project indexes, once per process"""
+    if getattr(app, 'background_pid', None) == os.getpid():
+        return
+    with _background_lock:
+        if getattr(app, 'background_pid', None) == os.getpid():
+            return
+        app.session_manager.start_reaper()
+        app.stt_service.mappers.start_watching()
+        app.background_pid = os.getpid()
     
+    # Index known projects without holding up startup; ones preloaded before a fork are lookups
+    paths = list(app.config['PRELOAD_PROJECTS'])
+    if app.config['DEFAULT_PROJECT_PATH']:
+        paths.append(app.config['DEFAULT_PROJECT_PATH'])
+    if paths:
+        threading.Thread(target=preload_projects, args=(app, paths), name='index-warm-up', daemon=True).start()
+
+def preload_projects(app, paths):
+    """Build the folder indexes of paths now, e.g. before workers are forked"""
+    for path in paths:
+        try:
+            app.stt_service.ensure_monitored_path(path)
+        except Exception as e:
+            print(f"Warning: Failed to preload folder index for {path}: {e}")
+
+def main():
+    """Development server entry point (see wsgi.py for production)"""
     # Get config from environment
     config_name = os.environ.get('FLASK_ENV', 'default')
     
     # Create app
     app = create_app(config_name)
     
-    print("Starting The Lazy Coder Backend...")
+    print("Starting The Lazy Coder Backend (development server; use gunicorn -c backend/gunicorn.conf.py backend.wsgi:app in production)...")
     print("Available endpoints:")
     print("  POST /api/v1/monitoring/set-context - Set folder context for path replacement")
     print("  GET  /api/v1/monitoring/status - Get session status")
     print("  POST /api/v1/monitoring/stop - End current session")
-    print("  GET  /api/v1/monitoring/sessions - Get all sessions")
+    print("  GET  /api/v1/monitoring/sessions - List sessions (paginated)")
     print("  POST /api/v1/monitoring/transcribe - Transcribe audio with smart path replacement")
+    print("  POST /api/v1/monitoring/transcribe/batch - Transcribe many recordings, streaming NDJSON results")
+    print("  GET  /api/v1/monitoring/transcribe/<job_id> - Poll a transcription job (POST with mode=job)")
+    print("  GET  /api/v1/monitoring/transcribe/<job_id>/events - Stream a transcription job's result (SSE)")
+    print("  WS   /api/v1/monitoring/stream - Live transcription of MediaRecorder chunks")
     print("  GET  /api/v1/monitoring/audio-files - Get saved audio files")
     print("  GET  /api/v1/monitoring/folder-structure - Get current folder structure")
+    print("  GET  /api/v1/monitoring/resolve?q= - Resolve a spoken filename to ranked paths")
     print("  POST /api/v1/monitoring/cleanup-temp - Clean up temporary audio files")
     print("  GET  /api/v1/health - Health check")
     print("  GET  /api/v1/status - Service status")
+    print("  GET  /api/v1/metrics - Prometheus metrics (transcription stage histograms)")
     
     try:
         app.run(
@@ -0,0 +1,147 @@
+"""
+Load test server memory under a burst of uploads, with admission limits on and off
+
+Starts the backend as a subprocess (see load_test), then sends a baseline load and
+a burst of ten times as many concurrent clients, each uploading a large recording.
+The server's RSS (summed over its process tree) is sampled from /proc during each
+phase. With limits on, the burst is refused with 429 + Retry-After instead of being
+buffered, so peak memory should stay near the baseline.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_admission --clients 8 --burst 10 --upload-kb 2048
+"""
+import argparse
+import http.client
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from .load_test import build_project, free_port, start_server
+
+
+def tree_rss_kb(pid: int) -> int:
+    """VmRSS of a process and its descendants (Linux)"""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1])
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                total += tree_rss_kb(int(child))
+    except (OSError, ValueError):
+        pass  # The process exited while sampling
+    return total
+
+
+def upload_body(rng: random.Random, size: int):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"clip.webm\"\r\n"
+            f"Content-Type: audio/webm\r\n\r\n").encode() + rng.randbytes(size) + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def run_phase(port: int, pid: int, clients: int, seconds: float, upload_size: int) -> dict:
+    """Drive /transcribe from concurrent clients while sampling the server's RSS"""
+    statuses, latencies, samples = {}, [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    done = threading.Event()
+    
+    def sampler():
+        while not done.is_set():
+            samples.append(tree_rss_kb(pid))
+            time.sleep(0.05)
+    
+    def client(seed: int):
+        rng = random.Random(seed)
+        body, content_type = upload_body(rng, upload_size)
+        while time.monotonic() < deadline:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            start = time.perf_counter()
+            try:
+                connection.request('POST', '/api/v1/monitoring/transcribe', body=body,
+                                   headers={'Content-Type': content_type})
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+                retry_after = response.getheader('Retry-After')
+            except (OSError, http.client.HTTPException) as e:
+                status, retry_after = type(e).__name__, None
+            finally:
+                connection.close()
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(time.perf_counter() - start)
+            # Refused clients back off as told, like the frontend does
+            time.sleep(float(retry_after) if retry_after else 0)
+    
+    sampling = threading.Thread(target=sampler, daemon=True)
+    sampling.start()
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    done.set()
+    sampling.join()
+    
+    latencies.sort()
+    return {
+        'statuses': statuses,
+        'peak_rss_mb': max(samples, default=0) / 1024,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', default='dev', help="'gunicorn' or 'dev'")
+    parser.add_argument('--clients', type=int, default=8, help='concurrent clients at baseline')
+    parser.add_argument('--burst', type=int, default=10, help='burst multiplier over the baseline clients')
+    parser.add_argument('--seconds', type=float, default=10.0, help='duration per phase')
+    parser.add_argument('--upload-kb', type=int, default=2048, help='size of each upload')
+    parser.add_argument('--max-in-flight', type=int, default=8, help='MAX_INFLIGHT_TRANSCRIPTIONS with limits on')
+    parser.add_argument('--max-buffered-mb', type=int, default=32, help='MAX_BUFFERED_UPLOAD_BYTES with limits on')
+    parser.add_argument('--files', type=int, default=1000, help='files in the synthetic project')
+    parser.add_argument('--stt-latency-ms', type=float, default=200.0, help='latency of the fake STT engine')
+    parser.add_argument('--workers', type=int, default=1, help='WEB_WORKERS for gunicorn')
+    parser.add_argument('--threads', type=int, default=128, help='WEB_THREADS for gunicorn')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    workspace = tempfile.mkdtemp(prefix='admission-')
+    project = os.path.join(workspace, 'project')
+    build_project(project, args.files, random.Random(args.seed))
+    upload_size = args.upload_kb * 1024
+    settings = {
+        'off': {'MAX_INFLIGHT_TRANSCRIPTIONS': '0', 'MAX_BUFFERED_UPLOAD_BYTES': '0'},
+        'on': {'MAX_INFLIGHT_TRANSCRIPTIONS': str(args.max_in_flight),
+               'MAX_BUFFERED_UPLOAD_BYTES': str(args.max_buffered_mb * 1024 * 1024)}
+    }
+    
+    print(f"{'limits':7} {'phase':9} {'clients':>7} {'peak RSS MB':>12} {'p50 ms':>9}  statuses")
+    try:
+        for name, extra_env in settings.items():
+            port = free_port()
+            process = start_server(args.server, port, project, args, args.workers, extra_env)
+            try:
+                for phase, clients in (('baseline', args.clients), ('burst', args.clients * args.burst)):
+                    result = run_phase(port, process.pid, clients, args.seconds, upload_size)
+                    statuses = ', '.join(f"{status}: {count}" for status, count in sorted(result['statuses'].items(), key=str))
+                    print(f"{name:7} {phase:9} {clients:7d} {result['peak_rss_mb']:12.1f} {result['p50_ms']:9.1f}  {statuses}")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
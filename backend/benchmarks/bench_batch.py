@@ -0,0 +1,84 @@
+"""
+Benchmark /transcribe/batch against the same recordings sent one /transcribe at a time
+
+Folder watching is off, as on machines without a watcher, so every single request
+rescans the project while a batch scans it once. The local STT provider adds a
+fixed latency like a remote engine would.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_batch --items 50 --files 10000 --latency-ms 100 --concurrency 4
+"""
+import argparse
+import io
+import json
+import random
+import tempfile
+import time
+
+from ..app import create_app
+from .synthetic import add_ignored_dirs, build_tree
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=50, help='recordings per run')
+    parser.add_argument('--files', type=int, default=10000, help='files in the synthetic project')
+    parser.add_argument('--latency-ms', type=float, default=100.0, help='local STT latency per recording')
+    parser.add_argument('--concurrency', type=int, default=4, help='BATCH_MAX_CONCURRENCY')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.files, rng)
+        add_ignored_dirs(root, args.files, rng)
+        app = create_app('testing', {
+            'STT_PROVIDER': 'local',
+            'LOCAL_STT_LATENCY_MS': args.latency_ms,
+            'TRANSCRIPT_CACHE_ENTRIES': 0,
+            'AUDIO_PREPROCESS': 'off',
+            'INDEX_CACHE_DIR': '',
+            'FOLDER_WATCH_MODE': 'off',
+            'BATCH_MAX_CONCURRENCY': args.concurrency
+        })
+        client = app.test_client()
+        session_id = client.post('/api/v1/monitoring/set-context', json={'projectContext': root}).get_json()['session_id']
+        headers = {'X-Session-ID': session_id}
+        clips = [rng.randbytes(4096) for _ in range(args.items)]
+        
+        start = time.perf_counter()
+        for index, clip in enumerate(clips):
+            response = client.post('/api/v1/monitoring/transcribe', headers=headers,
+                                   data={'audio': (io.BytesIO(clip), f"clip{index}.webm")})
+            assert response.status_code == 200, response.get_data(as_text=True)
+        sequential = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        response = client.post('/api/v1/monitoring/transcribe/batch', headers=headers,
+                               data={'audio': [(io.BytesIO(clip), f"clip{index}.webm") for index, clip in enumerate(clips)]})
+        first_result = None
+        records = []
+        for chunk in response.response:
+            for line in (chunk.decode() if isinstance(chunk, bytes) else chunk).splitlines():
+                if first_result is None:
+                    first_result = time.perf_counter() - start
+                records.append(json.loads(line))
+        batched = time.perf_counter() - start
+        summary = records[-1]
+        
+        app.batch_transcriber.shutdown()
+        app.job_queue.shutdown()
+        app.session_manager.stop_reaper()
+    
+    print(f"items:              {args.items} against {args.files} files (+{args.files} ignored)")
+    print(f"sequential:         {sequential:8.2f} s  ({sequential / args.items * 1000:7.1f} ms per item)")
+    print(f"batch:              {batched:8.2f} s  ({batched / args.items * 1000:7.1f} ms per item, "
+          f"{summary['succeeded']} ok, {summary['failed']} failed)")
+    print(f"first batch result: {first_result * 1000:8.1f} ms")
+    print(f"batch index scan:   {summary['index']['stages_ms']['index']:8.1f} ms "
+          f"({summary['index']['counts'].get('files_scanned', 0)} files listed, once)")
+    print(f"speedup:            {sequential / batched:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark /folder-structure polling: full bodies vs cached, 304 and ?since= diff responses
+
+The first request serializes the whole tree; repeats at the same index version are
+served from the body cache, revalidations get 304, and after a few files change a
+client holding the old version fetches only the diff. Sizes are reported with and
+without gzip.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_folder_structure --files 100000 --requests 20
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from ..app import create_app
+from .suite import summarize
+from .synthetic import build_tree
+
+ENDPOINT = '/api/v1/monitoring/folder-structure'
+
+
+def timed_get(client, url: str, headers: dict, repeats: int):
+    """GET url repeatedly; return the last response and the latency summary"""
+    samples = []
+    response = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        response.get_data()
+        samples.append(time.perf_counter() - start)
+    return response, summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000, help='files in the synthetic project')
+    parser.add_argument('--requests', type=int, default=20, help='requests per measurement')
+    parser.add_argument('--changed', type=int, default=10, help='files created before the diff request')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        build_tree(root, args.files, rng)
+        app = create_app('testing', {
+            'STT_PROVIDER': 'local',
+            'INDEX_CACHE_DIR': '',
+            'FOLDER_WATCH_MODE': 'polling',
+            'FOLDER_POLL_INTERVAL': 3600  # Refreshed explicitly below
+        })
+        client = app.test_client()
+        session_id = client.post('/api/v1/monitoring/set-context', json={'projectContext': root}).get_json()['session_id']
+        headers = {'X-Session-ID': session_id}
+        gzip_headers = dict(headers, **{'Accept-Encoding': 'gzip'})
+        
+        rows = []
+        response, first = timed_get(client, ENDPOINT, headers, 1)
+        rows.append(('first (serialize)', first, len(response.get_data())))
+        etag = response.headers['ETag']
+        version = response.get_json()['version']
+        
+        response, cached = timed_get(client, ENDPOINT, headers, args.requests)
+        rows.append(('cached body', cached, len(response.get_data())))
+        response, gzipped = timed_get(client, ENDPOINT, gzip_headers, args.requests)
+        rows.append(('cached body, gzip', gzipped, len(response.get_data())))
+        response, not_modified = timed_get(client, ENDPOINT, dict(gzip_headers, **{'If-None-Match': etag}), args.requests)
+        rows.append((f"If-None-Match ({response.status_code})", not_modified, len(response.get_data())))
+        
+        mapper = app.stt_service.mappers.peek(root)
+        directories = sorted(mapper.snapshot().directories)[1:]
+        touched = set()
+        for index in range(args.changed):
+            directory = rng.choice(directories)
+            touched.add(directory)
+            open(os.path.join(root, directory, f"added_file_{index}.py"), 'w').close()
+        mapper.refresh_directories(touched)
+        
+        response, diff = timed_get(client, f"{ENDPOINT}?since={version}", gzip_headers, args.requests)
+        rows.append((f"?since= diff ({args.changed} files)", diff, len(response.get_data())))
+        
+        app.job_queue.shutdown()
+        app.session_manager.stop_reaper()
+        app.batch_transcriber.shutdown()
+        app.stt_service.mappers.close()
+    
+    print(f"{'request':28} {'p50 ms':>9} {'p95 ms':>9} {'bytes':>11}")
+    for name, stats, size in rows:
+        print(f"{name:28} {stats['p50_ms']:9.2f} {stats['p95_ms']:9.2f} {size:11d}")
+
+
+if __name__ == '__main__':
+    main()
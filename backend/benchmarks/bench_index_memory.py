@@ -0,0 +1,101 @@
+"""
+Benchmark folder index memory: the legacy filename -> path dict vs the compact index
+
+Each structure is built from the same directory listings under tracemalloc, so the
+figures are heap bytes it holds once built. The legacy dict is rebuilt here the way
+FilePathMapper used to build file_map. The lookup structures built lazily on top
+of the index are measured too, along with the mapper's own memory estimate.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_index_memory --sizes 10000,100000 --depth 3
+"""
+import argparse
+import gc
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from typing import Dict
+
+from ..services.compact_index import CompactFileIndex
+from ..services.file_path_mapper import FilePathMapper
+from ..services.index_cache import DirectoryListing
+from .synthetic import build_tree
+
+
+def legacy_file_map(directories: Dict[str, DirectoryListing]) -> Dict[str, str]:
+    """Filename and underscore alias -> full path string, as file_map used to be built"""
+    file_map: Dict[str, str] = {}
+    stack = ['']
+    while stack:
+        rel_dir = stack.pop()
+        listing = directories.get(rel_dir)
+        if listing is None:
+            continue
+        for file in listing[1]:
+            clean_path = f"{rel_dir}/{file}" if rel_dir else file
+            file_map[file] = clean_path
+            spoken_name = file.replace('_', ' ')
+            if (spoken_name != file and spoken_name not in file_map and
+                    not file.startswith('__') and len(spoken_name.strip()) > 0):
+                file_map[spoken_name] = clean_path
+        stack.extend(f"{rel_dir}/{name}" if rel_dir else name for name in reversed(listing[2]))
+    return file_map
+
+
+def measure(build):
+    """Build something under tracemalloc; return it with the heap bytes it holds"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000', help='comma-separated file counts')
+    parser.add_argument('--depth', type=int, default=3, help='folders the synthetic project is nested under')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f"{'files':>8} {'structure':24} {'MB':>9} {'bytes/file':>11}")
+    for size in [int(value) for value in args.sizes.split(',')]:
+        rng = random.Random(args.seed)
+        with tempfile.TemporaryDirectory() as root:
+            # Real projects keep their sources a few folders down (src/app/...)
+            build_tree(os.path.join(root, *[f"level{depth}" for depth in range(args.depth)]), size, rng)
+            mapper, scanned = measure(lambda: FilePathMapper(root))
+        
+        snapshot = mapper.snapshot()
+        file_map, legacy = measure(lambda: legacy_file_map(snapshot.directories))
+        _, compact = measure(lambda: CompactFileIndex.build(snapshot.directories))
+        
+        # Timed before the lookup structures exist, whose objects would slow the collector
+        start = time.perf_counter()
+        mapper.get_folder_structure_summary(snapshot)
+        summary_ms = (time.perf_counter() - start) * 1000
+        
+        _, matcher = measure(lambda: snapshot.matcher)
+        _, fuzzy = measure(lambda: snapshot.fuzzy_index)
+        
+        rows = [
+            ('mapper after scan', scanned),
+            ('legacy file_map dict', legacy),
+            ('compact index', compact),
+            ('filename matcher', matcher),
+            ('fuzzy index', fuzzy),
+            ('estimate (all built)', mapper.memory_estimate())
+        ]
+        for name, bytes_held in rows:
+            print(f"{size:8d} {name:24} {bytes_held / 1e6:9.2f} {bytes_held / size:11.1f}")
+        print(f"{size:8d} {'compact vs legacy':24} {legacy / max(compact, 1):8.1f}x smaller")
+        print(f"{size:8d} {'folder summary':24} {summary_ms:8.1f} ms")
+        del file_map, mapper, snapshot
+
+
+if __name__ == '__main__':
+    main()
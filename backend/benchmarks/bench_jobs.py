@@ -0,0 +1,80 @@
+"""
+Benchmark synchronous /transcribe against job mode using the local STT provider
+
+The local provider sleeps for a fixed latency instead of calling Deepgram, so this
+shows how long request threads are held and how the worker pool drains a burst.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_jobs --requests 40 --latency 0.25
+"""
+import argparse
+import io
+import threading
+import time
+
+from ..app import create_app
+from ..config import Config
+
+
+def _post_all(client_factory, count: int, mode: str) -> list:
+    """POST count uploads from count threads at once; return (status, seconds, body) per request"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+    
+    def post(index: int):
+        client = client_factory()
+        barrier.wait()
+        start = time.perf_counter()
+        response = client.post(f'/api/v1/monitoring/transcribe?mode={mode}',
+                               data={'audio': (io.BytesIO(b'\0' * 4096), 'recording.webm')})
+        results[index] = (response.status_code, time.perf_counter() - start, response.get_json())
+    
+    threads = [threading.Thread(target=post, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=40, help='concurrent uploads')
+    parser.add_argument('--latency', type=float, default=0.25, help='local STT latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=Config.TRANSCRIBE_MAX_CONCURRENCY)
+    parser.add_argument('--queue-depth', type=int, default=Config.TRANSCRIBE_QUEUE_DEPTH)
+    args = parser.parse_args()
+    
+    app = create_app('testing', {
+        'STT_PROVIDER': 'local',
+        'LOCAL_STT_LATENCY_MS': args.latency * 1000,
+        'TRANSCRIBE_MAX_CONCURRENCY': args.concurrency,
+        'TRANSCRIBE_QUEUE_DEPTH': args.queue_depth,
+        'INDEX_CACHE_DIR': ''
+    })
+    
+    sync = _post_all(app.test_client, args.requests, 'sync')
+    print(f"sync:      request thread held {max(seconds for _, seconds, _ in sync) * 1000:8.1f} ms (max), "
+          f"{sum(1 for status, _, _ in sync if status == 200)}/{args.requests} ok")
+    
+    start = time.perf_counter()
+    submitted = _post_all(app.test_client, args.requests, 'job')
+    accepted = [body['job_id'] for status, _, body in submitted if status == 202]
+    rejected = sum(1 for status, _, _ in submitted if status == 503)
+    print(f"job mode:  request thread held {max(seconds for _, seconds, _ in submitted) * 1000:8.1f} ms (max), "
+          f"{len(accepted)} accepted, {rejected} rejected with 503")
+    
+    client = app.test_client()
+    for job_id in accepted:
+        while client.get(f'/api/v1/monitoring/transcribe/{job_id}').get_json()['status'] not in ('succeeded', 'failed'):
+            time.sleep(0.01)
+    drained = time.perf_counter() - start
+    
+    timings = [client.get(f'/api/v1/monitoring/transcribe/{job_id}').get_json()['timings'] for job_id in accepted]
+    print(f"job mode:  {len(accepted)} jobs drained in {drained:.2f}s with {args.concurrency} workers "
+          f"(max queue wait {max(timing['queue_ms'] for timing in timings):.0f} ms)")
+    app.job_queue.shutdown(wait=True)
+
+
+if __name__ == '__main__':
+    main()
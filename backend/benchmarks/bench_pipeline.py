@@ -0,0 +1,90 @@
+"""
+Benchmark /transcribe throughput offline: route, mapper and session stack with the local STT provider
+
+Transcript fixtures mentioning files in a synthetic tree are replayed by the local
+provider, so no network or API key is needed and results are repeatable.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_pipeline --files 10000 --threads 8 --requests 50
+"""
+import argparse
+import io
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from ..app import create_app
+from .synthetic import build_tree, make_transcripts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=10000, help='number of files in the synthetic tree')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--requests', type=int, default=50, help='requests per client')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='local STT latency per request')
+    parser.add_argument('--fixtures', type=int, default=50, help='distinct transcripts replayed')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as fixtures_dir:
+        filenames = build_tree(root, args.files, rng)
+        for index, text in enumerate(make_transcripts(filenames, args.fixtures, rng)):
+            with open(os.path.join(fixtures_dir, f"fixture{index:04d}.txt"), 'w', encoding='utf-8') as file:
+                file.write(text)
+        
+        app = create_app('testing', {
+            'STT_PROVIDER': 'local',
+            'LOCAL_STT_FIXTURES_DIR': fixtures_dir,
+            'LOCAL_STT_LATENCY_MS': args.latency_ms,
+            'INDEX_CACHE_DIR': ''
+        })
+        client = app.test_client()
+        
+        start = time.perf_counter()
+        client.post('/api/v1/monitoring/set-context', json={'projectContext': root})
+        client.post('/api/v1/monitoring/transcribe', data={'audio': (io.BytesIO(b'warm-up'), 'recording.webm')})
+        warm_up = time.perf_counter() - start
+        
+        latencies = [[] for _ in range(args.threads)]
+        failures = [0] * args.threads
+        barrier = threading.Barrier(args.threads)
+        
+        def run(worker: int):
+            worker_client = app.test_client()
+            barrier.wait()
+            for index in range(args.requests):
+                audio = f"worker {worker} request {index}".encode()  # distinct hash -> varied fixture
+                request_start = time.perf_counter()
+                response = worker_client.post('/api/v1/monitoring/transcribe',
+                                              data={'audio': (io.BytesIO(audio), 'recording.webm')})
+                latencies[worker].append(time.perf_counter() - request_start)
+                if response.status_code != 200:
+                    failures[worker] += 1
+        
+        threads = [threading.Thread(target=run, args=(worker,)) for worker in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        app.job_queue.shutdown()
+    
+    samples = sorted(latency for worker in latencies for latency in worker)
+    quantiles = statistics.quantiles(samples, n=100)
+    print(f"files tracked:   {args.files}")
+    print(f"scan + warm-up:  {warm_up * 1000:10.1f} ms")
+    print(f"requests:        {len(samples)} ({sum(failures)} failed) from {args.threads} threads")
+    print(f"throughput:      {len(samples) / elapsed:10.1f} req/s")
+    print(f"latency p50:     {quantiles[49] * 1000:10.2f} ms")
+    print(f"latency p95:     {quantiles[94] * 1000:10.2f} ms")
+    print(f"latency p99:     {quantiles[98] * 1000:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark audio preprocessing on synthetic recordings
+
+Each clip is 48 kHz stereo WAV: a low noise floor, a speech-like middle (syllable-rate
+bursts of voiced harmonics) and silence before and after, like a push-to-talk
+recording. Reports bytes and seconds sent upstream before and after preprocessing.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_preprocess --clips 20 --speech 4 --silence 1.5
+"""
+import argparse
+import io
+import random
+import sys
+import time
+import wave
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from ..services.audio_preprocessor import AudioPreprocessor
+
+
+def synthetic_clip(rng: random.Random, speech: float, lead: float, tail: float,
+                   rate: int = 48000, channels: int = 2) -> bytes:
+    """Build one WAV recording with silence around a speech-like section"""
+    noise = np.random.default_rng(rng.randrange(2 ** 32))
+    total = int((lead + speech + tail) * rate)
+    signal = noise.normal(0, 10 ** (-60 / 20), total)  # -60 dBFS room noise
+    
+    start = int(lead * rate)
+    t = np.arange(int(speech * rate)) / rate
+    pitch = rng.uniform(100, 220)
+    voiced = sum(np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in range(1, 6))
+    envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3, 5) * t), 0, None)  # ~4 syllables a second
+    signal[start:start + len(t)] += 0.3 * voiced * envelope
+    
+    pcm = (np.clip(signal, -1, 1) * 32767).astype('<i2')
+    interleaved = np.repeat(pcm, channels)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(interleaved.tobytes())
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clips', type=int, default=20)
+    parser.add_argument('--speech', type=float, default=4.0, help='seconds of speech per clip')
+    parser.add_argument('--silence', type=float, default=1.5, help='mean seconds of silence before and after')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    if np is None:
+        sys.exit("numpy is required for audio preprocessing: pip install numpy")
+    
+    rng = random.Random(args.seed)
+    clips = [synthetic_clip(rng, args.speech, rng.uniform(0.5, 2) * args.silence, rng.uniform(0.5, 2) * args.silence)
+             for _ in range(args.clips)]
+    preprocessor = AudioPreprocessor()
+    
+    results, elapsed = [], []
+    for clip in clips:
+        start = time.perf_counter()
+        results.append(preprocessor.process(clip))
+        elapsed.append(time.perf_counter() - start)
+    
+    original_bytes = sum(result.original_bytes for result in results)
+    processed_bytes = sum(result.processed_bytes for result in results)
+    original_seconds = sum(result.original_duration or 0 for result in results)
+    processed_seconds = sum(result.processed_duration or 0 for result in results)
+    print(f"clips:             {len(results)} ({sum(result.applied for result in results)} preprocessed, "
+          f"output {results[0].format}, ffmpeg {'found' if preprocessor.ffmpeg else 'not found'})")
+    print(f"bytes upstream:    {original_bytes / 1e6:8.2f} MB -> {processed_bytes / 1e6:8.2f} MB "
+          f"({processed_bytes / original_bytes:.1%})")
+    print(f"seconds billed:    {original_seconds:8.1f} s  -> {processed_seconds:8.1f} s  "
+          f"({processed_seconds / original_seconds:.1%}; speech is {args.speech * len(results):.1f} s)")
+    print(f"preprocess time:   {sum(elapsed) / len(elapsed) * 1000:8.2f} ms per clip (max {max(elapsed) * 1000:.2f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark FilePathMapper.replace_filenames_in_text against the legacy per-filename regex loop
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_replace --files 40000
+"""
+import argparse
+import random
+import re
+import tempfile
+import time
+from typing import Dict
+
+from ..services.file_path_mapper import FilePathMapper
+from .synthetic import build_tree, make_transcripts_with_mentions
+
+
+def legacy_replace(file_map: Dict[str, str], text: str) -> str:
+    """The original implementation: one re.search/re.sub per extension and filename"""
+    result_text = text
+    extensions = set()
+    for filename in file_map.keys():
+        if '.' in filename:
+            extensions.add(filename.split('.')[-1])
+    
+    for ext in extensions:
+        spoken_ext = ' '.join(ext)
+        pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+' + spoken_ext.replace(' ', r'\s+') + r'\b'
+        result_text = re.sub(pattern, r'\1.' + ext, result_text, flags=re.IGNORECASE)
+        pattern = r'\b(\w+)\s+dot\s+' + spoken_ext.replace(' ', r'\s+') + r'\b'
+        result_text = re.sub(pattern, r'\1.' + ext, result_text, flags=re.IGNORECASE)
+        if ext == 'json':
+            pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+j\s+son\b'
+            result_text = re.sub(pattern, r'\1.' + ext, result_text, flags=re.IGNORECASE)
+            pattern = r'\b(\w+)\s+dot\s+j\s+son\b'
+            result_text = re.sub(pattern, r'\1.' + ext, result_text, flags=re.IGNORECASE)
+    
+    for filename in sorted(file_map.keys(), key=len, reverse=True):
+        pattern = r'\b' + re.escape(filename) + r'\b'
+        if re.search(pattern, result_text, re.IGNORECASE):
+            result_text = re.sub(pattern, f"@{file_map[filename]}", result_text, flags=re.IGNORECASE)
+    
+    return result_text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=5000, help='number of files in the synthetic tree')
+    parser.add_argument('--transcripts', type=int, default=20, help='number of transcripts to replace')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as root:
+        filenames = build_tree(root, args.files, rng)
+        mapper = FilePathMapper(root)
+        generated = make_transcripts_with_mentions(filenames, args.transcripts, rng)
+        transcripts = [text for text, _ in generated]
+        mentions = sum(count for _, count in generated)
+        
+        file_map = mapper.file_map
+        start = time.perf_counter()
+        legacy = [legacy_replace(file_map, text) for text in transcripts]
+        legacy_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        mapper.replace_filenames_in_text('')  # build the matcher once per scan
+        build_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        current = [mapper.replace_filenames_in_text(text) for text in transcripts]
+        current_time = time.perf_counter() - start
+    
+    # Outputs differ wherever the matcher resolves a mention the legacy loop missed
+    # (camelCase, whole-word or misheard names, "dot t s x" cut short to ".ts x")
+    mismatches = sum(1 for old, new in zip(legacy, current) if old != new)
+    print(f"files tracked:      {len(file_map)}")
+    print(f"transcripts:        {len(transcripts)}")
+    print(f"legacy loop:        {legacy_time * 1000 / len(transcripts):10.3f} ms/transcript")
+    print(f"matcher build:      {build_time * 1000:10.3f} ms (once per scan)")
+    print(f"single-pass match:  {current_time * 1000 / len(transcripts):10.3f} ms/transcript")
+    print(f"speedup:            {legacy_time / max(current_time, 1e-9):10.1f}x")
+    print(f"differing outputs:  {mismatches}")
+    print(f"mentions resolved:  legacy {sum(text.count('@') for text in legacy)}/{mentions}, "
+          f"matcher {sum(text.count('@') for text in current)}/{mentions}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark /sessions as the number of sessions created grows
+
+Creates and ends sessions in bulk (as weeks of uptime would), then times one
+/sessions page. With a bounded history and cursor pagination the response size
+and latency stay flat however many sessions were ever created.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_sessions --rounds 5 --per-round 20000
+"""
+import argparse
+import time
+
+from ..config import Config
+from ..models.file_event import FileEvent
+from ..services.session_manager import SessionManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--per-round', type=int, default=20000, help='sessions created and ended per round')
+    parser.add_argument('--events', type=int, default=50, help='file events recorded per session')
+    parser.add_argument('--history', type=int, default=Config.SESSION_HISTORY_LIMIT)
+    parser.add_argument('--limit', type=int, default=50, help='page size')
+    args = parser.parse_args()
+    
+    config = {'MAX_EVENTS_STORED': Config.MAX_EVENTS_STORED, 'MONITORING_TIMEOUT': 0, 'SESSION_HISTORY_LIMIT': args.history}
+    manager = SessionManager(config)
+    event = FileEvent(event_type='created', path='/project/src/app.py')
+    
+    print(f"{'created':>10} {'retained':>9} {'page ms':>8} {'page KB':>8}")
+    created = 0
+    for _ in range(args.rounds):
+        for _ in range(args.per_round):
+            session = manager.create_session('/project')
+            for _ in range(args.events):
+                session.record_event(event)
+            manager.end_session(session.session_id)
+        created += args.per_round
+        
+        start = time.perf_counter()
+        page, _ = manager.list_sessions(args.limit)
+        body = [session.to_dict() for session in page]
+        elapsed = time.perf_counter() - start
+        size = len(str(body))
+        print(f"{created:10d} {len(manager.get_all_sessions()):9d} {elapsed * 1000:8.2f} {size / 1024:8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark peak RSS and time per upload: legacy temp-file round trip vs in-memory handoff
+
+Each measurement runs in a fresh process whose peak RSS is reset (Linux
+/proc/self/clear_refs) right before the request, so it reflects that request alone.
+The STT client is simulated by what it does with the payload: the legacy path read
+the temp file back into one buffer, the new path sends bytes as-is or streams a
+spilled file in chunks.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_upload_memory --sizes 1,4,32
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+
+from werkzeug.datastructures import FileStorage
+
+from ..services.audio_handler import DEFAULT_SPILL_THRESHOLD, AudioHandler
+
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _legacy_request(handler: AudioHandler, upload: FileStorage) -> int:
+    """process_uploaded_file -> transcribe_file reading the file back -> cleanup"""
+    temp_path, _ = handler.process_uploaded_file(upload)
+    try:
+        with open(temp_path, 'rb') as file:
+            buffer_data = file.read()
+        return len(buffer_data)
+    finally:
+        handler.cleanup_temp_file(temp_path)
+
+
+def _in_memory_request(handler: AudioHandler, upload: FileStorage) -> int:
+    """receive_upload -> bytes handed to the client, or a spilled file streamed"""
+    audio = handler.receive_upload(upload)
+    try:
+        if audio.in_memory:
+            return len(audio.data)
+        sent = 0
+        with open(audio.path, 'rb') as file:
+            while True:
+                chunk = file.read(_STREAM_CHUNK_SIZE)
+                if not chunk:
+                    return sent
+                sent += len(chunk)
+    finally:
+        handler.release_upload(audio)
+
+
+def _reset_peak_rss():
+    """Reset VmHWM so the next peak reading covers only what follows (Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+    except OSError:
+        pass  # ru_maxrss then includes the process start-up peak
+
+
+def _peak_rss_kb() -> int:
+    """Peak resident set size of this process in KiB"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _measure(mode: str, source_path: str, spill_threshold: int, results):
+    """Run one request in this (fresh) process and report its RSS growth"""
+    handler = AudioHandler(spill_threshold=spill_threshold)
+    request = _legacy_request if mode == 'legacy' else _in_memory_request
+    
+    with open(source_path, 'rb') as stream:
+        # Werkzeug spools multipart uploads this large to a temp file, so read from disk
+        upload = FileStorage(stream=stream, filename='recording.webm')
+        _reset_peak_rss()
+        baseline_kb = _peak_rss_kb()
+        start = time.perf_counter()
+        request(handler, upload)
+        elapsed = time.perf_counter() - start
+        peak_kb = _peak_rss_kb()
+    
+    results.put((peak_kb - baseline_kb, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1,4,32', help='comma-separated upload sizes in MiB')
+    parser.add_argument('--spill-threshold', type=int, default=DEFAULT_SPILL_THRESHOLD,
+                        help='bytes above which uploads are spilled to disk')
+    args = parser.parse_args()
+    
+    context = multiprocessing.get_context('spawn')
+    print(f"spill threshold: {args.spill_threshold / 2 ** 20:.1f} MiB")
+    print(f"{'upload':>10}  {'legacy RSS':>12}  {'new RSS':>10}  {'legacy ms':>10}  {'new ms':>8}")
+    
+    for size_mib in (float(size) for size in args.sizes.split(',')):
+        with tempfile.NamedTemporaryFile(suffix='.webm') as source:
+            remaining = int(size_mib * 2 ** 20)
+            while remaining > 0:
+                source.write(os.urandom(min(remaining, 2 ** 20)))
+                remaining -= 2 ** 20
+            source.flush()
+            
+            row = {}
+            for mode in ('legacy', 'in-memory'):
+                results = context.Queue()
+                process = context.Process(target=_measure,
+                                          args=(mode, source.name, args.spill_threshold, results))
+                process.start()
+                row[mode] = results.get()
+                process.join()
+        
+        (legacy_kb, legacy_s), (new_kb, new_s) = row['legacy'], row['in-memory']
+        print(f"{size_mib:>7.1f} MiB  {legacy_kb / 1024:>8.1f} MiB  {new_kb / 1024:>6.1f} MiB  "
+              f"{legacy_s * 1000:>10.2f}  {new_s * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark the upstream STT client against a local stub of Deepgram's /v1/listen
+
+The stub answers over keep-alive HTTP/1.1 with a base latency, a slow tail and a
+share of 503s, so pooling, retries and hedging can be compared without network
+access or an API key.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.bench_upstream --requests 400 --threads 8 --slow-rate 0.05 --error-rate 0.05
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..services.stt_providers import DeepgramProvider
+from ..services.upstream_http import UpstreamPolicy
+
+STUB_RESPONSE = json.dumps({
+    'results': {'channels': [{'alternatives': [{'transcript': 'open the config dot py file', 'confidence': 0.98}]}]}
+}).encode()
+
+
+def start_stub(latency: float, slow_latency: float, slow_rate: float, error_rate: float, seed: int):
+    """Serve a fake /v1/listen on a free local port; returns the server"""
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+        
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            with rng_lock:
+                roll = rng.random()
+            if roll < error_rate:
+                self._reply(503, b'{"err_msg": "stub overloaded"}')
+                return
+            time.sleep(slow_latency if roll < error_rate + slow_rate else latency)
+            self._reply(200, STUB_RESPONSE)
+        
+        def _reply(self, status: int, body: bytes):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, *args):
+            pass
+    
+    class StubServer(ThreadingHTTPServer):
+        daemon_threads = True
+        
+        def handle_error(self, request, client_address):
+            pass  # Cancelled hedges and retries hang up mid-response; that is expected here
+    
+    server = StubServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_scenario(base_url: str, policy: UpstreamPolicy, pool_size: int, requests: int, threads: int) -> dict:
+    provider = DeepgramProvider(api_key='stub', base_url=base_url, policy=policy, pool_size=pool_size)
+    latencies, failures = [], []
+    lock = threading.Lock()
+    per_thread = requests // threads
+    
+    # Warm the adaptive hedge threshold so every scenario is measured in steady state
+    for _ in range(25):
+        try:
+            provider.transcribe(b'\0' * 2048)
+        except Exception:
+            pass
+    
+    def worker():
+        for _ in range(per_thread):
+            start = time.perf_counter()
+            try:
+                provider.transcribe(b'\0' * 32 * 1024)
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+            except Exception as e:
+                with lock:
+                    failures.append(str(e))
+    
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stats = provider.upstream.get_stats()
+    provider.close()
+    
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'ok': len(latencies),
+        'failed': len(failures),
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p95_ms': quantiles[94] * 1000,
+        'p99_ms': quantiles[98] * 1000,
+        'connections_opened': stats['connections']['opened'],
+        'retries': stats['retries'],
+        'hedges': stats['hedges'],
+        'hedge_wins': stats['hedge_wins']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='stub latency for most requests')
+    parser.add_argument('--slow-ms', type=float, default=400.0, help='stub latency for the slow tail')
+    parser.add_argument('--slow-rate', type=float, default=0.05, help='share of slow responses')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='share of 503 responses')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    server = start_stub(args.latency_ms / 1000, args.slow_ms / 1000, args.slow_rate, args.error_rate, args.seed)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    
+    scenarios = {
+        'no pool, no retries': (UpstreamPolicy(max_retries=0), 0),
+        'pooled + retries': (UpstreamPolicy(backoff_base=0.02), args.threads),
+        'pooled + retries + p95 hedge': (UpstreamPolicy(backoff_base=0.02, hedge_adaptive=True), args.threads),
+    }
+    print(f"{'scenario':30} {'ok':>5} {'fail':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'conns':>6} {'retry':>6} {'hedge':>6} {'wins':>5}")
+    for name, (policy, pool_size) in scenarios.items():
+        result = run_scenario(base_url, policy, pool_size, args.requests, args.threads)
+        print(f"{name:30} {result['ok']:5d} {result['failed']:5d} {result['throughput']:8.1f} "
+              f"{result['p50_ms']:8.1f} {result['p95_ms']:8.1f} {result['p99_ms']:8.1f} "
+              f"{result['connections_opened']:6d} {result['retries']:6d} {result['hedges']:6d} {result['hedge_wins']:5d}")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
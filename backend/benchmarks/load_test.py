@@ -0,0 +1,189 @@
+"""
+Load test the HTTP server: requests/sec and p50/p99 for /transcribe and /folder-structure
+
+Starts the backend as a subprocess with the local (fake) STT provider, which adds
+a fixed latency like a remote engine would, against a synthetic project, then
+drives each endpoint from concurrent keep-alive clients. Runs the gunicorn
+production server (once per worker count) and the Flask development server by
+default for comparison.
+
+Sessions live in the worker that created them, so with several workers a session
+ID would be unknown to most of them. Requests therefore carry no session and use
+DEFAULT_PROJECT_PATH, which every worker indexes on its own.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.load_test --servers gunicorn,dev --workers 1,4 --clients 32 --seconds 10
+"""
+import argparse
+import http.client
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def build_project(root: str, files: int, rng: random.Random):
+    """Create a synthetic project tree of empty source files"""
+    for index in range(files):
+        folder = os.path.join(root, 'src', f"pkg_{rng.randrange(max(1, files // 50))}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"module_{index}.py"), 'w'):
+            pass
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind: str, port: int, project: str, args, workers: int = 1,
+                 extra_env: dict = None) -> subprocess.Popen:
+    """Start the backend and wait until /health answers (extra_env overrides its settings)"""
+    env = dict(os.environ,
+               FLASK_ENV='production',
+               HOST='127.0.0.1',
+               PORT=str(port),
+               STT_PROVIDER='local',
+               LOCAL_STT_TRANSCRIPT='open module 7 dot py and module_42.py',
+               LOCAL_STT_LATENCY_MS=str(args.stt_latency_ms),
+               TRANSCRIPT_CACHE_ENTRIES='0',
+               AUDIO_PREPROCESS='off',
+               INDEX_CACHE_DIR='',
+               PRELOAD_PROJECTS=project,
+               DEFAULT_PROJECT_PATH=project,
+               WEB_WORKERS=str(workers),
+               WEB_THREADS=str(args.threads))
+    env.update(extra_env or {})
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'backend/gunicorn.conf.py', 'backend.wsgi:app',
+                   '--access-logfile', '/dev/null']
+    else:
+        command = [sys.executable, '-m', 'backend.app']
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            sys.exit(f"{kind} server exited with status {process.returncode}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/api/v1/health')
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    sys.exit(f"{kind} server did not start")
+
+
+def multipart_audio(rng: random.Random):
+    """A multipart body with random audio bytes, so no request hits a cache"""
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"clip.webm\"\r\n"
+            f"Content-Type: audio/webm\r\n\r\n").encode() + rng.randbytes(16 * 1024) + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def run_load(port: int, method: str, path: str, headers: dict, clients: int, seconds: float, upload: bool) -> dict:
+    """Drive one endpoint from concurrent keep-alive clients for a fixed time"""
+    latencies, errors = [], []
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+    
+    def client(seed: int):
+        rng = random.Random(seed)
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        local, failed = [], []
+        while time.monotonic() < deadline:
+            request_headers = dict(headers)
+            body = None
+            if upload:
+                body, request_headers['Content-Type'] = multipart_audio(rng)
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=request_headers)
+                response = connection.getresponse()
+                response.read()
+                if response.status == 200:
+                    local.append(time.perf_counter() - start)
+                else:
+                    failed.append(response.status)
+            except (OSError, http.client.HTTPException) as e:
+                failed.append(type(e).__name__)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors.extend(failed)
+    
+    threads = [threading.Thread(target=client, args=(seed,)) for seed in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': quantiles[49] * 1000,
+        'p99_ms': quantiles[98] * 1000
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--servers', default='gunicorn,dev', help="comma-separated: 'gunicorn', 'dev'")
+    parser.add_argument('--clients', type=int, default=32, help='concurrent keep-alive clients')
+    parser.add_argument('--seconds', type=float, default=10.0, help='duration per endpoint')
+    parser.add_argument('--files', type=int, default=5000, help='files in the synthetic project')
+    parser.add_argument('--stt-latency-ms', type=float, default=100.0, help='latency of the fake STT engine')
+    parser.add_argument('--workers', default='1,4', help='comma-separated WEB_WORKERS counts for gunicorn')
+    parser.add_argument('--threads', type=int, default=32, help='WEB_THREADS for gunicorn')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    workspace = tempfile.mkdtemp(prefix='load-')
+    project = os.path.join(workspace, 'project')
+    build_project(project, args.files, random.Random(args.seed))
+    
+    runs = []
+    for kind in args.servers.split(','):
+        # The development server is a single process
+        counts = [int(count) for count in args.workers.split(',')] if kind == 'gunicorn' else [1]
+        runs.extend((kind, workers) for workers in counts)
+    
+    print(f"{'server':10} {'workers':>7} {'endpoint':18} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    try:
+        for kind, workers in runs:
+            port = free_port()
+            process = start_server(kind, port, project, args, workers)
+            try:
+                for name, method, path, upload in (('transcribe', 'POST', '/api/v1/monitoring/transcribe', True),
+                                                   ('folder-structure', 'GET', '/api/v1/monitoring/folder-structure', False)):
+                    result = run_load(port, method, path, {}, args.clients, args.seconds, upload)
+                    print(f"{kind:10} {workers:7d} {name:18} {result['requests']:9d} {result['errors']:7d} "
+                          f"{result['rps']:9.1f} {result['p50_ms']:9.1f} {result['p99_ms']:9.1f}")
+            finally:
+                process.terminate()
+                process.wait(timeout=30)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
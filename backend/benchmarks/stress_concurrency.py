@@ -0,0 +1,205 @@
+"""
+Concurrency stress run for sessions and the folder index
+
+Threads hammer set-context, transcribe, folder-structure and resolve through the
+Flask test client against two projects while another thread keeps creating and
+deleting files in them. Folder watching is off, so every request rescans its
+project and index snapshots are swapped constantly under concurrent readers.
+
+Every transcript mentions a file that never changes, so each response must map
+it; any exception, 5xx or unmapped transcript is reported as a failure. A short
+run of the same workload is part of the test suite (tests/test_concurrency.py).
+
+Usage (from the repository root):
+    python -m backend.benchmarks.stress_concurrency --seconds 10 --threads 8
+"""
+import argparse
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import List, Tuple
+
+from ..app import create_app
+
+STABLE_FILE = 'main_module.py'
+TRANSCRIPT = f"please open main module dot py and then {STABLE_FILE}"
+
+# App settings for the stress run: every request rescans, sessions expire and are reaped quickly
+STRESS_SETTINGS = {
+    'STT_PROVIDER': 'local',
+    'LOCAL_STT_TRANSCRIPT': TRANSCRIPT,
+    'TRANSCRIPT_CACHE_ENTRIES': 0,  # Every request goes through the mapper
+    'AUDIO_PREPROCESS': 'off',
+    'INDEX_CACHE_DIR': '',
+    'FOLDER_WATCH_MODE': 'off',
+    'MONITORING_TIMEOUT': 1,
+    'SESSION_REAP_INTERVAL': 0.05,
+    'SESSION_HISTORY_LIMIT': 50
+}
+
+
+def build_project(root: str, files: int, rng: random.Random):
+    """Create a small project tree with one file that is never touched"""
+    os.makedirs(os.path.join(root, 'src'))
+    with open(os.path.join(root, 'src', STABLE_FILE), 'w'):
+        pass
+    for index in range(files):
+        folder = os.path.join(root, 'src', f"pkg_{rng.randrange(10)}")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, f"module_{index}.py"), 'w'):
+            pass
+
+
+def run_stress(app, projects: List[str], seconds: float, threads: int, seed: int) -> Tuple[Counter, Counter, float]:
+    """
+    Run the workload against app for the given time
+    
+    Args:
+        app: App created with STRESS_SETTINGS
+        projects: Project folders built with build_project; files are churned under them
+        seconds: How long to keep the threads busy
+        threads: Request threads per endpoint group
+        seed: Seed for the workers' random choices
+    
+    Returns:
+        Tuple of (operation counts, failure details with their counts, elapsed seconds)
+    """
+    stop = threading.Event()
+    lock = threading.Lock()
+    counts: Counter = Counter()
+    failures: Counter = Counter()
+    
+    def record(name: str, ok: bool, detail: str = ''):
+        with lock:
+            counts[name] += 1
+            if not ok:
+                failures[f"{name}: {detail}"[:160]] += 1
+    
+    def guarded(name: str, work):
+        def run():
+            client = app.test_client()
+            worker_rng = random.Random(f"{seed}-{name}-{threading.get_ident()}")
+            while not stop.is_set():
+                try:
+                    work(client, worker_rng)
+                except Exception as e:
+                    record(name, False, f"{type(e).__name__}: {e}")
+        return threading.Thread(target=run, name=name)
+    
+    sessions = []
+    
+    def set_context(client, worker_rng):
+        headers = {}
+        with lock:
+            if sessions and worker_rng.random() < 0.5:
+                headers['X-Session-ID'] = sessions.pop(worker_rng.randrange(len(sessions)))
+        response = client.post('/api/v1/monitoring/set-context', headers=headers,
+                               json={'projectContext': worker_rng.choice(projects)})
+        record('set-context', response.status_code == 200, f"{response.status_code} {response.get_data(as_text=True)}")
+        if response.status_code == 200:
+            with lock:
+                sessions.append(response.get_json()['session_id'])
+    
+    def session_header(worker_rng) -> dict:
+        with lock:
+            return {'X-Session-ID': worker_rng.choice(sessions)} if sessions else {}
+    
+    def transcribe(client, worker_rng):
+        audio = io.BytesIO(worker_rng.randbytes(256))
+        response = client.post('/api/v1/monitoring/transcribe', headers=session_header(worker_rng),
+                               data={'audio': (audio, 'clip.webm')}, content_type='multipart/form-data')
+        if response.status_code == 404:
+            record('transcribe', True)  # The session was dropped from history meanwhile
+            return
+        text = (response.get_json() or {}).get('transcription', '')
+        ok = response.status_code == 200 and f"@src/{STABLE_FILE}" in text
+        record('transcribe', ok, f"{response.status_code} {text or response.get_data(as_text=True)}")
+    
+    def folder_structure(client, worker_rng):
+        headers = session_header(worker_rng)
+        response = client.get('/api/v1/monitoring/folder-structure', headers=headers)
+        body = response.get_json() or {}
+        # Without a session (all of them were being replaced) there is no project to check against
+        ok = response.status_code == 404 or (response.status_code == 200 and (
+            not headers or STABLE_FILE in body.get('folder_structure', {}).get('src', [])))
+        record('folder-structure', ok, f"{response.status_code} {str(body)[:80]}")
+    
+    def resolve(client, worker_rng):
+        headers = session_header(worker_rng)
+        response = client.get('/api/v1/monitoring/resolve?q=main+module', headers=headers)
+        body = response.get_json() or {}
+        ok = response.status_code == 404 or (response.status_code == 200 and (not headers or any(
+            candidate['filename'] == STABLE_FILE for candidate in body.get('candidates', []))))
+        record('resolve', ok, f"{response.status_code} {str(body)[:80]}")
+    
+    def churn(client, worker_rng):
+        # Create and delete files and whole folders under both projects
+        project = worker_rng.choice(projects)
+        folder = os.path.join(project, 'src', f"churn_{worker_rng.randrange(5)}")
+        if os.path.isdir(folder) and worker_rng.random() < 0.3:
+            shutil.rmtree(folder, ignore_errors=True)
+        else:
+            os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"tmp_{worker_rng.randrange(50)}.py"), 'w'):
+                pass
+        record('churn', True)
+    
+    groups = [('set-context', set_context), ('transcribe', transcribe),
+              ('folder-structure', folder_structure), ('resolve', resolve)]
+    workers = [guarded(name, work) for name, work in groups for _ in range(threads)]
+    workers.append(guarded('churn', churn))
+    
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return counts, failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--threads', type=int, default=8, help='request threads per endpoint group')
+    parser.add_argument('--files', type=int, default=2000, help='files per project')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    
+    rng = random.Random(args.seed)
+    workspace = tempfile.mkdtemp(prefix='stress-')
+    projects = [os.path.join(workspace, name) for name in ('alpha', 'beta')]
+    for project in projects:
+        build_project(project, args.files, rng)
+    
+    app = create_app('testing', STRESS_SETTINGS)
+    counts, failures, elapsed = run_stress(app, projects, args.seconds, args.threads, args.seed)
+    
+    app.session_manager.stop_reaper()
+    app.job_queue.shutdown()
+    app.stt_service.mappers.close()
+    shutil.rmtree(workspace, ignore_errors=True)
+    
+    print(f"{'operation':18} {'count':>8} {'per s':>8}")
+    for name, count in sorted(counts.items()):
+        print(f"{name:18} {count:8d} {count / elapsed:8.1f}")
+    stats = app.session_manager.get_stats()
+    print(f"sessions: {stats['active']} active, {stats['history']} in history, {stats['expired']} expired")
+    
+    if failures:
+        print(f"\n{sum(failures.values())} failures:")
+        for detail, count in failures.most_common(10):
+            print(f"  {count:6d}  {detail}")
+        sys.exit(1)
+    print("\nno failures")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,300 @@
+"""
+Benchmark suite for the folder scan, filename lookup, replacement and /transcribe
+
+For each tree size a synthetic project is generated, with as many files again in
+ignored folders (node_modules, .git, venv, dist, __pycache__), and these are timed:
+
+- scan: a cold FilePathMapper scan of the tree
+- find_file_path: lookups of spoken filenames, including misses
+- replace_filenames_in_text: synthetic transcripts mentioning real files
+- transcribe: POST /transcribe through the Flask test client with the local STT provider
+
+Cold starts (import, create_app and the first request) are timed first, in fresh
+interpreters, under 'startup'.
+
+Results are written as JSON tagged with the git commit, so runs on two commits can
+be compared with --compare.
+
+Usage (from the repository root):
+    python -m backend.benchmarks.suite --sizes 1000,10000,100000 --output bench-results.json
+    python -m backend.benchmarks.suite --sizes 1000,10000 --compare bench-results.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from ..app import create_app
+from ..config import Config
+from ..services.file_path_mapper import FilePathMapper
+from .synthetic import add_ignored_dirs, build_tree, make_transcripts, spoken_mention
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Run in a fresh interpreter: import the app, build it and serve one request
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+from backend.app import create_app
+imported = time.perf_counter()
+app = create_app('production', {'INDEX_CACHE_DIR': ''})
+created = time.perf_counter()
+app.test_client().get('/api/v1/health')
+served = time.perf_counter()
+app.session_manager.stop_reaper()
+app.job_queue.shutdown()
+print(json.dumps({'import': imported - start, 'create_app': created - imported, 'first_request': served - created,
+                  'deepgram_imported': 'deepgram' in sys.modules}))
+'''
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Milliseconds statistics for a list of durations in seconds"""
+    ordered = sorted(samples)
+    if len(ordered) > 1:
+        quantiles = statistics.quantiles(ordered, n=100, method='inclusive')
+        p50, p95 = quantiles[49], quantiles[94]
+    else:
+        p50 = p95 = ordered[0]
+    return {
+        'n': len(ordered),
+        'mean_ms': round(statistics.fmean(ordered) * 1000, 4),
+        'p50_ms': round(p50 * 1000, 4),
+        'p95_ms': round(p95 * 1000, 4),
+        'min_ms': round(ordered[0] * 1000, 4)
+    }
+
+
+def git_commit() -> Dict[str, Optional[object]]:
+    """The checked-out commit and whether the tree has uncommitted changes"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return {'commit': commit, 'dirty': dirty}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'dirty': None}
+
+
+def spoken_queries(filenames: List[str], count: int, rng: random.Random) -> List[str]:
+    """Spoken filenames to look up: mostly real files in spoken forms, some misses"""
+    queries = []
+    for index in range(count):
+        if index % 10 == 9:
+            queries.append(f"nonexistent thing {index} dot rs")
+        else:
+            queries.append(spoken_mention(rng.choice(filenames), rng))
+    return queries
+
+
+def bench_startup(runs: int) -> Dict[str, dict]:
+    """Time cold starts of the backend (Deepgram provider, no network calls) in fresh interpreters"""
+    env = dict(os.environ, STT_PROVIDER='deepgram', DEEPGRAM_API_KEY=os.environ.get('DEEPGRAM_API_KEY') or 'benchmark',
+               FLASK_ENV='production', PRELOAD_PROJECTS='', DEFAULT_PROJECT_PATH='')
+    samples: Dict[str, List[float]] = {'process': [], 'import': [], 'create_app': [], 'first_request': []}
+    sdk_imported = False
+    for _ in range(runs):
+        start = time.perf_counter()
+        completed = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=ROOT, env=env,
+                                   capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if completed.returncode != 0:
+            sys.exit(f"startup run failed:\n{completed.stderr}")
+        timings = json.loads(completed.stdout.strip().splitlines()[-1])
+        samples['process'].append(elapsed)
+        for name in ('import', 'create_app', 'first_request'):
+            samples[name].append(timings[name])
+        sdk_imported = sdk_imported or timings['deepgram_imported']
+    results = {f"startup_{name}": summarize(values) for name, values in samples.items()}
+    results['startup_process']['deepgram_sdk_imported'] = sdk_imported
+    return results
+
+
+def bench_mapper(root: str, filenames: List[str], args, rng: random.Random) -> Dict[str, dict]:
+    """Time scans, lookups and replacements directly on FilePathMapper"""
+    results = {}
+    
+    scans = []
+    mapper = None
+    for _ in range(args.scan_repeats):
+        start = time.perf_counter()
+        mapper = FilePathMapper(root, scan_workers=args.scan_workers)
+        scans.append(time.perf_counter() - start)
+    results['scan'] = summarize(scans)
+    results['scan']['files_indexed'] = len(mapper.snapshot().index)
+    
+    # Lookup structures are built lazily on first use; time that separately
+    start = time.perf_counter()
+    mapper.find_file_path(filenames[0])
+    results['fuzzy_index_build'] = summarize([time.perf_counter() - start])
+    start = time.perf_counter()
+    mapper.replace_filenames_in_text(filenames[0])
+    results['matcher_build'] = summarize([time.perf_counter() - start])
+    
+    lookups = []
+    for query in spoken_queries(filenames, args.lookups, rng):
+        start = time.perf_counter()
+        mapper.find_file_path(query)
+        lookups.append(time.perf_counter() - start)
+    results['find_file_path'] = summarize(lookups)
+    
+    replacements = []
+    for text in make_transcripts(filenames, args.transcripts, rng):
+        start = time.perf_counter()
+        mapper.replace_filenames_in_text(text)
+        replacements.append(time.perf_counter() - start)
+    results['replace_filenames_in_text'] = summarize(replacements)
+    return results
+
+
+def bench_transcribe(app, root: str, filenames: List[str], fixtures_dir: str, args,
+                     rng: random.Random) -> Dict[str, dict]:
+    """Time set-context and /transcribe through the test client"""
+    for index, text in enumerate(make_transcripts(filenames, args.fixtures, rng)):
+        with open(os.path.join(fixtures_dir, f"fixture{index:04d}.txt"), 'w', encoding='utf-8') as file:
+            file.write(text)
+    
+    client = app.test_client()
+    start = time.perf_counter()
+    response = client.post('/api/v1/monitoring/set-context', json={'projectContext': root})
+    set_context = time.perf_counter() - start
+    if response.status_code != 200:
+        sys.exit(f"set-context failed: {response.status_code} {response.get_data(as_text=True)}")
+    session_id = response.get_json()['session_id']
+    headers = {'X-Session-ID': session_id}
+    
+    latencies = []
+    stages: Dict[str, List[float]] = {}
+    for _ in range(args.requests):
+        audio = io.BytesIO(rng.randbytes(4096))  # Distinct audio, so every request picks a fixture by hash
+        start = time.perf_counter()
+        response = client.post('/api/v1/monitoring/transcribe?timings=1', headers=headers,
+                               data={'audio': (audio, 'recording.webm')}, content_type='multipart/form-data')
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            sys.exit(f"/transcribe failed: {response.status_code} {response.get_data(as_text=True)}")
+        for name, ms in (response.get_json().get('timings') or {}).get('stages_ms', {}).items():
+            stages.setdefault(name, []).append(ms / 1000)
+    
+    client.post('/api/v1/monitoring/stop', headers=headers)  # Releases the project's index
+    
+    # The first request also builds the snapshot's lookup structures
+    results = {'set_context': summarize([set_context]), 'first_transcribe': summarize(latencies[:1]),
+               'transcribe': summarize(latencies[1:] or latencies)}
+    results['transcribe']['stages_p50_ms'] = {name: summarize(samples)['p50_ms']
+                                              for name, samples in sorted(stages.items())}
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, dict]]):
+    print(f"{'files':>8} {'benchmark':28} {'n':>6} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for size, benchmarks in results.items():
+        for name, stats in benchmarks.items():
+            if isinstance(stats, dict) and 'p50_ms' in stats:
+                print(f"{size:>8} {name:28} {stats['n']:6d} {stats['mean_ms']:10.3f} "
+                      f"{stats['p50_ms']:10.3f} {stats['p95_ms']:10.3f}")
+
+
+def print_comparison(baseline: dict, current: dict):
+    """p50 of every benchmark both runs have, and the change from the baseline"""
+    label = (baseline.get('meta', {}).get('commit') or 'baseline')[:10]
+    print(f"\ncompared with {label}")
+    print(f"{'files':>8} {'benchmark':28} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for size, benchmarks in current['results'].items():
+        before = baseline.get('results', {}).get(size, {})
+        for name, stats in benchmarks.items():
+            if name not in before or 'p50_ms' not in stats:
+                continue
+            old, new = before[name]['p50_ms'], stats['p50_ms']
+            change = f"{(new - old) / old * 100:+7.1f}%" if old else '     n/a'
+            print(f"{size:>8} {name:28} {old:10.3f} {new:10.3f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='comma-separated tree sizes (tracked files)')
+    parser.add_argument('--ignored-ratio', type=float, default=1.0, help='files in ignored folders per tracked file')
+    parser.add_argument('--scan-repeats', type=int, default=3, help='cold scans timed per size')
+    parser.add_argument('--scan-workers', type=int, default=Config.SCAN_WORKERS)
+    parser.add_argument('--lookups', type=int, default=2000, help='find_file_path calls per size')
+    parser.add_argument('--transcripts', type=int, default=500, help='replace_filenames_in_text calls per size')
+    parser.add_argument('--requests', type=int, default=200, help='/transcribe requests per size')
+    parser.add_argument('--fixtures', type=int, default=50, help='distinct transcripts replayed by the local STT')
+    parser.add_argument('--startup-runs', type=int, default=5, help='cold starts timed (0 to skip)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare with')
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    
+    fixtures_dir = tempfile.mkdtemp(prefix='bench-fixtures-')
+    # The local provider lists its fixtures once; their contents are rewritten per tree
+    for index in range(args.fixtures):
+        open(os.path.join(fixtures_dir, f"fixture{index:04d}.txt"), 'w').close()
+    app = create_app('testing', {
+        'STT_PROVIDER': 'local',
+        'LOCAL_STT_FIXTURES_DIR': fixtures_dir,
+        'TRANSCRIPT_CACHE_ENTRIES': 0,  # Every request goes through the mapper
+        'AUDIO_PREPROCESS': 'off',
+        'INDEX_CACHE_DIR': '',
+        'FOLDER_WATCH_MODE': 'polling',
+        'FOLDER_POLL_INTERVAL': 3600.0,  # Watched, so requests never rescan, but polls stay out of the timings
+        'SCAN_WORKERS': args.scan_workers
+    })
+    
+    results: Dict[str, Dict[str, dict]] = {}
+    if args.startup_runs > 0:
+        results['startup'] = bench_startup(args.startup_runs)
+    try:
+        for size in sizes:
+            rng = random.Random(f"{args.seed}-{size}")
+            root = tempfile.mkdtemp(prefix=f"bench-{size}-")
+            try:
+                start = time.perf_counter()
+                filenames = build_tree(root, size, rng)
+                ignored = add_ignored_dirs(root, int(size * args.ignored_ratio), rng)
+                print(f"built {size} files (+{ignored} ignored) in {time.perf_counter() - start:.1f} s",
+                      file=sys.stderr)
+                
+                results[str(size)] = bench_mapper(root, filenames, args, rng)
+                results[str(size)].update(bench_transcribe(app, root, filenames, fixtures_dir, args, rng))
+            finally:
+                shutil.rmtree(root, ignore_errors=True)
+    finally:
+        app.session_manager.stop_reaper()
+        app.job_queue.shutdown()
+        app.stt_service.mappers.close()
+        shutil.rmtree(fixtures_dir, ignore_errors=True)
+    
+    report = {
+        'meta': dict(git_commit(),
+                     timestamp=datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                     python=platform.python_version(),
+                     platform=platform.platform(),
+                     cpus=os.cpu_count(),
+                     args=vars(args)),
+        'results': results
+    }
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nwrote {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            print_comparison(json.load(file), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Synthetic project trees and transcripts for benchmarks
+"""
+import os
+import random
+from typing import List, Tuple
+
+WORDS = ['session', 'manager', 'audio', 'handler', 'config', 'routes', 'monitoring',
+         'health', 'index', 'utils', 'client', 'server', 'model', 'view', 'test']
+EXTENSIONS = ['py', 'ts', 'tsx', 'json', 'html', 'md', 'css', 'js']
+FILLER = ['open', 'the', 'file', 'and', 'then', 'update', 'please', 'check', 'in', 'with']
+
+# Folders FilePathMapper skips, laid out the way real projects fill them
+IGNORED_LAYOUTS = [
+    ('node_modules', '{word}-{word}', 'lib', 'js'),
+    ('.git', 'objects', '{index:02x}', 'pack'),
+    ('venv', 'lib', 'site-packages', 'py'),
+    ('dist', 'assets', 'chunks', 'js'),
+    ('__pycache__', '', '', 'pyc'),
+]
+
+
+def build_tree(root: str, total_files: int, rng: random.Random) -> List[str]:
+    """Create a synthetic project tree and return the generated filenames"""
+    filenames = []
+    for index in range(total_files):
+        directory = os.path.join(root, f"pkg{index % 200}", f"mod{index % 17}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"{rng.choice(WORDS)}_{rng.choice(WORDS)}{index}.{rng.choice(EXTENSIONS)}"
+        open(os.path.join(directory, name), 'w').close()
+        filenames.append(name)
+    return filenames
+
+
+def add_ignored_dirs(root: str, total_files: int, rng: random.Random) -> int:
+    """
+    Fill directories the mapper ignores (node_modules, .git, venv, ...) with files
+    
+    A scan must skip them without listing their contents, so their size should not
+    show up in scan times.
+    
+    Returns:
+        Number of files created
+    """
+    for index in range(total_files):
+        top, first, second, ext = IGNORED_LAYOUTS[index % len(IGNORED_LAYOUTS)]
+        parts = [part.format(word=rng.choice(WORDS), index=index % 256) for part in (first, second) if part]
+        if top == '__pycache__':
+            # Bytecode caches sit next to the sources they belong to
+            directory = os.path.join(root, f"pkg{index % 200}", top)
+        else:
+            directory = os.path.join(root, top, *parts)
+        os.makedirs(directory, exist_ok=True)
+        open(os.path.join(directory, f"{rng.choice(WORDS)}{index}.{ext}"), 'w').close()
+    return total_files
+
+
+def spoken_mention(name: str, rng: random.Random) -> str:
+    """Say a filename the ways STT writes it: written, spelled out, camelCase or misheard"""
+    stem, ext = name.rsplit('.', 1)
+    words = stem.split('_')
+    form = rng.random()
+    if form < 0.4:
+        return name
+    if form < 0.6:
+        return f"{' '.join(words)} dot {' '.join(ext)}"
+    if form < 0.75:
+        return f"{' '.join(words)} dot {ext}"
+    if form < 0.9:
+        return words[0] + ''.join(word[:1].upper() + word[1:] for word in words[1:]) + '.' + ext
+    # One dropped vowel, as in "manger" for "manager"
+    misheard = [word[:-3] + word[-2:] if len(word) > 5 and word[-3] in 'aeiou' else word for word in words]
+    return f"{' '.join(misheard)} dot {' '.join(ext)}"
+
+
+def make_transcripts(filenames: List[str], count: int, rng: random.Random) -> List[str]:
+    """Generate transcripts mentioning real files in written and spoken forms"""
+    return [text for text, _ in make_transcripts_with_mentions(filenames, count, rng)]
+
+
+def make_transcripts_with_mentions(filenames: List[str], count: int,
+                                   rng: random.Random) -> List[Tuple[str, int]]:
+    """Generate transcripts along with how many filenames each one mentions"""
+    transcripts = []
+    for _ in range(count):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 30))]
+        mentions = rng.randint(1, 3)
+        for _ in range(mentions):
+            words.insert(rng.randrange(len(words)), spoken_mention(rng.choice(filenames), rng))
+        transcripts.append((' '.join(words) + '.', mentions))
+    return transcripts
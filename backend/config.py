@@ -21,7 +21,98 @@ class Config:
     
     # File monitoring settings
     MAX_EVENTS_STORED = int(os.environ.get('MAX_EVENTS_STORED', 1000))
-    MONITORING_TIMEOUT = int(os.environ.get('MONITORING_TIMEOUT', 300))  # 5 minutes
+    MONITORING_TIMEOUT = int(os.environ.get('MONITORING_TIMEOUT', 300))  # 5 minutes idle; 0 never expires
+    SESSION_REAP_INTERVAL = float(os.environ.get('SESSION_REAP_INTERVAL', 30.0))  # seconds
+    SESSION_HISTORY_LIMIT = int(os.environ.get('SESSION_HISTORY_LIMIT', 500))  # ended sessions kept
+    
+    # Folder index watching: 'auto' (watchdog if installed, else polling), 'watchdog', 'polling' or 'off'
+    FOLDER_WATCH_MODE = os.environ.get('FOLDER_WATCH_MODE', 'auto')
+    FOLDER_POLL_INTERVAL = float(os.environ.get('FOLDER_POLL_INTERVAL', 2.0))  # seconds
+    
+    # Threads listing directories during a full folder scan (1 = serial walk)
+    SCAN_WORKERS = int(os.environ.get('SCAN_WORKERS', 4))
+    
+    # Project mapped for requests without a session; empty maps nothing until set-context
+    DEFAULT_PROJECT_PATH = os.environ.get('DEFAULT_PROJECT_PATH', '')
+    
+    # Project indexes kept loaded at once, selected per session (least recently used are dropped)
+    MAX_LOADED_PROJECTS = int(os.environ.get('MAX_LOADED_PROJECTS', 8))
+    MAX_INDEX_BYTES = int(os.environ.get('MAX_INDEX_BYTES', 512 * 1024 * 1024))  # estimated, across projects
+    
+    # Folder index cache for warm starts (empty to disable)
+    INDEX_CACHE_DIR = os.environ.get('INDEX_CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache'))
+    
+    # Admission control for /transcribe and /transcribe/batch (0 disables a limit). Over the first
+    # limit requests get 413; while the others are reached they get 429 with Retry-After
+    MAX_UPLOAD_BYTES = int(os.environ.get('MAX_UPLOAD_BYTES', 100 * 1024 * 1024))  # largest request body
+    MAX_INFLIGHT_TRANSCRIPTIONS = int(os.environ.get('MAX_INFLIGHT_TRANSCRIPTIONS', 32))  # requests and queued jobs
+    MAX_BUFFERED_UPLOAD_BYTES = int(os.environ.get('MAX_BUFFERED_UPLOAD_BYTES', 256 * 1024 * 1024))  # across requests
+    
+    # Uploads above this many bytes are spilled to a temp file instead of kept in memory
+    AUDIO_SPILL_THRESHOLD = int(os.environ.get('AUDIO_SPILL_THRESHOLD', 8 * 1024 * 1024))
+    
+    # Silence trimming and mono 16 kHz downsampling of uploads: 'off' or 'auto' (when numpy is installed).
+    # WAV is handled natively; WebM/Opus needs ffmpeg on PATH (or FFMPEG_PATH)
+    AUDIO_PREPROCESS = os.environ.get('AUDIO_PREPROCESS', 'off')
+    AUDIO_PREPROCESS_MAX_SECONDS = float(os.environ.get('AUDIO_PREPROCESS_MAX_SECONDS', 600))  # longer clips sent as-is
+    AUDIO_PREPROCESS_MIN_SAVING = float(os.environ.get('AUDIO_PREPROCESS_MIN_SAVING', 0.1))  # of bytes or duration
+    AUDIO_SAMPLE_RATE = int(os.environ.get('AUDIO_SAMPLE_RATE', 16000))
+    AUDIO_SILENCE_THRESHOLD_DB = float(os.environ.get('AUDIO_SILENCE_THRESHOLD_DB', -40.0))  # dBFS
+    AUDIO_SILENCE_PADDING_MS = float(os.environ.get('AUDIO_SILENCE_PADDING_MS', 250))  # kept around speech
+    FFMPEG_PATH = os.environ.get('FFMPEG_PATH', 'ffmpeg')
+    
+    # Background transcription jobs (POST /transcribe?mode=job)
+    TRANSCRIBE_MAX_CONCURRENCY = int(os.environ.get('TRANSCRIBE_MAX_CONCURRENCY', 4))  # jobs sent to STT at once
+    TRANSCRIBE_QUEUE_DEPTH = int(os.environ.get('TRANSCRIBE_QUEUE_DEPTH', 32))  # jobs waiting before 503
+    TRANSCRIBE_QUEUE_TIMEOUT = float(os.environ.get('TRANSCRIBE_QUEUE_TIMEOUT', 120.0))  # seconds a job may wait
+    TRANSCRIBE_JOB_TTL = float(os.environ.get('TRANSCRIBE_JOB_TTL', 600.0))  # seconds finished jobs are kept
+    
+    # Batch transcription (POST /transcribe/batch): several uploads, or a manifest of files on the server
+    BATCH_MAX_CONCURRENCY = int(os.environ.get('BATCH_MAX_CONCURRENCY', 4))  # items sent to STT at once, across batches
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 500))  # items accepted in one batch
+    BATCH_MANIFEST_ROOT = os.environ.get('BATCH_MANIFEST_ROOT', '')  # manifest paths must be under it; empty disables manifests
+    
+    # Speech-to-text engine: 'deepgram' (needs DEEPGRAM_API_KEY) or 'local' (offline, deterministic)
+    STT_PROVIDER = os.environ.get('STT_PROVIDER', 'deepgram')
+    LOCAL_STT_TRANSCRIPT = os.environ.get('LOCAL_STT_TRANSCRIPT', '')  # empty = built-in canned transcript
+    LOCAL_STT_FIXTURES_DIR = os.environ.get('LOCAL_STT_FIXTURES_DIR', '')  # <sha256>.txt transcripts to replay
+    LOCAL_STT_LATENCY_MS = float(os.environ.get('LOCAL_STT_LATENCY_MS', 0))
+    LOCAL_STT_JITTER_MS = float(os.environ.get('LOCAL_STT_JITTER_MS', 0))
+    
+    # Upstream Deepgram requests: keep-alive pool, deadlines, jittered retries and hedging
+    DEEPGRAM_API_URL = os.environ.get('DEEPGRAM_API_URL', 'https://api.deepgram.com')
+    STT_POOL_SIZE = int(os.environ.get('STT_POOL_SIZE', 8))  # idle keep-alive connections kept open
+    STT_ATTEMPT_TIMEOUT = float(os.environ.get('STT_ATTEMPT_TIMEOUT', 30.0))  # seconds per attempt
+    STT_TOTAL_TIMEOUT = float(os.environ.get('STT_TOTAL_TIMEOUT', 90.0))  # seconds including retries
+    STT_MAX_RETRIES = int(os.environ.get('STT_MAX_RETRIES', 2))
+    STT_BACKOFF_BASE_MS = float(os.environ.get('STT_BACKOFF_BASE_MS', 200))  # doubles per retry, full jitter
+    STT_HEDGE_AFTER_MS = os.environ.get('STT_HEDGE_AFTER_MS', '')  # empty = off, 'p95' = adaptive, or a fixed delay
+    
+    # Cache of raw transcripts for identical audio (0 entries disables; empty dir keeps it in memory only)
+    TRANSCRIPT_CACHE_ENTRIES = int(os.environ.get('TRANSCRIPT_CACHE_ENTRIES', 256))
+    TRANSCRIPT_CACHE_MAX_BYTES = int(os.environ.get('TRANSCRIPT_CACHE_MAX_BYTES', 4 * 1024 * 1024))
+    TRANSCRIPT_CACHE_TTL = float(os.environ.get('TRANSCRIPT_CACHE_TTL', 3600.0))  # seconds
+    TRANSCRIPT_CACHE_DIR = os.environ.get('TRANSCRIPT_CACHE_DIR', '')
+    
+    # Live transcription over WebSocket (requires flask-sock): 'deepgram' or 'fake' (local, for tests);
+    # empty follows STT_PROVIDER ('fake' for 'local', else 'deepgram')
+    STREAMING_STT_BACKEND = os.environ.get('STREAMING_STT_BACKEND', '')
+    STREAM_IDLE_TIMEOUT = float(os.environ.get('STREAM_IDLE_TIMEOUT', 30.0))  # seconds without audio before closing
+    
+    # Per-stage transcription timings and counters at /api/v1/metrics (Prometheus format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Production server (gunicorn -c backend/gunicorn.conf.py backend.wsgi:app).
+    # Sessions, jobs and caches live in each worker process, so keep WEB_WORKERS at 1
+    # unless a proxy pins every client to one worker
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS', 1))
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 16))  # request threads per worker; an open WebSocket holds one
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 120))  # seconds a worker may stay silent before it is restarted
+    WEB_GRACEFUL_TIMEOUT = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30))  # seconds to finish requests on restart
+    WEB_KEEPALIVE = int(os.environ.get('WEB_KEEPALIVE', 5))  # seconds an idle keep-alive connection is held
+    WEB_PRELOAD = os.environ.get('WEB_PRELOAD', 'True').lower() == 'true'  # build services once, before forking
+    PRELOAD_PROJECTS = [path for path in os.environ.get('PRELOAD_PROJECTS', '').split(',') if path]  # indexed before fork
+    # (each process also warms them up, with DEFAULT_PROJECT_PATH, in the background once it starts)
     
     # API settings
     API_PREFIX = '/api/v1'
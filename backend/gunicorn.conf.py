@@ -0,0 +1,42 @@
+"""
+Gunicorn settings for the production server, read from the app config
+
+Usage (from the repository root):
+    gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+Workers are threaded (gthread): transcription is mostly waiting on the STT
+provider, and each open live-transcription WebSocket holds a thread. Tune with
+WEB_WORKERS, WEB_THREADS, WEB_TIMEOUT, WEB_GRACEFUL_TIMEOUT, WEB_KEEPALIVE and
+WEB_PRELOAD; HOST and PORT set the bind address.
+"""
+import os
+
+from backend.config import config as _configs
+
+_settings = _configs[os.environ.get('FLASK_ENV', 'production')]
+
+bind = f"{_settings.HOST}:{_settings.PORT}"
+workers = _settings.WEB_WORKERS
+worker_class = 'gthread'
+threads = _settings.WEB_THREADS
+timeout = _settings.WEB_TIMEOUT
+graceful_timeout = _settings.WEB_GRACEFUL_TIMEOUT
+keepalive = _settings.WEB_KEEPALIVE
+preload_app = _settings.WEB_PRELOAD
+
+accesslog = '-'
+errorlog = '-'
+loglevel = _settings.LOG_LEVEL.lower()
+
+
+def post_worker_init(worker):
+    """Start the reaper and folder watchers in each worker rather than on its first request"""
+    from backend.app import start_background_services
+    start_background_services(worker.wsgi)
+
+
+def when_ready(server):
+    """Warn that sessions and jobs are not shared between worker processes"""
+    if workers > 1:
+        server.log.warning("WEB_WORKERS=%d: sessions and transcription jobs live in the worker that created them, "
+                           "so requests naming one must reach that worker (see Deployment in backend/README.md)", workers)
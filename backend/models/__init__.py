@@ -2,5 +2,7 @@
 Models package for The Lazy Coder backend
 """
 from .monitoring_session import MonitoringSession
+from .file_event import FileEvent
+from .transcription_job import TranscriptionJob
 
-__all__ = ['MonitoringSession']
+__all__ = ['MonitoringSession', 'FileEvent', 'TranscriptionJob']
@@ -0,0 +1,24 @@
+"""
+File event model for changes applied to the folder index
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+@dataclass
+class FileEvent:
+    """Represents a file created, deleted or moved inside the monitored folder"""
+    
+    event_type: str  # 'created', 'deleted' or 'moved'
+    path: str
+    dest_path: Optional[str] = None
+    timestamp: datetime = field(default_factory=datetime.now)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'event_type': self.event_type,
+            'path': self.path,
+            'dest_path': self.dest_path,
+            'timestamp': self.timestamp.isoformat()
+        }
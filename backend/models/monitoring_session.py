@@ -1,9 +1,16 @@
 """
 Monitoring session model for tracking active monitoring
 """
-from dataclasses import dataclass
+import threading
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional
+from typing import Deque, Optional
+
+from .file_event import FileEvent
+
+# Number of most recent file events included when a session is serialized
+RECENT_EVENTS_LIMIT = 20
 
 @dataclass
 class MonitoringSession:
@@ -14,14 +21,42 @@ class MonitoringSession:
     start_time: datetime
     is_active: bool = True
     total_events: int = 0
+    recent_events: Deque[FileEvent] = field(default_factory=deque)
+    sequence: int = 0  # Creation order; used as the /sessions pagination cursor
+    last_activity: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    end_reason: Optional[str] = None  # 'stopped', 'replaced' or 'expired'
+    # Guards the event counters and buffer; watcher threads record while requests serialize
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+    
+    def touch(self):
+        """Note that the session was just used"""
+        self.last_activity = datetime.now()
+    
+    def record_event(self, event: FileEvent):
+        """Count a file event and keep it in the bounded recent events buffer"""
+        with self.lock:
+            self.total_events += 1
+            self.recent_events.append(event)
+    
+    def resize_events(self, maxlen: int):
+        """Keep at most maxlen recent events from now on, dropping the oldest"""
+        with self.lock:
+            self.recent_events = deque(self.recent_events, maxlen=maxlen)
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization"""
+        with self.lock:
+            recent_events = list(self.recent_events)[-RECENT_EVENTS_LIMIT:]
+            total_events = self.total_events
         return {
             'session_id': self.session_id,
             'path': self.path,
             'start_time': self.start_time.isoformat(),
             'is_active': self.is_active,
-            'total_events': self.total_events,
-            'recent_events': []
+            'last_activity': self.last_activity.isoformat() if self.last_activity else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None,
+            'end_reason': self.end_reason,
+            'total_events': total_events,
+            'recent_events': [event.to_dict() for event in recent_events]
         }
@@ -0,0 +1,52 @@
+"""
+Transcription job model for uploads transcribed in the background
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Optional
+
+# Job states; the last two are terminal
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+@dataclass
+class TranscriptionJob:
+    """Represents one audio upload queued for transcription"""
+    
+    job_id: str
+    filename: str
+    path: Optional[str]  # Monitored path used for file path replacement (None: the default project)
+    submitted_at: datetime = field(default_factory=datetime.now)
+    status: str = JOB_QUEUED
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[dict] = None  # STT result dict once succeeded
+    error: Optional[str] = None
+    version: int = 0  # Bumped on every status change so waiters can detect updates
+    
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        queue_ms = None
+        run_ms = None
+        if self.started_at:
+            queue_ms = round((self.started_at - self.submitted_at).total_seconds() * 1000, 1)
+        if self.started_at and self.finished_at:
+            run_ms = round((self.finished_at - self.started_at).total_seconds() * 1000, 1)
+        
+        return {
+            'job_id': self.job_id,
+            'status': self.status,
+            'filename': self.filename,
+            'submitted_at': self.submitted_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'timings': {'queue_ms': queue_ms, 'run_ms': run_ms},
+            'result': self.result,
+            'error': self.error
+        }
@@ -1,7 +1,7 @@
 """
 Routes package for The Lazy Coder backend
 """
-from .monitoring import monitoring_bp
+from .monitoring import create_monitoring_routes
 from .health import health_bp
 
-__all__ = ['monitoring_bp', 'health_bp']
+__all__ = ['create_monitoring_routes', 'health_bp']
@@ -0,0 +1,15 @@
+"""
+Metrics routes for Prometheus scraping
+"""
+from flask import Blueprint, Response, jsonify
+
+from ..services.metrics import CONTENT_TYPE, METRICS
+
+metrics_bp = Blueprint('metrics', __name__, url_prefix='/api/v1')
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Transcription stage histograms and index/replacement counters in the Prometheus text format"""
+    if not METRICS.enabled:
+        return jsonify({'error': 'Metrics are disabled (METRICS_ENABLED=false)'}), 404
+    return Response(METRICS.render(), mimetype=None, content_type=CONTENT_TYPE)
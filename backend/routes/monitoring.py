@@ -1,17 +1,111 @@
 """
 Monitoring routes for file system monitoring
 """
-from flask import Blueprint, request, jsonify
+import gzip
+import json
+import os
+import threading
+import zlib
+
+from collections import OrderedDict
+from flask import Blueprint, Response, request, jsonify, url_for
 from datetime import datetime
+from typing import Optional, Tuple
+
+from werkzeug.exceptions import RequestEntityTooLarge
 
+from ..models.transcription_job import TranscriptionJob
+from ..services.admission import AdmissionController, AdmissionRejected
 from ..services.session_manager import SessionManager
+from ..services.mapper_registry import project_key
 from ..services.audio_handler import AudioHandler
+from ..services.batch_transcription import BatchTranscriber
+from ..services.metrics import METRICS, StageTimings, stage
 from ..services.nova3_stt import Nova3STTService
+from ..services.transcription_jobs import JobQueueFullError, TranscriptionJobQueue
+
+# Seconds between keep-alive comments on an idle job event stream
+SSE_KEEPALIVE_INTERVAL = 15.0
+
+# Page sizes for /sessions
+SESSIONS_PAGE_DEFAULT = 50
+SESSIONS_PAGE_MAX = 200
+
+# Header naming the session a request belongs to (a session_id query/form field works too)
+SESSION_HEADER = 'X-Session-ID'
+
+# Serialized /folder-structure bodies kept (by ETag), and the smallest body worth gzipping
+FOLDER_STRUCTURE_CACHE_ENTRIES = 16
+GZIP_MIN_BYTES = 1024
+
+
+def json_bytes_response(body: bytes, etag: str, compressed: Optional[bytes] = None) -> Response:
+    """
+    Build a JSON response with a weak ETag, gzipped when the client accepts it
+    
+    Args:
+        body: Serialized JSON
+        etag: Identifies the state body describes
+        compressed: body already gzipped, if cached
+    """
+    response = Response(body, mimetype='application/json')
+    if len(body) >= GZIP_MIN_BYTES and request.accept_encodings['gzip']:
+        response.set_data(compressed if compressed is not None else gzip.compress(body))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.set_etag(etag, weak=True)
+    return response
 
-monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/api/v1/monitoring')
+def requested_session_id() -> Optional[str]:
+    """The session ID sent with the current request, if any"""
+    session_id = request.headers.get(SESSION_HEADER) or request.args.get('session_id') or request.form.get('session_id')
+    if not session_id and request.is_json:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            session_id = data.get('sessionId') or data.get('session_id')
+    return session_id or None
 
-def create_monitoring_routes(session_manager: SessionManager, audio_handler: AudioHandler = None, stt_service: Nova3STTService = None):
-    """Create monitoring routes with injected dependencies"""
+def create_monitoring_routes(session_manager: SessionManager, audio_handler: AudioHandler = None, stt_service: Nova3STTService = None,
+                             job_queue: TranscriptionJobQueue = None, batch_transcriber: BatchTranscriber = None,
+                             admission: AdmissionController = None):
+    """Create monitoring routes with injected dependencies (a new blueprint per app)"""
+    monitoring_bp = Blueprint('monitoring', __name__, url_prefix='/api/v1/monitoring')
+    admission = admission or AdmissionController()  # No limits unless configured
+    structure_cache: "OrderedDict[str, Tuple[bytes, Optional[bytes]]]" = OrderedDict()
+    structure_cache_lock = threading.Lock()
+    
+    def admit_upload():
+        """
+        Reserve in-flight and buffer capacity before the request body is read
+        
+        Returns:
+            Tuple of (ticket or None, error response or None)
+        """
+        try:
+            return admission.admit(request.content_length), None
+        except AdmissionRejected as e:
+            headers = {'Retry-After': str(e.retry_after)} if e.retry_after else {}
+            return None, (jsonify({'error': str(e)}), e.status, headers)
+    
+    def too_large_response():
+        # A body without Content-Length that outgrew MAX_UPLOAD_BYTES while being read
+        return (jsonify({'error': f'Upload is over the {admission.max_upload_bytes} byte limit'}), 413,
+                {'Retry-After': str(admission.retry_after())})
+    
+    def request_session():
+        """
+        Find the session the current request belongs to
+        
+        Returns:
+            Tuple of (session or None, error response or None); the error is set when
+            the request names a session that does not exist
+        """
+        session_id = requested_session_id()
+        session = session_manager.resolve_session(session_id)
+        if session_id and session is None:
+            return None, (jsonify({'error': f'Session {session_id} not found'}), 404)
+        return session, None
     
     @monitoring_bp.route('/set-context', methods=['POST'])
     def set_context():
@@ -25,15 +119,23 @@ def create_monitoring_routes(session_manager: SessionManager, audio_handler: Aud
             if not project_path:
                 return jsonify({'error': 'Project context cannot be empty'}), 400
             
-            # End any existing session
-            session_manager.end_current_session()
+            # One spelling per folder, so sessions, indexes and watcher events all agree on it
+            project_path = project_key(project_path)
+            if not os.path.isdir(project_path):
+                return jsonify({'error': f'Project path is not a directory: {project_path}'}), 400
             
             # Create new session
             session = session_manager.create_session(project_path)
             
-            # Update STT service with the new monitored path (no continuous monitoring needed)
+            # End the caller's previous session, if it named one; other clients' sessions stay active.
+            # Ending it after the new one exists keeps a same-project index from being released.
+            session_id = requested_session_id()
+            if session_id and session_id != session.session_id:
+                session_manager.end_session(session_id, reason='replaced')
+            
+            # Load the project's index (a lookup if it is already loaded and watched)
             if stt_service:
-                stt_service.update_monitored_path(project_path)
+                stt_service.ensure_monitored_path(project_path)
             
             return jsonify({
                 'message': f'Folder structure loaded: {project_path}',
@@ -50,17 +152,31 @@ def create_monitoring_routes(session_manager: SessionManager, audio_handler: Aud
     @monitoring_bp.route('/status', methods=['GET'])
     def get_monitoring_status():
         """Get current monitoring status and recent events"""
-        session_status = session_manager.get_session_status()
+        session, error = request_session()
+        if error:
+            return error
+        session_status = session_manager.get_session_status(session)
         
         return jsonify({
-            'session': session_status
+            'session': session_status,
+            'projects': stt_service.mappers.get_stats() if stt_service else None,
+            'transcription_jobs': job_queue.get_stats() if job_queue else None,
+            'admission': admission.get_stats(),
+            'transcript_cache': stt_service.transcript_cache.get_stats() if stt_service and stt_service.transcript_cache else None,
+            'upstream': stt_service.provider.upstream.get_stats() if stt_service and hasattr(stt_service.provider, 'upstream') else None
         })
     
     @monitoring_bp.route('/stop', methods=['POST'])
     def stop_monitoring():
-        """Stop current session"""
+        """Stop the caller's session (the current one when no session ID is sent)"""
         try:
-            ended_session = session_manager.end_current_session()
+            session_id = requested_session_id()
+            if session_id:
+                ended_session = session_manager.end_session(session_id)
+                if ended_session is None:
+                    return jsonify({'error': f'Session {session_id} not found'}), 404
+            else:
+                ended_session = session_manager.end_current_session()
             
             return jsonify({
                 'message': 'Session ended',
@@ -72,68 +188,270 @@ def create_monitoring_routes(session_manager: SessionManager, audio_handler: Aud
     
     @monitoring_bp.route('/sessions', methods=['GET'])
     def get_all_sessions():
-        """Get all monitoring sessions"""
-        sessions = session_manager.get_all_sessions()
+        """Get one page of monitoring sessions, newest first"""
+        try:
+            limit = int(request.args.get('limit', SESSIONS_PAGE_DEFAULT))
+            cursor = request.args.get('cursor')
+            before = int(cursor) if cursor else None
+        except ValueError:
+            return jsonify({'error': 'limit and cursor must be integers'}), 400
+        if limit < 1 or (before is not None and before < 1):
+            return jsonify({'error': 'limit and cursor must be positive'}), 400
+        
+        active_only = request.args.get('active', '').lower() in ('1', 'true', 'yes')
+        sessions, next_cursor = session_manager.list_sessions(min(limit, SESSIONS_PAGE_MAX), before, active_only)
+        stats = session_manager.get_stats()
         return jsonify({
             'sessions': [session.to_dict() for session in sessions],
-            'total': len(sessions)
+            'next_cursor': str(next_cursor) if next_cursor is not None else None,
+            'total': stats['active'] + stats['history'],
+            'active': stats['active']
         })
     
+    def transcription_body(result: dict, filename: str) -> dict:
+        """Build the response body for a successful transcription"""
+        response_data = {
+            'transcription': result['transcript'],
+            'confidence': result['confidence'],
+            'model': result['model'],
+            'filename': filename,
+            'message': 'Audio transcribed successfully'
+        }
+        
+        # Add file replacement information if available
+        if 'original_transcript' in result:
+            response_data['original_transcript'] = result['original_transcript']
+            response_data['file_replacements_applied'] = result.get('file_replacements_applied', False)
+        if result.get('ambiguous_filenames'):
+            response_data['ambiguous_filenames'] = result['ambiguous_filenames']
+        if 'cached' in result:
+            response_data['cached'] = result['cached']
+        if result.get('audio'):
+            response_data['audio'] = result['audio']
+        if result.get('upstream_attempts'):
+            response_data['upstream_attempts'] = result['upstream_attempts']
+        if result.get('timings'):
+            response_data['timings'] = result['timings']
+        
+        return response_data
+    
+    def job_body(job: TranscriptionJob) -> dict:
+        """Build the response body describing a transcription job"""
+        body = job.to_dict()
+        if job.result is not None:
+            body['result'] = transcription_body(job.result, job.filename)
+        return body
+    
     @monitoring_bp.route('/transcribe', methods=['POST'])
     def transcribe_audio():
-        """Transcribe audio using Nova-3 STT"""
+        """Transcribe audio using Nova-3 STT (add mode=job to get a job ID back immediately)"""
+        ticket, rejection = admit_upload()
+        if rejection:
+            return rejection
+        ticket_owned_by_job = False
         try:
-            # Check if audio file is in request
-            if 'audio' not in request.files:
-                return jsonify({'error': 'No audio file provided'}), 400
-            
-            audio_file = request.files['audio']
-            if audio_file.filename == '':
-                return jsonify({'error': 'No audio file selected'}), 400
+            # Per-stage timings feed the metrics histograms; ?timings=1 also returns them
+            report_timings = request.args.get('timings', '').lower() in ('1', 'true', 'yes')
+            timings = StageTimings(report=report_timings) if METRICS.enabled or report_timings else None
             
-            # Process audio file in memory (temporary file)
-            if audio_handler:
-                temp_file_path, filename = audio_handler.process_uploaded_file(audio_file)
-            else:
+            if not audio_handler:
                 return jsonify({'error': 'Audio handler not available'}), 500
             
+            # Parse the multipart body and keep the audio in memory (large recordings are
+            # spilled to a temp file), timed together as reading the upload
+            with stage(timings, 'upload_read'):
+                audio_file = request.files.get('audio')
+                upload = audio_handler.receive_upload(audio_file, timings) if audio_file and audio_file.filename else None
+            if upload is None:
+                message = 'No audio file provided' if audio_file is None else 'No audio file selected'
+                return jsonify({'error': message}), 400
+            
             try:
-                # Refresh folder structure before transcription (on-demand scanning)
+                job_mode = (request.args.get('mode') or request.form.get('mode')) == 'job'
+                if job_mode and not job_queue:
+                    return jsonify({'error': 'Transcription jobs not available'}), 500
+                
+                current_session, error = request_session()
+                if error:
+                    return error
+                
+                # Map filenames from the session's project, or the default project (if configured)
+                current_path = current_session.path if current_session else None
+                
+                if job_mode:
+                    # The job owns the upload (and the ticket) from here and releases them when done
+                    try:
+                        job = job_queue.submit(upload, current_path, timings, on_finish=ticket.release)
+                        ticket_owned_by_job = True
+                    except JobQueueFullError as e:
+                        return jsonify({'error': str(e)}), 503, {'Retry-After': str(admission.retry_after())}
+                    
+                    status_url = url_for('monitoring.get_transcription_job', job_id=job.job_id)
+                    body = job_body(job)
+                    body['status_url'] = status_url
+                    body['events_url'] = url_for('monitoring.stream_transcription_job', job_id=job.job_id)
+                    return jsonify(body), 202, {'Location': status_url}
+                
                 if stt_service:
-                    # Get current session path or default to current directory
-                    current_session = session_manager.get_current_session()
-                    current_path = current_session.path if current_session else "."
-                    stt_service.update_monitored_path(current_path)
+                    # Trim silence and downsample before anything goes upstream
+                    with stage(timings, 'preprocess'):
+                        audio_stats = audio_handler.preprocess_upload(upload)
                     
-                    # Transcribe using Nova-3 STT
-                    result = stt_service.transcribe_file(temp_file_path)
+                    # Transcribe using Nova-3 STT (the project's index is loaded or refreshed if stale)
+                    if upload.in_memory:
+                        result = stt_service.transcribe_buffer(upload.data, current_path, timings,
+                                                               content_type=upload.content_type)
+                    else:
+                        result = stt_service.transcribe_file(upload.path, current_path, timings,
+                                                             content_type=upload.content_type)
                     
+                    if audio_stats:
+                        result['audio'] = audio_stats
+                    if timings is not None:
+                        timings.finish()
+                        if timings.report:
+                            result['timings'] = timings.to_dict()
                     if result['success']:
-                        response_data = {
-                            'transcription': result['transcript'],
-                            'confidence': result['confidence'],
-                            'model': result['model'],
-                            'filename': filename,
-                            'message': 'Audio transcribed successfully'
-                        }
-                        
-                        # Add file replacement information if available
-                        if 'original_transcript' in result:
-                            response_data['original_transcript'] = result['original_transcript']
-                            response_data['file_replacements_applied'] = result.get('file_replacements_applied', False)
-                        
-                        return jsonify(response_data), 200
+                        return jsonify(transcription_body(result, upload.filename)), 200
                     else:
                         return jsonify({'error': f'Transcription failed: {result["error"]}'}), 500
                 else:
                     return jsonify({'error': 'STT service not available'}), 500
                     
             finally:
-                # Always clean up the temporary file
-                audio_handler.cleanup_temp_file(temp_file_path)
+                # Always drop the audio (and any spilled temp file) unless a job took it over
+                if not ticket_owned_by_job:
+                    audio_handler.release_upload(upload)
                 
+        except RequestEntityTooLarge:
+            return too_large_response()
         except Exception as e:
             return jsonify({'error': f'Transcription failed: {str(e)}'}), 500
+        finally:
+            if not ticket_owned_by_job:
+                ticket.release()
+    
+    @monitoring_bp.route('/transcribe/batch', methods=['POST'])
+    def transcribe_batch():
+        """Transcribe many recordings against one folder index, streaming NDJSON results as they complete"""
+        ticket, rejection = admit_upload()
+        if rejection:
+            return rejection
+        streaming = False
+        uploads = []
+        
+        def release_uploads():
+            # Items release their audio as they finish; this covers the rest if the client goes away
+            for upload in uploads:
+                audio_handler.release_upload(upload)
+        
+        try:
+            if not (stt_service and audio_handler and batch_transcriber):
+                return jsonify({'error': 'Batch transcription not available'}), 500
+            
+            # Either several 'audio' parts, or a JSON manifest of files on this machine
+            if request.is_json:
+                data = request.get_json(silent=True)
+                paths = data.get('files') if isinstance(data, dict) else None
+                if not isinstance(paths, list) or not paths or not all(isinstance(path, str) for path in paths):
+                    return jsonify({'error': 'Manifest must be {"files": ["path", ...]}'}), 400
+                parts = []
+                names = paths
+            else:
+                parts = [part for part in request.files.getlist('audio') if part.filename]
+                if not parts:
+                    return jsonify({'error': 'No audio files provided'}), 400
+                names = [part.filename for part in parts]
+            
+            if len(names) > batch_transcriber.max_items:
+                return jsonify({'error': f'Batch has {len(names)} items; at most {batch_transcriber.max_items} are allowed'}), 400
+            
+            current_session, error = request_session()
+            if error:
+                return error
+            current_path = current_session.path if current_session else None
+            
+            if parts:
+                # Parts are closed with the request, before the response streams, so read
+                # them now (large ones are spilled to temp files)
+                try:
+                    for part in parts:
+                        uploads.append(audio_handler.receive_upload(part))
+                except Exception as e:
+                    release_uploads()
+                    return jsonify({'error': f'Failed to read uploads: {str(e)}'}), 500
+                items = [(name, lambda upload=upload: upload) for name, upload in zip(names, uploads)]
+            else:
+                # Manifest files are read by the worker that transcribes them
+                try:
+                    real_paths = [batch_transcriber.resolve_manifest_path(path) for path in names]
+                except ValueError as e:
+                    return jsonify({'error': str(e)}), 400
+                items = [(name, lambda real_path=real_path: audio_handler.open_local(real_path))
+                         for name, real_path in zip(names, real_paths)]
+            
+            def lines():
+                for record in batch_transcriber.run(items, current_path):
+                    if record['type'] == 'result':
+                        line = {'type': 'result', 'index': record['index'], 'name': record['name']}
+                        if record['success']:
+                            line.update(transcription_body(record, record['name']))
+                        else:
+                            line['error'] = f"Transcription failed: {record['error']}"
+                            line['timings'] = record['timings']
+                        record = line
+                    yield json.dumps(record) + '\n'
+            
+            response = Response(lines(), mimetype='application/x-ndjson',
+                                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+            response.call_on_close(release_uploads)
+            response.call_on_close(ticket.release)
+            streaming = True
+            return response
+        except RequestEntityTooLarge:
+            return too_large_response()
+        except Exception as e:
+            if not streaming:
+                release_uploads()
+            return jsonify({'error': f'Batch transcription failed: {str(e)}'}), 500
+        finally:
+            # A streaming batch holds its capacity until the response is closed
+            if not streaming:
+                ticket.release()
+    
+    @monitoring_bp.route('/transcribe/<job_id>', methods=['GET'])
+    def get_transcription_job(job_id):
+        """Poll a transcription job for its status and result"""
+        job = job_queue.get_job(job_id) if job_queue else None
+        if job is None:
+            return jsonify({'error': f'Transcription job {job_id} not found'}), 404
+        return jsonify(job_body(job)), 200
+    
+    @monitoring_bp.route('/transcribe/<job_id>/events', methods=['GET'])
+    def stream_transcription_job(job_id):
+        """Stream a transcription job's status changes and result as server-sent events"""
+        if not job_queue or job_queue.get_job(job_id) is None:
+            return jsonify({'error': f'Transcription job {job_id} not found'}), 404
+        
+        def events():
+            seen_version = -1
+            while True:
+                job = job_queue.wait_for_update(job_id, seen_version, timeout=SSE_KEEPALIVE_INTERVAL)
+                if job is None:
+                    yield f"event: error\ndata: {json.dumps({'error': 'Transcription job expired'})}\n\n"
+                    return
+                if job.version == seen_version and not job.is_finished:
+                    yield ": keep-alive\n\n"  # Stops proxies from closing an idle stream
+                    continue
+                
+                seen_version = job.version
+                event_type = 'result' if job.is_finished else 'status'
+                yield f"event: {event_type}\ndata: {json.dumps(job_body(job))}\n\n"
+                if job.is_finished:
+                    return
+        
+        return Response(events(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
     
     @monitoring_bp.route('/audio-files', methods=['GET'])
     def get_audio_files():
@@ -153,22 +471,92 @@ def create_monitoring_routes(session_manager: SessionManager, audio_handler: Aud
     
     @monitoring_bp.route('/folder-structure', methods=['GET'])
     def get_folder_structure():
-        """Get the current folder structure for file path mapping"""
+        """Get the session's folder structure for file path mapping (?since=<version> for only the changes)"""
+        since = request.args.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                return jsonify({'error': 'since must be an integer version'}), 400
+        
         try:
             if stt_service:
-                structure = stt_service.get_folder_structure()
-                ignored_dirs = stt_service.file_mapper.get_ignored_directories()
-                return jsonify({
-                    'folder_structure': structure,
-                    'ignored_directories': ignored_dirs,
-                    'monitored_path': stt_service.file_mapper.monitored_path,
-                    'total_files_tracked': len(stt_service.file_mapper.file_map)
-                }), 200
+                session, error = request_session()
+                if error:
+                    return error
+                mapper = stt_service.ensure_monitored_path(session.path if session else None)
+                snapshot = mapper.snapshot()  # One consistent index even if a refresh lands meanwhile
+                details = {
+                    'ignored_directories': mapper.get_ignored_directories(),
+                    'monitored_path': mapper.monitored_path,
+                    'total_files_tracked': len(snapshot.index),
+                    'watch_backend': stt_service.mappers.watch_backend(mapper.monitored_path),
+                    'version': snapshot.version
+                }
+                # The index version covers the files; the checksum covers everything else in the body
+                details_crc = zlib.crc32(json.dumps(details, sort_keys=True).encode('utf-8'))
+                etag = f"{snapshot.version}-{details_crc:08x}"
+                if request.if_none_match.contains_weak(etag):
+                    response = Response(status=304)
+                    response.set_etag(etag, weak=True)
+                    response.headers['Vary'] = 'Accept-Encoding'
+                    return response
+                
+                if since is not None:
+                    changes = mapper.get_folder_structure_changes(since, snapshot)
+                    if changes is not None:
+                        body = json.dumps(dict(details, since=since, **changes)).encode('utf-8')
+                        return json_bytes_response(body, etag)
+                    # since is too old or from another index; fall back to the whole structure
+                
+                with structure_cache_lock:
+                    cached = structure_cache.get(etag)
+                    if cached is not None:
+                        structure_cache.move_to_end(etag)
+                if cached is None:
+                    body = json.dumps(dict(details, folder_structure=mapper.get_folder_structure_summary(snapshot))).encode('utf-8')
+                    cached = (body, gzip.compress(body) if len(body) >= GZIP_MIN_BYTES else None)
+                    with structure_cache_lock:
+                        structure_cache[etag] = cached
+                        while len(structure_cache) > FOLDER_STRUCTURE_CACHE_ENTRIES:
+                            structure_cache.popitem(last=False)
+                return json_bytes_response(cached[0], etag, cached[1])
             else:
                 return jsonify({'error': 'STT service not available'}), 500
         except Exception as e:
             return jsonify({'error': f'Failed to get folder structure: {str(e)}'}), 500
     
+    @monitoring_bp.route('/resolve', methods=['GET'])
+    def resolve_filename():
+        """Resolve a spoken or partial filename to ranked file path candidates"""
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'error': 'Missing q query parameter'}), 400
+        
+        try:
+            limit = int(request.args.get('limit', 5))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        if not stt_service:
+            return jsonify({'error': 'STT service not available'}), 500
+        
+        session, error = request_session()
+        if error:
+            return error
+        path = session.path if session else stt_service.default_path
+        
+        # Reads the loaded index only; at typing speed a rescan would dominate
+        mapper = stt_service.mappers.peek(path) or stt_service.ensure_monitored_path(path)
+        candidates = mapper.resolve_filename(query, limit=max(1, min(limit, 50)))
+        return jsonify({
+            'query': query,
+            'candidates': [
+                {'filename': filename, 'path': f"@{path}", 'score': score}
+                for filename, path, score in candidates
+            ]
+        }), 200
+    
     @monitoring_bp.route('/cleanup-temp', methods=['POST'])
     def cleanup_temp_files():
         """Clean up all temporary audio files"""
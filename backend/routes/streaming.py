@@ -0,0 +1,116 @@
+"""
+Streaming routes for live transcription over WebSocket
+"""
+import json
+import time
+from typing import Optional
+
+from flask import Blueprint
+
+try:
+    from flask_sock import Sock
+    from simple_websocket import ConnectionClosed
+except ImportError:  # flask-sock is optional; live streaming is then unavailable
+    Sock = None
+    ConnectionClosed = Exception
+
+from .monitoring import requested_session_id
+from ..services.session_manager import SessionManager
+from ..services.nova3_stt import Nova3STTService
+from ..services.streaming_stt import LiveTranscription, StreamingSTTBackend
+
+# Seconds to wait for a client message before flushing queued transcripts
+RECEIVE_POLL_INTERVAL = 0.05
+
+def create_streaming_routes(session_manager: SessionManager, stt_service: Nova3STTService,
+                            streaming_backend: StreamingSTTBackend, idle_timeout: float = 30.0) -> Optional[Blueprint]:
+    """
+    Create the live transcription WebSocket route with injected dependencies
+    
+    Protocol: the client sends binary MediaRecorder chunks as they are produced and
+    {"type": "stop"} when recording ends. The server sends {"type": "ready"}, then
+    "interim" and "final" messages (finals have file path replacement applied),
+    and a closing "done" message shaped like the /transcribe response.
+    
+    Returns:
+        The blueprint to register, or None when flask-sock is not installed
+    """
+    if Sock is None:
+        print("Warning: flask-sock is not installed; live transcription at /api/v1/monitoring/stream is disabled")
+        return None
+    
+    # Built per app: routes cannot be added to a blueprint another app already registered
+    streaming_bp = Blueprint('streaming', __name__, url_prefix='/api/v1/monitoring')
+    sock = Sock()
+    
+    @sock.route('/stream', bp=streaming_bp)
+    def stream_audio(ws):
+        """Transcribe audio chunks live as they are recorded"""
+        def send(message: dict):
+            ws.send(json.dumps(message))
+        
+        # Browsers can't set headers on a WebSocket, so the session comes as ?session_id=
+        session_id = requested_session_id()
+        current_session = session_manager.resolve_session(session_id)
+        if session_id and current_session is None:
+            send({'type': 'error', 'error': f'Session {session_id} not found'})
+            return
+        
+        # Make sure the project's index is current before finals start arriving
+        current_path = current_session.path if current_session else None
+        mapper = stt_service.ensure_monitored_path(current_path)
+        
+        live = LiveTranscription(streaming_backend, mapper.replace_filenames_in_text)
+        try:
+            live.start()
+        except Exception as e:
+            send({'type': 'error', 'error': f'Failed to start live transcription: {str(e)}'})
+            return
+        
+        send({'type': 'ready', 'model': streaming_backend.name})
+        finished = False
+        try:
+            last_message = time.monotonic()
+            while True:
+                message = ws.receive(timeout=RECEIVE_POLL_INTERVAL)
+                if message is None:
+                    if time.monotonic() - last_message > idle_timeout:
+                        send({'type': 'error', 'error': f'No audio received for {idle_timeout:.0f}s'})
+                        break
+                elif isinstance(message, (bytes, bytearray)):
+                    last_message = time.monotonic()
+                    live.send(message)
+                    if current_session:
+                        current_session.touch()  # A live stream keeps its session from expiring
+                else:
+                    last_message = time.monotonic()
+                    try:
+                        control = json.loads(message)
+                    except ValueError:
+                        control = {'type': message}
+                    if isinstance(control, dict) and control.get('type') == 'stop':
+                        break
+                
+                for pending in live.take_messages():
+                    send(pending)
+            
+            summary = live.finish()
+            finished = True
+            for pending in live.take_messages():
+                send(pending)
+            send({'type': 'done', **summary})
+        except ConnectionClosed:
+            pass  # Client went away; nothing left to send
+        except Exception as e:
+            try:
+                send({'type': 'error', 'error': f'Live transcription failed: {str(e)}'})
+            except ConnectionClosed:
+                pass
+        finally:
+            if not finished:
+                try:
+                    live.finish()
+                except Exception as e:
+                    print(f"Warning: Failed to close live transcription stream: {e}")
+    
+    return streaming_bp
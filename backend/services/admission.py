@@ -0,0 +1,135 @@
+"""
+Admission Service for bounding in-flight transcriptions and buffered upload bytes
+"""
+import math
+import threading
+import time
+from typing import Optional
+
+# Bounds of the Retry-After hint, in seconds
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; carries the HTTP status and Retry-After hint"""
+    
+    def __init__(self, message: str, status: int, retry_after: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionTicket:
+    """Capacity held by one admitted request until release() (safe to call more than once)"""
+    
+    def __init__(self, controller: "AdmissionController", reserved_bytes: int):
+        self.reserved_bytes = reserved_bytes
+        self._controller = controller
+        self._admitted_at = time.monotonic()
+        self._released = False
+    
+    def release(self):
+        self._controller._release(self)
+
+
+class AdmissionController:
+    """
+    Admits uploads only while in-flight requests and buffered bytes are under their limits
+    
+    Capacity is reserved from the request's Content-Length before the body is read,
+    so a burst is turned away with 429 instead of being buffered. Every refusal
+    carries Retry-After, estimated from how long admitted requests have recently
+    held their capacity.
+    """
+    
+    def __init__(self, max_in_flight: int = 0, max_buffered_bytes: int = 0, max_upload_bytes: int = 0):
+        """
+        Initialize the controller (a limit of 0 disables that check)
+        
+        Args:
+            max_in_flight: Requests admitted at once
+            max_buffered_bytes: Upload bytes admitted at once, across requests
+            max_upload_bytes: Largest single request body
+        """
+        self.max_in_flight = max_in_flight
+        self.max_buffered_bytes = max_buffered_bytes
+        self.max_upload_bytes = max_upload_bytes
+        self.in_flight = 0
+        self.buffered_bytes = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._hold_seconds = 1.0  # Moving average of how long tickets are held
+        self._lock = threading.Lock()
+    
+    def admit(self, content_length: Optional[int]) -> AdmissionTicket:
+        """
+        Reserve capacity for one request
+        
+        Args:
+            content_length: The request's Content-Length; None when unknown (chunked),
+                in which case the largest allowed upload is reserved
+        
+        Returns:
+            A ticket to release once the upload is no longer held
+        
+        Raises:
+            AdmissionRejected: 413 when the body can never fit, 429 when capacity is busy
+        """
+        if self.max_upload_bytes and content_length is not None and content_length > self.max_upload_bytes:
+            raise self._too_large(f"Upload of {content_length} bytes is over the {self.max_upload_bytes} byte limit")
+        reserved = content_length if content_length is not None else self.max_upload_bytes
+        if self.max_buffered_bytes and reserved > self.max_buffered_bytes:
+            raise self._too_large(f"Upload of {reserved} bytes is over the {self.max_buffered_bytes} byte buffer budget")
+        
+        with self._lock:
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                reason = f"{self.in_flight} transcriptions already in progress"
+            elif self.max_buffered_bytes and self.buffered_bytes + reserved > self.max_buffered_bytes:
+                reason = f"{self.buffered_bytes} upload bytes already buffered"
+            else:
+                self.in_flight += 1
+                self.buffered_bytes += reserved
+                self.admitted += 1
+                return AdmissionTicket(self, reserved)
+            self.rejected += 1
+            retry_after = self._retry_after()
+        raise AdmissionRejected(f"Server busy ({reason}). Retry in {retry_after}s.", 429, retry_after)
+    
+    def retry_after(self) -> int:
+        """Seconds a refused client should wait before retrying"""
+        with self._lock:
+            return self._retry_after()
+    
+    def get_stats(self) -> dict:
+        """Get occupancy and counters for status endpoints"""
+        with self._lock:
+            return {
+                'in_flight': self.in_flight,
+                'buffered_bytes': self.buffered_bytes,
+                'max_in_flight': self.max_in_flight,
+                'max_buffered_bytes': self.max_buffered_bytes,
+                'max_upload_bytes': self.max_upload_bytes,
+                'admitted': self.admitted,
+                'rejected': self.rejected
+            }
+    
+    def _release(self, ticket: AdmissionTicket):
+        with self._lock:
+            if ticket._released:
+                return
+            ticket._released = True
+            self.in_flight -= 1
+            self.buffered_bytes -= ticket.reserved_bytes
+            held = time.monotonic() - ticket._admitted_at
+            self._hold_seconds += 0.2 * (held - self._hold_seconds)
+    
+    def _retry_after(self) -> int:
+        """Estimate from the average hold time (caller holds the lock)"""
+        return max(MIN_RETRY_AFTER, min(MAX_RETRY_AFTER, math.ceil(self._hold_seconds)))
+    
+    def _too_large(self, message: str) -> AdmissionRejected:
+        """Count a 413; it carries Retry-After like a 429, though the same body will never fit"""
+        with self._lock:
+            self.rejected += 1
+            return AdmissionRejected(message, 413, self._retry_after())
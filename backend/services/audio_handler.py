@@ -1,18 +1,185 @@
 """
 Audio Handler Service for in-memory audio processing
 """
+import mimetypes
 import os
+import shutil
 import tempfile
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
 import uuid
 
+from .audio_preprocessor import AudioPreprocessor
+from .metrics import StageTimings, stage
+
+# Uploads larger than this are spilled to a temp file instead of held in memory
+DEFAULT_SPILL_THRESHOLD = 8 * 1024 * 1024
+
+# Chunk size used when copying a spilled upload to disk
+_COPY_CHUNK_SIZE = 64 * 1024
+
+# Type of recordings whose type is neither declared nor known from the filename (MediaRecorder output)
+DEFAULT_CONTENT_TYPE = 'audio/webm'
+
+# Extensions whose registered type is not the audio one STT engines expect
+_AUDIO_CONTENT_TYPES = {'.webm': 'audio/webm', '.wav': 'audio/wav', '.opus': 'audio/ogg'}
+
+
+def guess_content_type(filename: Optional[str], declared: Optional[str] = None) -> str:
+    """
+    Get the MIME type of a recording
+    
+    Args:
+        filename: Name the recording was uploaded or stored under
+        declared: Type the client sent with the upload, if any
+    
+    Returns:
+        The declared type, else one guessed from the filename, else DEFAULT_CONTENT_TYPE
+    """
+    if declared and declared != 'application/octet-stream':
+        return declared
+    if not filename:
+        return DEFAULT_CONTENT_TYPE
+    extension = os.path.splitext(filename)[1].lower()
+    return _AUDIO_CONTENT_TYPES.get(extension) or mimetypes.guess_type(filename)[0] or DEFAULT_CONTENT_TYPE
+
+
+@dataclass
+class AudioUpload:
+    """An uploaded recording, held in memory or spilled to a temporary file"""
+    filename: str
+    size: int
+    data: Optional[bytes] = None  # Set when the upload is held in memory
+    path: Optional[str] = None  # Set when the upload was spilled to disk
+    keep_file: bool = False  # path is the caller's file (not a temp copy) and must not be deleted
+    content_type: str = DEFAULT_CONTENT_TYPE  # Sent upstream as the audio's Content-Type
+    
+    @property
+    def in_memory(self) -> bool:
+        return self.path is None
+
+
 class AudioHandler:
     """Service for handling audio file operations in memory"""
     
-    def __init__(self):
+    def __init__(self, spill_threshold: int = DEFAULT_SPILL_THRESHOLD, preprocessor: Optional[AudioPreprocessor] = None):
         # Create temp directory inside backend folder
         self.temp_dir = os.path.join(os.path.dirname(__file__), '..', 'temp')
         os.makedirs(self.temp_dir, exist_ok=True)
+        self.spill_threshold = spill_threshold
+        self.preprocessor = preprocessor
+    
+    def _make_filename(self) -> str:
+        """Generate a unique display name for a recording"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_id = uuid.uuid4().hex[:8]
+        return f"temp_recording_{timestamp}_{unique_id}.webm"
+    
+    def receive_upload(self, file_storage, timings: Optional[StageTimings] = None) -> AudioUpload:
+        """
+        Read an uploaded audio file, keeping it in memory unless it is large
+        
+        Small uploads are read once into bytes that go straight to the STT client.
+        Uploads above spill_threshold are streamed to a temp file in chunks so a
+        long recording never sits in memory whole; release_upload removes it.
+        
+        Args:
+            file_storage: Werkzeug FileStorage object
+            timings: Optional request timings; the temp-file copy is timed as spill_write
+            
+        Returns:
+            AudioUpload with either data or path set
+        """
+        if not file_storage:
+            raise ValueError("No file_storage object provided.")
+        
+        filename = self._make_filename()
+        content_type = guess_content_type(file_storage.filename, file_storage.mimetype)
+        stream = file_storage.stream
+        
+        # Read one byte past the threshold to learn whether the upload fits
+        limit = self.spill_threshold + 1
+        data = stream.read(limit)
+        while len(data) < limit:
+            more = stream.read(limit - len(data))
+            if not more:
+                return AudioUpload(filename=filename, size=len(data), data=data, content_type=content_type)
+            data += more
+        
+        temp_fd, temp_path = tempfile.mkstemp(suffix='.webm', prefix='audio_', dir=self.temp_dir)
+        try:
+            with stage(timings, 'spill_write'), os.fdopen(temp_fd, 'wb') as temp_file:
+                temp_file.write(data)
+                size = len(data)
+                del data
+                while True:
+                    chunk = stream.read(_COPY_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    temp_file.write(chunk)
+                    size += len(chunk)
+        except Exception:
+            self.cleanup_temp_file(temp_path)
+            raise
+        
+        return AudioUpload(filename=filename, size=size, path=temp_path, content_type=content_type)
+    
+    def open_local(self, file_path: str) -> AudioUpload:
+        """
+        Use an audio file already on this machine as an upload
+        
+        Small files are read into memory (so they can be preprocessed); larger ones
+        are streamed from where they are, and release_upload leaves them in place.
+        
+        Args:
+            file_path: Path of the audio file
+            
+        Returns:
+            AudioUpload with either data or path set
+        """
+        size = os.path.getsize(file_path)
+        filename = os.path.basename(file_path)
+        content_type = guess_content_type(filename)
+        if size <= self.spill_threshold:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+            return AudioUpload(filename=filename, size=len(data), data=data, content_type=content_type)
+        return AudioUpload(filename=filename, size=size, path=file_path, keep_file=True, content_type=content_type)
+    
+    def preprocess_upload(self, upload: AudioUpload) -> Optional[dict]:
+        """
+        Trim silence and downsample an upload in place before it is transcribed
+        
+        Only in-memory uploads are preprocessed; spilled ones are long enough that
+        decoding them whole would cost more memory than the upload itself.
+        
+        Args:
+            upload: The upload returned by receive_upload
+            
+        Returns:
+            Original and processed sizes and durations, or None when preprocessing is off
+        """
+        if self.preprocessor is None or not upload.in_memory:
+            return None
+        
+        processed = self.preprocessor.process(upload.data)
+        upload.data = processed.data
+        upload.size = processed.processed_bytes
+        if processed.applied:
+            upload.content_type = processed.content_type
+        return processed.to_dict()
+    
+    def release_upload(self, upload: AudioUpload):
+        """
+        Release an upload once it has been transcribed
+        
+        Args:
+            upload: The upload returned by receive_upload or open_local
+        """
+        if upload.path and not upload.keep_file:
+            self.cleanup_temp_file(upload.path)
+        upload.data = None
     
     def process_uploaded_file(self, file_storage) -> tuple[str, str]:
         """
@@ -28,23 +195,17 @@ class AudioHandler:
             raise ValueError("No file_storage object provided.")
         
         # Generate unique filename
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        unique_id = uuid.uuid4().hex[:8]
-        filename = f"temp_recording_{timestamp}_{unique_id}.webm"
-        
-        # Read the uploaded file data
-        file_data = file_storage.read()
+        filename = self._make_filename()
         
         # Create temporary file in backend/temp directory
         temp_fd, temp_path = tempfile.mkstemp(suffix='.webm', prefix='audio_', dir=self.temp_dir)
         
         try:
-            # Write data to temporary file
+            # Copy the upload in chunks rather than reading it into memory whole
             with os.fdopen(temp_fd, 'wb') as temp_file:
-                temp_file.write(file_data)
+                shutil.copyfileobj(file_storage.stream, temp_file, _COPY_CHUNK_SIZE)
         except Exception:
-            # If writing fails, close the file descriptor
-            os.close(temp_fd)
+            self.cleanup_temp_file(temp_path)
             raise
         
         return temp_path, filename
@@ -0,0 +1,254 @@
+"""
+Audio Preprocessor Service for trimming silence and downsampling uploads before STT
+"""
+import importlib.util
+import io
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# numpy is optional (preprocessing is disabled without it) and slow to import,
+# so it is imported with the first recording rather than at startup
+np = None
+HAS_NUMPY = importlib.util.find_spec('numpy') is not None
+
+# Speech models gain nothing from more than 16 kHz mono
+TARGET_SAMPLE_RATE = 16000
+
+# Opus bitrate used when ffmpeg re-encodes the trimmed audio
+OPUS_BITRATE = '24k'
+
+# Seconds ffmpeg may take to decode or encode one upload
+_FFMPEG_TIMEOUT = 60
+
+
+def _load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+
+@dataclass
+class PreprocessedAudio:
+    """Audio ready for the STT provider, with before/after sizes and durations"""
+    data: bytes
+    format: str  # 'opus', 'wav', or 'original' when the upload is sent untouched
+    original_bytes: int
+    processed_bytes: int
+    original_duration: Optional[float] = None  # seconds
+    processed_duration: Optional[float] = None
+    
+    @property
+    def applied(self) -> bool:
+        return self.format != 'original'
+    
+    @property
+    def content_type(self) -> Optional[str]:
+        """MIME type of data when it was re-encoded (Opus is written in an Ogg container)"""
+        return {'opus': 'audio/ogg', 'wav': 'audio/wav'}.get(self.format)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'preprocessed': self.applied,
+            'format': self.format,
+            'original_bytes': self.original_bytes,
+            'processed_bytes': self.processed_bytes,
+            'original_duration': round(self.original_duration, 3) if self.original_duration is not None else None,
+            'processed_duration': round(self.processed_duration, 3) if self.processed_duration is not None else None
+        }
+
+
+class AudioPreprocessor:
+    """
+    Decodes an upload, downmixes it to mono 16 kHz and trims leading and trailing silence
+    
+    Silence is found with vectorized frame energy (RMS in dBFS) over the whole clip.
+    WAV is decoded with the standard library; other containers (MediaRecorder
+    WebM/Opus) need ffmpeg, which is also used to re-encode the result as Opus.
+    Without ffmpeg the result is 16-bit WAV. Recordings longer than max_seconds
+    are sent untouched rather than decoded whole into memory.
+    """
+    
+    def __init__(self, sample_rate: int = TARGET_SAMPLE_RATE, silence_threshold_db: float = -40.0,
+                 frame_ms: float = 20.0, padding_ms: float = 250.0, ffmpeg_path: str = 'ffmpeg',
+                 max_seconds: float = 600.0, min_saving: float = 0.1):
+        """
+        Initialize the preprocessor
+        
+        Args:
+            sample_rate: Output sample rate in Hz
+            silence_threshold_db: Frames quieter than this (dBFS) count as silence
+            frame_ms: Length of the frames energy is measured over
+            padding_ms: Audio kept on either side of the first and last voiced frame
+            ffmpeg_path: ffmpeg executable name or path
+            max_seconds: Longest recording decoded (0 for no limit)
+            min_saving: Fraction of the bytes or of the duration the processed audio
+                must save to be sent instead of the original
+        """
+        self.sample_rate = sample_rate
+        self.silence_threshold_db = silence_threshold_db
+        self.frame_ms = frame_ms
+        self.padding_ms = padding_ms
+        self.ffmpeg = shutil.which(ffmpeg_path) if ffmpeg_path else None
+        self.max_seconds = max_seconds
+        self.min_saving = min_saving
+    
+    @property
+    def available(self) -> bool:
+        """Whether preprocessing can run at all (numpy is installed)"""
+        return HAS_NUMPY
+    
+    def process(self, data: bytes) -> PreprocessedAudio:
+        """
+        Preprocess one recording
+        
+        The original is kept whenever it cannot be decoded, is over max_seconds, or
+        when the processed audio would not save min_saving of its bytes or duration.
+        
+        Args:
+            data: Encoded audio (WAV, or anything ffmpeg can decode)
+        
+        Returns:
+            PreprocessedAudio with the bytes to send
+        """
+        original = PreprocessedAudio(data=data, format='original', original_bytes=len(data), processed_bytes=len(data))
+        if not self.available:
+            return original
+        _load_numpy()
+        
+        try:
+            samples = self._decode(data)
+            if samples is None:
+                return original
+            original_duration = len(samples) / self.sample_rate
+            start, end = self.speech_bounds(samples)
+            trimmed = samples[start:end]
+            processed, audio_format = self._encode(trimmed)
+        except (OSError, ValueError, EOFError, wave.Error, subprocess.SubprocessError) as e:
+            print(f"Warning: Audio preprocessing failed, sending the original upload: {e}")
+            return original
+        
+        original.original_duration = original_duration
+        processed_duration = len(trimmed) / self.sample_rate
+        saved_bytes = 1 - len(processed) / len(data)
+        saved_duration = 1 - processed_duration / original_duration if original_duration else 0.0
+        if max(saved_bytes, saved_duration) < self.min_saving:
+            return original
+        return PreprocessedAudio(
+            data=processed,
+            format=audio_format,
+            original_bytes=len(data),
+            processed_bytes=len(processed),
+            original_duration=original_duration,
+            processed_duration=processed_duration
+        )
+    
+    def speech_bounds(self, samples: "np.ndarray") -> Tuple[int, int]:
+        """
+        Find where speech starts and ends
+        
+        Args:
+            samples: Mono float samples in [-1, 1] at the output sample rate
+        
+        Returns:
+            (start, end) sample indices; the whole clip when no frame is voiced
+        """
+        _load_numpy()
+        frame = max(1, int(self.sample_rate * self.frame_ms / 1000))
+        count = len(samples) // frame
+        if count == 0:
+            return 0, len(samples)
+        
+        frames = samples[:count * frame].reshape(count, frame)
+        rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        level_db = 20 * np.log10(np.maximum(rms, 1e-10))
+        voiced = np.flatnonzero(level_db > self.silence_threshold_db)
+        if voiced.size == 0:
+            return 0, len(samples)  # Nothing clearly voiced; let the STT engine decide
+        
+        padding = int(self.sample_rate * self.padding_ms / 1000)
+        start = max(0, int(voiced[0]) * frame - padding)
+        end = min(len(samples), (int(voiced[-1]) + 1) * frame + padding)
+        return start, end
+    
+    def _decode(self, data: bytes) -> Optional["np.ndarray"]:
+        """Decode to mono float32 at the output rate; None when no decoder applies or it is too long"""
+        if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+            return self._decode_wav(data)
+        if not self.ffmpeg:
+            return None
+        
+        # Decode one sample past the limit, so ffmpeg's output is bounded and an over-long clip still shows
+        limit = ['-t', f"{self.max_seconds + 1 / self.sample_rate:.6f}"] if self.max_seconds else []
+        pcm = self._ffmpeg(['-i', 'pipe:0', '-vn', '-ac', '1', '-ar', str(self.sample_rate), *limit,
+                            '-f', 's16le', 'pipe:1'], data)
+        if self.max_seconds and len(pcm) // 2 > self.max_seconds * self.sample_rate:
+            return None
+        return np.frombuffer(pcm, dtype='<i2').astype(np.float32) / 32768.0
+    
+    def _decode_wav(self, data: bytes) -> Optional["np.ndarray"]:
+        with wave.open(io.BytesIO(data), 'rb') as reader:
+            channels = reader.getnchannels()
+            width = reader.getsampwidth()
+            rate = reader.getframerate()
+            if self.max_seconds and reader.getnframes() > self.max_seconds * rate:
+                return None
+            frames = reader.readframes(reader.getnframes())
+        
+        if width == 1:
+            samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+        elif width == 2:
+            samples = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+        elif width == 4:
+            samples = np.frombuffer(frames, dtype='<i4').astype(np.float32) / 2147483648.0
+        else:
+            raise ValueError(f"Unsupported WAV sample width: {width * 8} bits")
+        
+        samples = samples[:len(samples) // channels * channels].reshape(-1, channels).mean(axis=1)
+        return self._resample(samples, rate)
+    
+    def _resample(self, samples: "np.ndarray", rate: int) -> "np.ndarray":
+        """Resample to the output rate, averaging first when downsampling to limit aliasing"""
+        if rate == self.sample_rate or len(samples) == 0:
+            return samples.astype(np.float32)
+        
+        if rate % self.sample_rate == 0:
+            factor = rate // self.sample_rate
+            usable = len(samples) // factor * factor
+            return samples[:usable].reshape(-1, factor).mean(axis=1).astype(np.float32)
+        
+        if rate > self.sample_rate:
+            width = int(round(rate / self.sample_rate))
+            samples = np.convolve(samples, np.full(width, 1.0 / width, dtype=np.float32), mode='same')
+        duration = len(samples) / rate
+        target = np.arange(int(duration * self.sample_rate)) / self.sample_rate
+        return np.interp(target, np.arange(len(samples)) / rate, samples).astype(np.float32)
+    
+    def _encode(self, samples: "np.ndarray") -> Tuple[bytes, str]:
+        """Encode as Opus with ffmpeg, else as 16-bit WAV"""
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes()
+        if self.ffmpeg:
+            encoded = self._ffmpeg(['-f', 's16le', '-ar', str(self.sample_rate), '-ac', '1', '-i', 'pipe:0',
+                                    '-c:a', 'libopus', '-b:a', OPUS_BITRATE, '-application', 'voip',
+                                    '-f', 'ogg', 'pipe:1'], pcm)
+            return encoded, 'opus'
+        
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(2)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(pcm)
+        return buffer.getvalue(), 'wav'
+    
+    def _ffmpeg(self, args: list, data: bytes) -> bytes:
+        completed = subprocess.run([self.ffmpeg, '-hide_banner', '-loglevel', 'error', *args],
+                                   input=data, capture_output=True, timeout=_FFMPEG_TIMEOUT)
+        if completed.returncode != 0:
+            raise ValueError(f"ffmpeg failed: {completed.stderr.decode('utf-8', errors='replace').strip()}")
+        return completed.stdout
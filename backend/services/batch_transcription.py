@@ -0,0 +1,145 @@
+"""
+Batch Transcription Service for transcribing many recordings against one folder index
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .audio_handler import AudioHandler, AudioUpload
+from .metrics import StageTimings, stage
+
+# One batch item: a display name and a callable producing its audio (run on a worker)
+BatchItem = Tuple[str, Callable[[], AudioUpload]]
+
+
+class BatchTranscriber:
+    """
+    Fans batch items out to the STT provider on a bounded worker pool
+    
+    The project's folder index is looked up (or scanned) once per batch and shared
+    by every item. The pool is shared across batches, so concurrent batches cannot
+    multiply the number of requests in flight upstream. Each item loads its audio on
+    the worker that transcribes it, so manifest files are read only as workers free up.
+    """
+    
+    def __init__(self, stt_service, audio_handler: AudioHandler, max_concurrency: int = 4,
+                 max_items: int = 500, manifest_root: Optional[str] = None):
+        """
+        Initialize the batch transcriber
+        
+        Args:
+            stt_service: Service used to transcribe items (see TranscriptionJobQueue)
+            audio_handler: Handler that preprocesses and releases each item's audio
+            max_concurrency: Items transcribed at the same time, across all batches
+            max_items: Most items accepted in one batch
+            manifest_root: Folder that manifest paths must be under; None disables manifests
+        """
+        self.stt_service = stt_service
+        self.audio_handler = audio_handler
+        self.max_concurrency = max_concurrency
+        self.max_items = max_items
+        self.manifest_root = os.path.realpath(manifest_root) if manifest_root else None
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='batch')
+    
+    def resolve_manifest_path(self, file_path: str) -> str:
+        """
+        Check a manifest entry and return its real path
+        
+        Raises:
+            ValueError: If manifests are disabled, or the path is outside manifest_root or not a file
+        """
+        if self.manifest_root is None:
+            raise ValueError("Manifest batches are disabled. Set BATCH_MANIFEST_ROOT to allow them.")
+        real_path = os.path.realpath(os.path.join(self.manifest_root, file_path))
+        if os.path.commonpath([real_path, self.manifest_root]) != self.manifest_root:
+            raise ValueError(f"Manifest path is outside BATCH_MANIFEST_ROOT: {file_path}")
+        if not os.path.isfile(real_path):
+            raise ValueError(f"Manifest file not found: {file_path}")
+        return real_path
+    
+    def run(self, items: List[BatchItem], path: Optional[str]) -> Iterator[dict]:
+        """
+        Transcribe a batch, yielding one record per item as it completes
+        
+        Items are submitted as workers free up rather than all at once, so closing
+        the iterator early (e.g., the client disconnected) leaves nothing queued.
+        
+        Args:
+            items: (name, load) pairs; load() returns the item's AudioUpload
+            path: Project whose index is used for file path replacement (None: the default project)
+        
+        Yields:
+            One dict per item in completion order ('type': 'result'), then a 'summary'
+        """
+        started = time.perf_counter()
+        index_timings = StageTimings()
+        with stage(index_timings, 'index'):
+            mapper = self.stt_service.ensure_monitored_path(path, index_timings)
+        
+        pending = {}
+        remaining = iter(enumerate(items))
+        succeeded = failed = 0
+        try:
+            while True:
+                while len(pending) < self.max_concurrency:
+                    next_item = next(remaining, None)
+                    if next_item is None:
+                        break
+                    index, (name, load) = next_item
+                    pending[self._executor.submit(self._transcribe_item, load, mapper)] = (index, name)
+                if not pending:
+                    break
+                
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, name = pending.pop(future)
+                    record = {'type': 'result', 'index': index, 'name': name}
+                    record.update(future.result())
+                    if record['success']:
+                        succeeded += 1
+                    else:
+                        failed += 1
+                    yield record
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        yield {
+            'type': 'summary',
+            'items': len(items),
+            'succeeded': succeeded,
+            'failed': failed,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3),
+            'index': index_timings.to_dict()
+        }
+    
+    def shutdown(self, wait: bool = False):
+        """Stop accepting items; queued ones are dropped unless wait is True"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+    
+    def _transcribe_item(self, load: Callable[[], AudioUpload], mapper) -> dict:
+        """Load, preprocess and transcribe one item on a worker thread"""
+        timings = StageTimings(report=True)
+        upload = None
+        try:
+            with stage(timings, 'upload_read'):
+                upload = load()
+            with stage(timings, 'preprocess'):
+                audio_stats = self.audio_handler.preprocess_upload(upload)
+            if upload.in_memory:
+                result = self.stt_service.transcribe_buffer(upload.data, mapper.monitored_path, timings, mapper,
+                                                            content_type=upload.content_type)
+            else:
+                result = self.stt_service.transcribe_file(upload.path, mapper.monitored_path, timings, mapper,
+                                                          content_type=upload.content_type)
+            if audio_stats:
+                result['audio'] = audio_stats
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        finally:
+            if upload is not None:
+                self.audio_handler.release_upload(upload)
+        timings.finish()
+        result['timings'] = timings.to_dict()
+        return result
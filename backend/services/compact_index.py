@@ -0,0 +1,146 @@
+"""
+Compact Index Service for holding a scanned folder as interned, array-backed columns
+"""
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .index_cache import DirectoryListing
+
+# Parent id of the root directory node
+ROOT_PARENT = -1
+
+
+def spoken_alias(filename: str) -> Optional[str]:
+    """The underscore-to-space alias a filename is also looked up by, if it has one"""
+    if filename.startswith('__'):  # Skip __init__.py files
+        return None
+    alias = filename.replace('_', ' ')
+    if alias == filename or not alias.strip():
+        return None
+    return alias
+
+
+class CompactFileIndex:
+    """
+    Immutable table of the files in a scanned folder
+    
+    Directories are nodes of a path trie (parent id plus one interned name
+    component), so a prefix shared by many files is stored once. Files are rows of
+    two columns, directory id and interned filename, and paths are only joined
+    when a caller asks for one. Spoken aliases are not stored: items() derives
+    them from the names for the lookup structures built on top of the index.
+    """
+    
+    def __init__(self):
+        self._dir_parents = array('i')  # directory id -> parent directory id
+        self._dir_names: List[str] = []  # directory id -> last path component ('' for the root)
+        self._file_dirs = array('i')  # file id -> directory id
+        self._file_names: List[str] = []  # file id -> filename
+    
+    @classmethod
+    def build(cls, directories: Dict[str, DirectoryListing]) -> "CompactFileIndex":
+        """
+        Build the index from directory listings
+        
+        Directories and files get ids in the top-down order os.walk visits them.
+        """
+        index = cls()
+        stack: List[Tuple[str, int, str]] = [('', ROOT_PARENT, '')]  # (rel_dir, parent id, name)
+        while stack:
+            rel_dir, parent, name = stack.pop()
+            listing = directories.get(rel_dir)
+            if listing is None:
+                continue
+            
+            dir_id = len(index._dir_names)
+            index._dir_parents.append(parent)
+            index._dir_names.append(sys.intern(name))
+            for filename in listing[1]:
+                index._file_dirs.append(dir_id)
+                index._file_names.append(sys.intern(filename))
+            
+            stack.extend((f"{rel_dir}/{child}" if rel_dir else child, dir_id, child)
+                         for child in reversed(listing[2]))
+        return index
+    
+    def __len__(self) -> int:
+        """Number of files"""
+        return len(self._file_names)
+    
+    @property
+    def directory_count(self) -> int:
+        return len(self._dir_names)
+    
+    def items(self) -> Iterator[Tuple[str, int]]:
+        """
+        Yield (filename or spoken alias, file id) in walk order, one per distinct key
+        
+        A filename seen again later points at the later file; an alias never
+        shadows an existing key. The mapping is rebuilt on every call, so callers
+        build their own lookup structures from it once.
+        """
+        keys: Dict[str, int] = {}
+        for file_id, filename in enumerate(self._file_names):
+            keys[filename] = file_id
+            alias = spoken_alias(filename)
+            if alias is not None and alias not in keys:
+                keys[alias] = file_id
+        return iter(keys.items())
+    
+    def files(self) -> Iterator[Tuple[int, str]]:
+        """Yield (file id, filename) for every file, in walk order"""
+        return enumerate(self._file_names)
+    
+    def name(self, file_id: int) -> str:
+        return self._file_names[file_id]
+    
+    def file_directory(self, file_id: int) -> int:
+        """Id of the directory node holding a file"""
+        return self._file_dirs[file_id]
+    
+    def parent_directory(self, dir_id: int) -> int:
+        """Id of a directory node's parent (ROOT_PARENT for the root)"""
+        return self._dir_parents[dir_id]
+    
+    def directory_name(self, dir_id: int) -> str:
+        """Last path component of a directory node ('' for the root)"""
+        return self._dir_names[dir_id]
+    
+    def directory(self, dir_id: int) -> str:
+        """Relative path of a directory node ('' for the root)"""
+        parts = []
+        while dir_id > 0:
+            parts.append(self._dir_names[dir_id])
+            dir_id = self._dir_parents[dir_id]
+        return '/'.join(reversed(parts))
+    
+    def path(self, file_id: int) -> str:
+        """Relative path of a file, joined from the trie"""
+        directory = self.directory(self._file_dirs[file_id])
+        name = self._file_names[file_id]
+        return f"{directory}/{name}" if directory else name
+    
+    def directory_paths(self) -> List[str]:
+        """Relative path of every directory node, by id (parents are numbered before children)"""
+        paths: List[str] = []
+        for dir_id, parent in enumerate(self._dir_parents):
+            if parent == ROOT_PARENT:
+                paths.append('')
+            else:
+                parent_path = paths[parent]
+                name = self._dir_names[dir_id]
+                paths.append(f"{parent_path}/{name}" if parent_path else name)
+        return paths
+    
+    def files_by_directory(self) -> Dict[str, List[str]]:
+        """Directory -> filenames, for directories that hold tracked files"""
+        paths = self.directory_paths()
+        structure: Dict[str, List[str]] = {}
+        for dir_id, filename in zip(self._file_dirs, self._file_names):
+            structure.setdefault(paths[dir_id], []).append(filename)
+        return structure
+    
+    def to_dict(self) -> Dict[str, str]:
+        """Materialize filename or alias -> path (allocates every path; for tooling, not hot paths)"""
+        return {key: self.path(file_id) for key, file_id in self.items()}
@@ -3,14 +3,425 @@ File Path Mapper Service for smart file name replacement in transcriptions
 """
 import os
 import re
-from typing import Dict, List, Optional, Tuple
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from ..models.file_event import FileEvent
+from .compact_index import CompactFileIndex, spoken_alias
+from .fuzzy_index import FuzzyFilenameIndex
+from .index_cache import DirectoryListing, FolderIndexCache
+from .metrics import AMBIGUOUS_MATCHES, DIRECTORIES_SCANNED, FILES_SCANNED, MATCH_ATTEMPTS, REPLACEMENTS
+from .path_suffix_index import PathSuffixIndex
+from .spoken_names import SpokenNameIndex, Token, joinable_flags, tokenize
+
+# Approximate heap bytes per index item, measured with tracemalloc on synthetic trees
+_BYTES_PER_FILE = 130
+_BYTES_PER_DIRECTORY = 360
+_MATCHER_BYTES_PER_FILE = 2150
+_FUZZY_INDEX_BYTES_PER_FILE = 3000
+
+# Directories modified this recently are re-listed on the next change check
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
+# What may separate directory names before a filename: whitespace, path separators, snake/kebab joiners
+_QUALIFIER_GAP = re.compile(r'[\s/\\_\-]*')
+# Spoken words that only separate directory names ("routes slash monitoring dot py")
+_SEPARATOR_WORDS = frozenset({'slash'})
+# Most directory words looked at before a filename
+MAX_QUALIFIER_WORDS = 16
+
+# Index changes kept on each snapshot for diffs, and the most file paths one change may carry
+CHANGE_HISTORY = 64
+MAX_CHANGE_PATHS = 10000
+
+# (version before, version after, created paths, deleted paths)
+IndexChange = Tuple[int, int, Tuple[str, ...], Tuple[str, ...]]
+
+_version_lock = threading.Lock()
+_last_version = 0
+
+def _is_word_char(char: str) -> bool:
+    """Match the regex definition of \\w for str patterns"""
+    return char.isalnum() or char == '_'
+
+
+def _fold_case(text: str) -> str:
+    """Lowercase text without changing its length so offsets stay aligned"""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return ''.join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def _join_path(rel_dir: str, name: str) -> str:
+    """Join a relative directory and a name with forward slashes"""
+    return f"{rel_dir}/{name}" if rel_dir else name
+
+
+def _pair_file_events(created: List[str], deleted: List[str]) -> List[FileEvent]:
+    """Turn created/deleted paths into events, reporting a delete+create of the same name as a move"""
+    events: List[FileEvent] = []
+    created_by_name: Dict[str, List[str]] = {}
+    for path in created:
+        created_by_name.setdefault(os.path.basename(path), []).append(path)
+    
+    moved_to = set()
+    for path in deleted:
+        candidates = created_by_name.get(os.path.basename(path))
+        if candidates:
+            dest_path = candidates.pop(0)
+            moved_to.add(dest_path)
+            events.append(FileEvent('moved', path, dest_path=dest_path))
+        else:
+            events.append(FileEvent('deleted', path))
+    
+    events.extend(FileEvent('created', path) for path in created if path not in moved_to)
+    return events
+
+
+def _next_version() -> int:
+    """
+    Get a new index version: increasing, and unique across mappers
+    
+    Versions are microsecond timestamps (bumped past the last one), so gunicorn
+    workers forked from one preloading parent do not hand out each other's numbers,
+    and a restarted server does not reuse the versions clients saw before.
+    """
+    global _last_version
+    with _version_lock:
+        _last_version = max(_last_version + 1, time.time_ns() // 1000)
+        return _last_version
+
+
+def _diff_listings(old: Dict[str, DirectoryListing], new: Dict[str, DirectoryListing],
+                   limit: int) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Find the file paths created and deleted between two sets of listings
+    
+    Returns:
+        (created, deleted), or None when more than limit paths changed
+    """
+    created: List[str] = []
+    deleted: List[str] = []
+    for rel_dir, listing in new.items():
+        old_listing = old.get(rel_dir)
+        if old_listing is listing or (old_listing is not None and old_listing[1] == listing[1]):
+            continue
+        old_files = set(old_listing[1]) if old_listing is not None else set()
+        new_files = set(listing[1])
+        created.extend(_join_path(rel_dir, name) for name in listing[1] if name not in old_files)
+        if old_listing is not None:
+            deleted.extend(_join_path(rel_dir, name) for name in old_listing[1] if name not in new_files)
+        if len(created) + len(deleted) > limit:
+            return None
+    
+    for rel_dir, old_listing in old.items():
+        if rel_dir not in new:
+            deleted.extend(_join_path(rel_dir, name) for name in old_listing[1])
+            if len(created) + len(deleted) > limit:
+                return None
+    return created, deleted
+
+
+class FilenameMatcher:
+    """
+    Precompiled matcher that replaces spoken filenames in a single pass
+    
+    Built once from a folder index. One left-to-right scan tries, at
+    every word boundary, a case-insensitive exact filename (hash lookups bucketed
+    by first character and key length) and a spoken form from the token trie
+    ("session manger dot p y", "SessionManager.py"), keeping the longest. Spoken
+    extensions of untracked names ("notes dot m d") are still folded to ".md".
+    
+    A name shared by several files is narrowed by the directory names said or
+    written just before it ("routes monitoring dot py", "frontend/App.tsx"), which
+    are replaced along with it. A name still matching several files is left as
+    spoken and reported with its candidates instead of pointing at one of them.
+    """
+    
+    def __init__(self, index: CompactFileIndex):
+        self._index = index
+        self._spoken = SpokenNameIndex(index)
+        self._suffixes = PathSuffixIndex(index)
+        
+        # folded filename -> file ids; a spoken alias only applies when no file has that name
+        names: Dict[str, List[int]] = {}
+        aliases: Dict[str, List[int]] = {}
+        for file_id, filename in index.files():
+            names.setdefault(_fold_case(filename), []).append(file_id)
+            alias = spoken_alias(filename)
+            if alias is not None:
+                aliases.setdefault(_fold_case(alias), []).append(file_id)
+        for folded, file_ids in aliases.items():
+            names.setdefault(folded, file_ids)
+        
+        # A name held by one file maps to its id; only shared names pay for a tuple
+        self._file_ids: Dict[str, Union[int, Tuple[int, ...]]] = {}
+        lengths: Dict[str, set] = {}
+        for folded, file_ids in names.items():
+            self._file_ids[folded] = file_ids[0] if len(file_ids) == 1 else tuple(file_ids)
+            lengths.setdefault(folded[0], set()).add(len(folded))
+        
+        # first character -> candidate key lengths, longest first
+        self._lengths: Dict[str, List[int]] = {
+            char: sorted(sizes, reverse=True) for char, sizes in lengths.items()
+        }
+    
+    def replace(self, text: str, counts: Optional[Dict[str, int]] = None,
+                ambiguities: Optional[List[dict]] = None) -> str:
+        """
+        Replace spoken filenames in text with @-prefixed paths
+        
+        Args:
+            text: The transcribed text
+            counts: Optional dict whose 'match_attempts', 'replacements' and 'ambiguous' are increased
+            ambiguities: Optional list to which each mention matching several files is added
+                ({'mention', 'candidates', 'total'})
+            
+        Returns:
+            Text with filenames replaced by full paths
+        """
+        if not self._file_ids:
+            return text
+        
+        folded = _fold_case(text)
+        word_chars = [_is_word_char(c) for c in text]
+        word_chars.append(False)
+        length = len(text)
+        
+        def at_boundary(index: int) -> bool:
+            return (index > 0 and word_chars[index - 1]) != word_chars[index]
+        
+        tokens = tokenize(text)
+        joinable = joinable_flags(text, tokens)
+        token_starts: Dict[int, int] = {}  # char offset -> index of the token starting there
+        spoken_dots: Dict[int, int] = {}  # offset of the whitespace before a spoken "dot" -> its token index
+        for token_index, token in enumerate(tokens):
+            token_starts.setdefault(token.start, token_index)
+            if (token.spoken_dot and token_index > 0 and at_boundary(token.start) and at_boundary(token.end)
+                    and tokens[token_index - 1].end < token.start
+                    and text[tokens[token_index - 1].end:token.start].isspace()
+                    and word_chars[tokens[token_index - 1].end - 1]):
+                spoken_dots[tokens[token_index - 1].end] = token_index
+        
+        def qualifiers(first: int, limit: int) -> List[Token]:
+            """Tokens before tokens[first] that may name its directories, nearest first"""
+            found: List[Token] = []
+            following = tokens[first].start
+            position = first - 1
+            while position >= 0 and len(found) < MAX_QUALIFIER_WORDS:
+                token = tokens[position]
+                if token.start < limit or not _QUALIFIER_GAP.fullmatch(text, token.end, following):
+                    break
+                if token.text not in _SEPARATOR_WORDS:
+                    found.append(token)
+                following = token.start
+                position -= 1
+            return found
+        
+        pieces: List[str] = []
+        last_end = 0
+        index = 0
+        attempts = 0
+        ambiguous = 0
+        while index < length:
+            if not at_boundary(index):
+                index += 1
+                continue
+            
+            attempts += 1
+            best_end = index
+            replacement = None  # File ids matched, or a folded extension
+            
+            for key_length in self._lengths.get(folded[index], ()):
+                end = index + key_length
+                if end > length or not at_boundary(end):
+                    continue
+                file_ids = self._file_ids.get(folded[index:end])
+                if file_ids is not None:
+                    best_end, replacement = end, file_ids if isinstance(file_ids, tuple) else (file_ids,)
+                    break
+            
+            token_index = token_starts.get(index)
+            if token_index is not None:
+                spoken = self._spoken.match_name(tokens, joinable, token_index)
+                if spoken is not None:
+                    end = tokens[spoken[0]].end
+                    if end > best_end and at_boundary(end):
+                        best_end, replacement = end, spoken[1]
+            
+            dot_index = spoken_dots.get(index)
+            if dot_index is not None:
+                extension = self._spoken.match_extension(tokens, joinable, dot_index)
+                if extension is not None:
+                    end = tokens[extension[0]].end
+                    if end > best_end and at_boundary(end):
+                        best_end, replacement = end, f".{extension[1]}"
+            
+            if replacement is None:
+                index += 1
+                continue
+            
+            start = index
+            if isinstance(replacement, tuple):
+                if token_index is not None:
+                    # Directory names just before the name pick between files that share it
+                    before = qualifiers(token_index, last_end)
+                    consumed, replacement = self._suffixes.narrow(
+                        replacement, [token.text for token in before], [at_boundary(token.start) for token in before])
+                    if consumed:
+                        start = before[consumed - 1].start
+                if len(replacement) > 1:
+                    ambiguous += 1
+                    if ambiguities is not None:
+                        report = {'mention': text[start:best_end]}
+                        report.update(self._suffixes.describe(replacement))
+                        ambiguities.append(report)
+                    index = best_end
+                    continue
+                # File ids are joined into paths only for the names actually replaced
+                replacement = f"@{self._index.path(replacement[0])}"
+            pieces.append(text[last_end:start])
+            pieces.append(replacement)
+            last_end = index = best_end
+        
+        replacements = len(pieces) // 2
+        MATCH_ATTEMPTS.inc(attempts)
+        REPLACEMENTS.inc(replacements)
+        AMBIGUOUS_MATCHES.inc(ambiguous)
+        if counts is not None:
+            counts['match_attempts'] = counts.get('match_attempts', 0) + attempts
+            counts['replacements'] = counts.get('replacements', 0) + replacements
+            counts['ambiguous'] = counts.get('ambiguous', 0) + ambiguous
+        
+        if not pieces:
+            return text
+        pieces.append(text[last_end:])
+        return ''.join(pieces)
+
+
+class IndexSnapshot:
+    """
+    One immutable version of a folder index
+    
+    Scans and refreshes build a new snapshot and swap it in with a single
+    assignment, so a reader that grabs the current snapshot sees one consistent
+    scan for as long as it holds it, with no locking. The matcher and fuzzy index
+    are built lazily, at most once, and belong to the snapshot they came from.
+    
+    The version changes only when the set of tracked files does, and each snapshot
+    carries the last few changes so clients can catch up with a diff.
+    """
+    
+    def __init__(self, directories: Dict[str, DirectoryListing], index: CompactFileIndex,
+                 previous: Optional["IndexSnapshot"] = None, directories_listed: int = 0, files_listed: int = 0,
+                 version: int = 0, changes: Tuple[IndexChange, ...] = ()):
+        """
+        Initialize the snapshot
+        
+        Args:
+            directories: Relative directory -> listing; never mutated after this
+            index: Filename -> file lookup built from directories
+            previous: Snapshot with the same index whose lookup structures can be reused
+            directories_listed: Directories the scan or refresh behind this snapshot listed
+            files_listed: Files in those directories
+            version: Version of index
+            changes: Most recent changes leading up to version, oldest first
+        """
+        self.directories = directories
+        self.index = index
+        self.directories_listed = directories_listed
+        self.files_listed = files_listed
+        self.version = version
+        self.changes = changes
+        reuse = previous is not None and previous.index is index
+        self._matcher: Optional[FilenameMatcher] = previous._matcher if reuse else None
+        self._fuzzy_index: Optional[FuzzyFilenameIndex] = previous._fuzzy_index if reuse else None
+        self._build_lock = threading.Lock()
+    
+    @property
+    def matcher(self) -> "FilenameMatcher":
+        """The filename matcher for this snapshot, built on first use"""
+        matcher = self._matcher
+        if matcher is None:
+            with self._build_lock:
+                matcher = self._matcher
+                if matcher is None:
+                    matcher = self._matcher = FilenameMatcher(self.index)
+        return matcher
+    
+    @property
+    def fuzzy_index(self) -> FuzzyFilenameIndex:
+        """The fuzzy filename index for this snapshot, built on first lookup"""
+        fuzzy_index = self._fuzzy_index
+        if fuzzy_index is None:
+            with self._build_lock:
+                fuzzy_index = self._fuzzy_index
+                if fuzzy_index is None:
+                    fuzzy_index = self._fuzzy_index = FuzzyFilenameIndex(self.index)
+        return fuzzy_index
+    
+    def changes_since(self, version: int) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Get the net file paths added and removed since an earlier version
+        
+        Args:
+            version: A version of this index a client already has
+            
+        Returns:
+            (added, removed) sorted paths, or None if version is older than the kept changes or unknown
+        """
+        if version == self.version:
+            return [], []
+        start = next((position for position, change in enumerate(self.changes) if change[0] == version), None)
+        if start is None:
+            return None
+        
+        added, removed = set(), set()
+        for _, _, created, deleted in self.changes[start:]:
+            for path in deleted:
+                if path in added:
+                    added.discard(path)
+                else:
+                    removed.add(path)
+            for path in created:
+                if path in removed:
+                    removed.discard(path)
+                else:
+                    added.add(path)
+        return sorted(added), sorted(removed)
+    
+    def memory_estimate(self) -> int:
+        """Approximate bytes held by the snapshot, including lazily built lookup structures"""
+        files = len(self.index)
+        size = files * _BYTES_PER_FILE + len(self.directories) * _BYTES_PER_DIRECTORY
+        if self._matcher is not None:
+            size += files * _MATCHER_BYTES_PER_FILE
+        if self._fuzzy_index is not None:
+            size += files * _FUZZY_INDEX_BYTES_PER_FILE
+        return size
+
 
 class FilePathMapper:
-    """Service for mapping spoken filenames to actual file paths"""
+    """
+    Service for mapping spoken filenames to actual file paths
     
-    def __init__(self, monitored_path: str = "."):
+    The index is held as an IndexSnapshot. Scans and refreshes are serialized by
+    a lock and publish a new snapshot when they finish; lookups read whichever
+    snapshot is current and never block on a scan.
+    """
+    
+    def __init__(self, monitored_path: str = ".", index_cache: Optional[FolderIndexCache] = None,
+                 scan_workers: int = 1):
         self.monitored_path = monitored_path
-        self.file_map: Dict[str, str] = {}  # filename -> full_path
+        self.index_cache = index_cache  # Optional on-disk cache for warm starts
+        self.scan_workers = scan_workers  # Threads used to list directories on a full scan
+        self._snapshot = IndexSnapshot({}, CompactFileIndex())
+        self._directories_key: Optional[Tuple[str, frozenset]] = None  # what the snapshot's listings were scanned for
+        self._lock = threading.Lock()  # Serializes scans and incremental refreshes
         
         # Common directories to ignore (junk/auto-generated folders)
         self.ignored_dirs = {
@@ -31,36 +442,268 @@ class FilePathMapper:
         
         self.scan_folder_structure()
     
+    @property
+    def file_map(self) -> Dict[str, str]:
+        """Filename -> path for the current snapshot, materialized on every access (use snapshot().index in hot paths)"""
+        return self._snapshot.index.to_dict()
+    
+    @property
+    def _directories(self) -> Dict[str, DirectoryListing]:
+        return self._snapshot.directories
+    
+    def snapshot(self) -> IndexSnapshot:
+        """The current index; stays consistent however long the caller holds it"""
+        return self._snapshot
+    
     def scan_folder_structure(self):
         """Scan the monitored folder and build filename to path mapping"""
-        self.file_map.clear()
+        with self._lock:
+            self._scan()
+    
+    def _scan(self):
+        """Full or warm-started scan into a new snapshot (caller holds the lock)"""
+        cache_key = self._cache_key()
+        previous = self._snapshot.directories if cache_key is not None and cache_key == self._directories_key else None
+        directories: Dict[str, DirectoryListing] = {}
         
-        if not os.path.exists(self.monitored_path):
-            return
+        if os.path.exists(self.monitored_path):
+            if previous is None and self.index_cache:
+                previous = self.index_cache.load(self.monitored_path, self.ignored_dirs)
+            
+            if previous:
+                # Warm start: only re-walk directories whose mtime changed
+                directories = dict(previous)
+                changed = self._changed_directories(directories)
+                self._apply_directory_changes(directories, changed, [], [])
+            else:
+                previous = None
+                changed = None
+                if self.scan_workers > 1:
+                    self._walk_directory_parallel(directories, '')
+                else:
+                    self._walk_directory(directories, '')
+            
+            if self.index_cache and changed != []:
+                self.index_cache.save(self.monitored_path, self.ignored_dirs, directories)
         
-        for root, dirs, files in os.walk(self.monitored_path):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if d not in self.ignored_dirs]
+        self._directories_key = cache_key
+        self._publish(directories, base=previous)
+    
+    def _cache_key(self) -> Optional[Tuple[str, frozenset]]:
+        """Identify listings that can be reused: same root and same ignored directories"""
+        if not self.index_cache:
+            return None
+        return os.path.abspath(self.monitored_path), frozenset(self.ignored_dirs)
+    
+    def _is_tracked_file(self, filename: str) -> bool:
+        """Skip hidden files and common junk files"""
+        return not (filename.startswith('.') or filename.endswith(('.log', '.tmp', '.temp', '.cache')))
+    
+    def _list_directory(self, rel_dir: str) -> Optional[DirectoryListing]:
+        """
+        List one directory the same way os.walk would see it
+        
+        Args:
+            rel_dir: Directory relative to the monitored path ('' for the root)
             
-            for file in files:
-                # Skip hidden files and common junk files
-                if file.startswith('.') or file.endswith(('.log', '.tmp', '.temp', '.cache')):
-                    continue
-                
-                full_path = os.path.join(root, file)
-                relative_path = os.path.relpath(full_path, self.monitored_path)
-                clean_path = relative_path.replace(os.sep, '/')
-                
-                # Store exact filename mapping
-                self.file_map[file] = clean_path
-                
-                # Create spoken version (replace underscores with spaces) - only if different and meaningful
-                spoken_name = file.replace('_', ' ')
-                if (spoken_name != file and 
-                    spoken_name not in self.file_map and 
-                    not file.startswith('__') and  # Skip __init__.py files
-                    len(spoken_name.strip()) > 0):
-                    self.file_map[spoken_name] = clean_path
+        Returns:
+            (mtime_ns, tracked files, subdirectories to descend into), or None if unreadable
+        """
+        abs_dir = os.path.join(self.monitored_path, rel_dir) if rel_dir else self.monitored_path
+        try:
+            mtime_ns = os.stat(abs_dir).st_mtime_ns
+            with os.scandir(abs_dir) as entries:
+                entries = list(entries)
+        except OSError:
+            return None
+        
+        files: List[str] = []
+        subdirs: List[str] = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            
+            # Names are interned so listings and the index share one string per distinct name
+            if is_dir:
+                # Filter out ignored directories; like os.walk, never descend into symlinks
+                if entry.name not in self.ignored_dirs and not entry.is_symlink():
+                    subdirs.append(sys.intern(entry.name))
+            elif self._is_tracked_file(entry.name):
+                files.append(sys.intern(entry.name))
+        
+        # Changes landing in the same mtime tick as this listing would go unnoticed,
+        # so a directory modified very recently is re-listed on the next check
+        if time.time_ns() - mtime_ns < RACY_MTIME_WINDOW_NS:
+            mtime_ns = None
+        
+        return mtime_ns, files, subdirs
+    
+    def _walk_directory(self, directories: Dict[str, DirectoryListing], rel_dir: str,
+                        created: Optional[List[str]] = None):
+        """Record rel_dir and everything below it into directories, collecting new file paths into created"""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            listing = self._list_directory(current)
+            if listing is None:
+                continue
+            
+            directories[current] = listing
+            if created is not None:
+                created.extend(_join_path(current, name) for name in listing[1])
+            stack.extend(_join_path(current, name) for name in reversed(listing[2]))
+    
+    def _walk_directory_parallel(self, directories: Dict[str, DirectoryListing], rel_dir: str):
+        """
+        Record rel_dir and everything below it into directories, listing them on a bounded thread pool
+        
+        Each listed directory fans its subdirectories out as new tasks, so both wide
+        top levels and deep subtrees keep every worker busy while others block on I/O.
+        Listings are keyed by directory and the index is rebuilt in walk order from
+        them, so the result is identical to the serial walk regardless of completion order.
+        """
+        with ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix='folder-scan') as pool:
+            pending = {pool.submit(self._list_directory, rel_dir): rel_dir}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    current = pending.pop(future)
+                    listing = future.result()
+                    if listing is None:
+                        continue
+                    
+                    directories[current] = listing
+                    for name in listing[2]:
+                        child = _join_path(current, name)
+                        pending[pool.submit(self._list_directory, child)] = child
+    
+    def _drop_directory(self, directories: Dict[str, DirectoryListing], rel_dir: str, deleted: List[str]):
+        """Forget rel_dir and everything below it, collecting removed file paths into deleted"""
+        stack = [rel_dir]
+        while stack:
+            current = stack.pop()
+            listing = directories.pop(current, None)
+            if listing is None:
+                continue
+            
+            deleted.extend(_join_path(current, name) for name in listing[1])
+            stack.extend(_join_path(current, name) for name in listing[2])
+    
+    def _publish(self, directories: Dict[str, DirectoryListing], base: Optional[Dict[str, DirectoryListing]] = None,
+                 changes: Optional[Tuple[List[str], List[str]]] = None):
+        """
+        Swap in a new snapshot of directories (caller holds the lock)
+        
+        When no file was created or deleted (only mtimes changed, or a rescan found
+        the same files) the current index, its version and its lookup structures are kept.
+        
+        Args:
+            directories: The new listings; the mapper stops mutating this dict
+            base: Listings the scan started from; listings not carried over from
+                it were listed by this scan
+            changes: (created, deleted) paths if the caller already knows them;
+                otherwise the listings are compared with the current snapshot
+        """
+        base = base or {}
+        listed = [listing for rel_dir, listing in directories.items() if base.get(rel_dir) is not listing]
+        files_listed = sum(len(listing[1]) for listing in listed)
+        DIRECTORIES_SCANNED.inc(len(listed))
+        FILES_SCANNED.inc(files_listed)
+        
+        previous = self._snapshot
+        if changes is None:
+            # A first scan is not kept as a change; clients fetch the whole structure
+            if previous.directories or not directories:
+                changes = _diff_listings(previous.directories, directories, MAX_CHANGE_PATHS)
+        elif len(changes[0]) + len(changes[1]) > MAX_CHANGE_PATHS:
+            changes = None
+        
+        if changes is not None and not (changes[0] or changes[1]):
+            index, version, history = previous.index, previous.version, previous.changes
+        else:
+            index = CompactFileIndex.build(directories)
+            version = _next_version()
+            if changes is None:
+                history = ()  # Too large to diff; earlier versions can only be replaced
+            else:
+                change = (previous.version, version, tuple(changes[0]), tuple(changes[1]))
+                history = previous.changes[-(CHANGE_HISTORY - 1):] + (change,)
+        # A single assignment, so readers see either the old snapshot or the new one
+        self._snapshot = IndexSnapshot(directories, index, previous, len(listed), files_listed, version, history)
+    
+    def changed_directories(self) -> List[str]:
+        """
+        Find tracked directories whose mtime changed since they were listed
+        
+        Returns:
+            Relative directory paths, parents before children
+        """
+        return self._changed_directories(self._snapshot.directories)
+    
+    def _changed_directories(self, directories: Dict[str, DirectoryListing]) -> List[str]:
+        changed = []
+        for rel_dir, listing in directories.items():
+            abs_dir = os.path.join(self.monitored_path, rel_dir) if rel_dir else self.monitored_path
+            try:
+                mtime_ns = os.stat(abs_dir).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if listing[0] is None or mtime_ns != listing[0]:
+                changed.append(rel_dir)
+        return sorted(changed)
+    
+    def refresh_directories(self, directories: Iterable[str]) -> List[FileEvent]:
+        """
+        Re-list the given directories and apply the differences to the index
+        
+        Args:
+            directories: Directories relative to the monitored path that may have changed
+            
+        Returns:
+            File events (created, deleted, moved) applied to the index
+        """
+        with self._lock:
+            created: List[str] = []
+            deleted: List[str] = []
+            # Copy-on-write: readers keep using the current listings until the swap
+            base = self._snapshot.directories
+            listings = dict(base)
+            self._apply_directory_changes(listings, directories, created, deleted)
+            self._publish(listings, base=base, changes=(created, deleted))
+            
+            return _pair_file_events(created, deleted)
+    
+    def _apply_directory_changes(self, listings: Dict[str, DirectoryListing], directories: Iterable[str],
+                                 created: List[str], deleted: List[str]):
+        """Re-list directories (parents first) in listings, re-walking only subtrees that appeared"""
+        for rel_dir in sorted(set(directories)):
+            old_listing = listings.get(rel_dir)
+            if old_listing is None:
+                # Unknown or ignored directory; its parent picks it up if it is new
+                continue
+            
+            listing = self._list_directory(rel_dir)
+            if listing is None:
+                self._drop_directory(listings, rel_dir, deleted)
+                continue
+            
+            old_files = set(old_listing[1])
+            new_files = set(listing[1])
+            created.extend(_join_path(rel_dir, name) for name in listing[1] if name not in old_files)
+            deleted.extend(_join_path(rel_dir, name) for name in old_listing[1] if name not in new_files)
+            
+            listings[rel_dir] = listing
+            
+            old_subdirs = set(old_listing[2])
+            new_subdirs = set(listing[2])
+            for name in old_listing[2]:
+                if name not in new_subdirs:
+                    self._drop_directory(listings, _join_path(rel_dir, name), deleted)
+            for name in listing[2]:
+                if name not in old_subdirs:
+                    self._walk_directory(listings, _join_path(rel_dir, name), created)
     
     def find_file_path(self, spoken_filename: str) -> Optional[str]:
         """
@@ -70,118 +713,72 @@ class FilePathMapper:
             spoken_filename: The filename mentioned in speech (e.g., "app.py", "app")
             
         Returns:
-            Full relative path if found, None otherwise
+            Full relative path if found, None otherwise (also when several files tie for the best score;
+            resolve_filename lists them)
         """
-        # Clean the spoken filename
-        clean_name = spoken_filename.strip().lower()
-        
-        # Direct match
-        for filename, path in self.file_map.items():
-            if filename.lower() == clean_name:
-                return f"@{path}"
+        matches = self.resolve_filename(spoken_filename, limit=2)
+        if not matches or (len(matches) > 1 and matches[1][2] == matches[0][2]):
+            return None
         
-        # Partial match (in case of slight pronunciation differences)
-        for filename, path in self.file_map.items():
-            if clean_name in filename.lower() or filename.lower() in clean_name:
-                return f"@{path}"
+        return f"@{matches[0][1]}"
+    
+    def resolve_filename(self, spoken_filename: str, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Rank tracked files against a spoken filename
         
-        return None
+        Args:
+            spoken_filename: The filename mentioned in speech (e.g., "session manger", "routes/monitoring.py")
+            limit: Maximum number of candidates to return
+            
+        Returns:
+            List of (filename, path, score), best first; every exact match scores 1.0
+        """
+        # Built lazily once per snapshot, then reused for every lookup
+        return self._snapshot.fuzzy_index.search(spoken_filename, limit)
     
-    def replace_filenames_in_text(self, text: str) -> str:
+    def replace_filenames_in_text(self, text: str, counts: Optional[Dict[str, int]] = None,
+                                  ambiguities: Optional[List[dict]] = None) -> str:
         """
         Replace filenames in transcription text with full paths
         
         Args:
             text: The transcribed text
+            counts: Optional dict whose 'match_attempts', 'replacements' and 'ambiguous' are increased
+            ambiguities: Optional list to which each mention matching several files is added
             
         Returns:
             Text with filenames replaced by full paths
         """
-        result_text = text
-        
-        # First, handle STT transcription issues with file extensions dynamically
-        # Get all unique file extensions from the tracked files
-        extensions = set()
-        for filename in self.file_map.keys():
-            if '.' in filename:
-                ext = filename.split('.')[-1]
-                extensions.add(ext)
-        
-        # Create dynamic patterns for each extension found
-        for ext in extensions:
-            # Convert extension to spoken form (e.g., "py" -> "p y", "tsx" -> "t s x")
-            spoken_ext = ' '.join(ext)
-            
-            # Handle multi-word filenames with extensions
-            # Pattern: "filename dot p y" -> "filename.py"
-            pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+' + spoken_ext.replace(' ', r'\s+') + r'\b'
-            replacement = r'\1.' + ext
-            result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-            
-            # Handle single-word filenames with extensions
-            # Pattern: "filename dot p y" -> "filename.py"
-            pattern = r'\b(\w+)\s+dot\s+' + spoken_ext.replace(' ', r'\s+') + r'\b'
-            replacement = r'\1.' + ext
-            result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-            
-            # Handle alternative spoken forms for common extensions
-            if ext == 'json':
-                # Handle "dot j son" -> ".json"
-                pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+j\s+son\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-                
-                pattern = r'\b(\w+)\s+dot\s+j\s+son\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-            
-            elif ext == 'html':
-                # Handle "dot h t m l" and "dot h t m l" variations
-                # Also handle "dot h t m l" -> ".html"
-                pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+h\s+t\s+m\s+l\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-                
-                pattern = r'\b(\w+)\s+dot\s+h\s+t\s+m\s+l\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-            
-            elif ext == 'tsx':
-                # Handle "dot t s x" and "dot t s x" variations
-                pattern = r'\b(\w+(?:\s+\w+)*)\s+dot\s+t\s+s\s+x\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-                
-                pattern = r'\b(\w+)\s+dot\s+t\s+s\s+x\b'
-                replacement = r'\1.' + ext
-                result_text = re.sub(pattern, replacement, result_text, flags=re.IGNORECASE)
-        
-        # Sort all filenames by length (longest first) to avoid partial replacements
-        sorted_filenames = sorted(self.file_map.keys(), key=len, reverse=True)
-        
-        for filename in sorted_filenames:
-            # Use word boundaries to avoid partial matches, case-insensitive
-            pattern = r'\b' + re.escape(filename) + r'\b'
-            
-            # Check if the filename appears as a whole word (case-insensitive)
-            if re.search(pattern, result_text, re.IGNORECASE):
-                file_path = f"@{self.file_map[filename]}"
-                # Replace only whole word matches (case-insensitive)
-                result_text = re.sub(pattern, file_path, result_text, flags=re.IGNORECASE)
-        
-        return result_text
-    
-    def get_folder_structure_summary(self) -> Dict[str, List[str]]:
-        """Get a summary of the folder structure"""
-        structure = {}
-        
-        for filename, path in self.file_map.items():
-            directory = os.path.dirname(path)
-            if directory not in structure:
-                structure[directory] = []
-            structure[directory].append(filename)
-        
-        return structure
+        # Built lazily once per snapshot, then reused for every transcription
+        return self._snapshot.matcher.replace(text, counts, ambiguities)
+    
+    def memory_estimate(self) -> int:
+        """Approximate bytes held by the index, including lazily built lookup structures"""
+        return self._snapshot.memory_estimate()
+    
+    def get_folder_structure_summary(self, snapshot: Optional[IndexSnapshot] = None) -> Dict[str, List[str]]:
+        """Get a summary of the folder structure (of snapshot, or the current index)"""
+        return (snapshot or self._snapshot).index.files_by_directory()
+    
+    def get_folder_structure_changes(self, since: int,
+                                     snapshot: Optional[IndexSnapshot] = None) -> Optional[Dict[str, Dict[str, List[str]]]]:
+        """
+        Get the files added and removed since an earlier version, grouped like the summary
+        
+        Returns:
+            {'added': {directory: [filenames]}, 'removed': {...}}, or None if since is too old or unknown
+        """
+        changes = (snapshot or self._snapshot).changes_since(since)
+        if changes is None:
+            return None
+        
+        grouped = {}
+        for key, paths in zip(('added', 'removed'), changes):
+            structure = grouped[key] = {}
+            for path in paths:
+                directory, _, filename = path.rpartition('/')
+                structure.setdefault(directory, []).append(filename)
+        return grouped
     
     def get_ignored_directories(self) -> List[str]:
         """Get list of ignored directories"""
@@ -197,5 +794,6 @@ class FilePathMapper:
     
     def update_monitored_path(self, new_path: str):
         """Update the monitored path and rescan"""
-        self.monitored_path = new_path
-        self.scan_folder_structure()
+        with self._lock:
+            self.monitored_path = new_path
+            self._scan()
@@ -0,0 +1,192 @@
+"""
+Folder Watcher Service for keeping the folder index current without rescanning
+"""
+import os
+import threading
+from typing import Callable, Iterable, List, Optional, Set
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog is optional; fall back to mtime polling
+    FileSystemEventHandler = object
+    Observer = None
+
+from ..models.file_event import FileEvent
+from .file_path_mapper import FilePathMapper
+
+WATCH_MODES = ('auto', 'watchdog', 'polling', 'off')
+
+# Event types that never change which files exist
+_IGNORED_EVENT_TYPES = {'opened', 'closed', 'closed_no_write'}
+
+
+class _DirtyDirectoryHandler(FileSystemEventHandler):
+    """Watchdog handler that marks the directories touched by each event as dirty"""
+    
+    def __init__(self, watcher: 'FolderWatcher'):
+        super().__init__()
+        self.watcher = watcher
+    
+    def on_any_event(self, event):
+        if event.event_type in _IGNORED_EVENT_TYPES:
+            return
+        if event.event_type == 'modified' and not event.is_directory:
+            return  # Content changes don't affect the index
+        
+        paths = [event.src_path]
+        if getattr(event, 'dest_path', None):
+            paths.append(event.dest_path)
+        
+        directories = []
+        for path in paths:
+            path = os.fsdecode(path)
+            directories.append(os.path.dirname(path))
+            if event.is_directory:
+                directories.append(path)
+        
+        self.watcher.mark_dirty(directories)
+
+
+class FolderWatcher:
+    """Keeps a FilePathMapper current by applying filesystem changes as they happen"""
+    
+    def __init__(self, mapper: FilePathMapper, mode: str = 'auto', poll_interval: float = 2.0,
+                 debounce: float = 0.2, on_events: Optional[Callable[[List[FileEvent]], None]] = None):
+        """
+        Initialize the folder watcher
+        
+        Args:
+            mapper: The mapper whose index is kept current
+            mode: 'auto' (watchdog if installed, else polling), 'watchdog', 'polling' or 'off'
+            poll_interval: Seconds between directory mtime checks in polling mode
+            debounce: Seconds to coalesce bursts of watchdog events before applying them
+            on_events: Called with the file events applied in each batch
+        """
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown folder watch mode '{mode}'. Expected one of: {', '.join(WATCH_MODES)}")
+        if mode == 'watchdog' and Observer is None:
+            raise ValueError("Folder watch mode 'watchdog' requires the watchdog package.")
+        
+        self.mapper = mapper
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.on_events = on_events
+        
+        self.backend: Optional[str] = None  # 'watchdog' or 'polling' while running
+        self.watched_path: Optional[str] = None
+        self._observer = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._dirty: Set[str] = set()
+        self._dirty_lock = threading.Lock()
+    
+    def start(self):
+        """Start watching the mapper's monitored path (restarting if already running)"""
+        self.stop()
+        
+        root = self.mapper.monitored_path
+        if self.mode == 'off' or not os.path.isdir(root):
+            return
+        
+        self._stop_event = threading.Event()
+        self._wakeup = threading.Event()
+        self._dirty = set()
+        self.backend = 'polling'
+        
+        if self.mode in ('auto', 'watchdog') and Observer is not None:
+            try:
+                observer = Observer()
+                observer.schedule(_DirtyDirectoryHandler(self), root, recursive=True)
+                observer.start()
+                self._observer = observer
+                self.backend = 'watchdog'
+            except Exception as e:
+                # e.g. the inotify watch limit was reached on a very large tree
+                if self.mode == 'watchdog':
+                    raise
+                print(f"Warning: Failed to start watchdog observer for {root}, polling instead: {e}")
+        
+        self.watched_path = root
+        self._thread = threading.Thread(target=self._run, name='folder-watcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop watching"""
+        self._stop_event.set()
+        self._wakeup.set()
+        
+        if self._observer is not None:
+            try:
+                self._observer.stop()
+                self._observer.join(timeout=5)
+            except Exception as e:
+                print(f"Warning: Failed to stop watchdog observer: {e}")
+            self._observer = None
+        
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+        self.backend = None
+        self.watched_path = None
+    
+    def is_watching(self, path: str) -> bool:
+        """Whether the index for path is being kept current, so no rescan is needed"""
+        if self._thread is None or not self._thread.is_alive() or self.watched_path != path:
+            return False
+        if self.backend == 'watchdog' and (self._observer is None or not self._observer.is_alive()):
+            return False
+        return self.mapper.monitored_path == path
+    
+    def mark_dirty(self, directories: Iterable[str]):
+        """Queue absolute directory paths to be re-listed"""
+        root = self.watched_path
+        if root is None:
+            return
+        
+        relative = set()
+        for directory in directories:
+            rel_dir = os.path.relpath(directory, root)
+            if rel_dir == os.curdir:
+                rel_dir = ''
+            elif rel_dir == os.pardir or rel_dir.startswith(os.pardir + os.sep):
+                continue
+            relative.add(rel_dir.replace(os.sep, '/'))
+        
+        with self._dirty_lock:
+            self._dirty.update(relative)
+            self._wakeup.set()
+    
+    def _take_dirty(self) -> Set[str]:
+        with self._dirty_lock:
+            dirty = self._dirty
+            self._dirty = set()
+            self._wakeup.clear()
+        return dirty
+    
+    def _run(self):
+        """Apply queued (watchdog) or detected (polling) directory changes until stopped"""
+        stop_event = self._stop_event
+        while not stop_event.is_set():
+            if self.backend == 'watchdog':
+                self._wakeup.wait()
+                # Let a burst of events (checkout, npm install) settle into one batch
+                if stop_event.wait(self.debounce):
+                    break
+                directories = self._take_dirty()
+            else:
+                if stop_event.wait(self.poll_interval):
+                    break
+                directories = self.mapper.changed_directories()
+            
+            if not directories:
+                continue
+            
+            try:
+                events = self.mapper.refresh_directories(directories)
+                if events and self.on_events:
+                    self.on_events(events)
+            except Exception as e:
+                print(f"Warning: Failed to apply folder changes under {self.watched_path}: {e}")
@@ -0,0 +1,148 @@
+"""
+Fuzzy Filename Index Service for fast ranked lookups of spoken filenames
+"""
+import re
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Tuple
+
+from .compact_index import CompactFileIndex, spoken_alias
+
+# Candidates below this similarity are not considered a match
+MIN_SCORE = 0.3
+
+# Most candidates scored exactly per query, picked by shared trigram count
+MAX_CANDIDATES = 64
+
+# Weight of a match against a name without its extension, so "app" ranks below a file named "app"
+STEM_MATCH_WEIGHT = 0.9
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase a name and collapse separators: "Session_Manager.py" -> "session manager py" """
+    return _SEPARATORS.sub(' ', name.lower()).strip()
+
+
+def trigrams(text: str) -> FrozenSet[str]:
+    """Get the padded character trigrams of normalized text"""
+    padded = f" {text} "
+    return frozenset({padded[i:i + 3] for i in range(len(padded) - 2)})
+
+
+def _dice(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    """Dice coefficient of two trigram sets"""
+    if not left or not right:
+        return 0.0
+    return 2.0 * len(left & right) / (len(left) + len(right))
+
+
+class FuzzyFilenameIndex:
+    """
+    Exact-match hash plus trigram inverted index over tracked filenames
+    
+    Built once per scan from a folder index. Exact (case-insensitive)
+    lookups are O(1) and return every file sharing the name, or only those whose
+    path ends in the query when it names directories ("routes/monitoring.py");
+    near misses like "session manger" are ranked by trigram similarity against
+    both the full name and (weighted below an exact match) the name without its
+    extension.
+    """
+    
+    def __init__(self, index: CompactFileIndex):
+        self._index = index
+        self._exact: Dict[str, List[int]] = {}  # lowercase filename -> file ids
+        self._entries: List[Tuple[int, FrozenSet[str]]] = []  # (file id, name trigrams)
+        self._stem_grams: Dict[int, FrozenSet[str]] = {}  # entry id -> trigrams without extension, memoized
+        self._postings: Dict[str, List[int]] = defaultdict(list)  # trigram -> entry ids
+        
+        aliases: Dict[str, List[int]] = {}
+        for file_id, filename in index.files():
+            self._exact.setdefault(filename.lower(), []).append(file_id)
+            alias = spoken_alias(filename)
+            if alias is not None:
+                aliases.setdefault(alias.lower(), []).append(file_id)
+            
+            normalized = normalize_name(filename)
+            if not normalized:
+                continue
+            
+            entry_id = len(self._entries)
+            grams = trigrams(normalized)
+            self._entries.append((file_id, grams))
+            for gram in grams:
+                self._postings[gram].append(entry_id)
+        
+        # A spoken alias only applies when no file has that name
+        for alias, file_ids in aliases.items():
+            self._exact.setdefault(alias, file_ids)
+        self._postings = dict(self._postings)
+    
+    def search(self, query: str, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Find the tracked files that best match a spoken filename
+        
+        Args:
+            query: The filename mentioned in speech (e.g., "session manger")
+            limit: Maximum number of candidates to return
+        
+        Returns:
+            List of (filename, path, score) sorted by descending score; exact matches score 1.0
+        """
+        clean_name = query.strip().lower().replace('\\', '/').strip('/')
+        if not clean_name or limit <= 0:
+            return []
+        
+        results: List[Tuple[str, str, float]] = []
+        directories, _, name = clean_name.rpartition('/')
+        # Files with this name are only matched exactly; directories in the query must end their path
+        named = set(self._exact.get(name, ()))
+        exact_paths = []
+        for file_id in named:
+            path = self._index.path(file_id)
+            if not directories or path.lower().endswith(f"/{clean_name}") or path.lower() == clean_name:
+                exact_paths.append((path, file_id))
+        exact_paths.sort()
+        for path, file_id in exact_paths[:limit]:
+            results.append((self._index.name(file_id), path, 1.0))
+        if len(results) >= limit:
+            return results
+        
+        normalized = normalize_name(name)
+        if not normalized:
+            return results
+        query_grams = trigrams(normalized)
+        
+        # Generate candidates from the rarer half of the query's trigrams only;
+        # common grams like "ion" would touch most of a large index
+        grams = sorted((g for g in query_grams if g in self._postings), key=lambda g: len(self._postings[g]))
+        hits: Counter = Counter()
+        for gram in grams[:max(2, (len(grams) + 1) // 2)]:
+            hits.update(self._postings[gram])
+        
+        if len(hits) > MAX_CANDIDATES:
+            candidates = [entry_id for entry_id, _ in hits.most_common(MAX_CANDIDATES)]
+        else:
+            candidates = list(hits)
+        
+        scored = []
+        for entry_id in candidates:
+            file_id, grams = self._entries[entry_id]
+            if file_id in named:
+                continue
+            filename = self._index.name(file_id)
+            score = _dice(query_grams, grams)
+            if '.' in filename:
+                # Also compare without the extension so "session manger" is not penalized for ".py"
+                stem_grams = self._stem_grams.get(entry_id)
+                if stem_grams is None:
+                    stem_grams = self._stem_grams[entry_id] = trigrams(normalize_name(filename.rsplit('.', 1)[0]))
+                score = max(score, STEM_MATCH_WEIGHT * _dice(query_grams, stem_grams))
+            if score >= MIN_SCORE:
+                # Paths are joined only for candidates that scored (at most MAX_CANDIDATES)
+                scored.append((-score, len(filename), self._index.path(file_id), filename))
+        
+        scored.sort()
+        for negative_score, _, path, filename in scored[:limit - len(results)]:
+            results.append((filename, path, round(-negative_score, 4)))
+        return results
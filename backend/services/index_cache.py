@@ -0,0 +1,87 @@
+"""
+Folder Index Cache Service for persisting scanned folder indexes between restarts
+"""
+import gzip
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (mtime_ns or None if it must be re-listed, tracked files, subdirectories walked into)
+DirectoryListing = Tuple[Optional[int], List[str], List[str]]
+
+# Bump when the scan rules or file layout change so old caches are ignored
+CACHE_FORMAT_VERSION = 1
+
+
+class FolderIndexCache:
+    """Stores per-directory listings of a scanned folder in one compressed file per root"""
+    
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+    
+    @staticmethod
+    def ignored_dirs_hash(ignored_dirs: Iterable[str]) -> str:
+        """Hash the ignore set so a cache built with different pruning is never reused"""
+        return hashlib.sha1('\0'.join(sorted(ignored_dirs)).encode('utf-8')).hexdigest()
+    
+    def cache_path(self, root: str) -> str:
+        """Get the cache file used for a monitored root"""
+        root_hash = hashlib.sha1(os.path.abspath(root).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"folder_index_{root_hash}.json.gz")
+    
+    def load(self, root: str, ignored_dirs: Iterable[str]) -> Optional[Dict[str, DirectoryListing]]:
+        """
+        Load cached directory listings for a root
+        
+        Args:
+            root: The monitored folder
+            ignored_dirs: The ignore set the listings must have been built with
+            
+        Returns:
+            Relative directory -> (mtime_ns, files, subdirs), or None on a miss
+        """
+        try:
+            with gzip.open(self.cache_path(root), 'rt', encoding='utf-8') as cache_file:
+                data = json.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable folder index cache for {root}: {e}")
+            return None
+        
+        if (data.get('version') != CACHE_FORMAT_VERSION or
+                data.get('root') != os.path.abspath(root) or
+                data.get('ignored_dirs_hash') != self.ignored_dirs_hash(ignored_dirs)):
+            return None
+        
+        # Intern names as a fresh listing would, so the folder index shares them
+        return {rel_dir: (mtime_ns, [sys.intern(name) for name in files], [sys.intern(name) for name in subdirs])
+                for rel_dir, mtime_ns, files, subdirs in data['directories']}
+    
+    def save(self, root: str, ignored_dirs: Iterable[str], directories: Dict[str, DirectoryListing]):
+        """Write directory listings for a root, replacing the previous cache atomically"""
+        data = {
+            'version': CACHE_FORMAT_VERSION,
+            'root': os.path.abspath(root),
+            'ignored_dirs_hash': self.ignored_dirs_hash(ignored_dirs),
+            'directories': [[rel_dir, mtime_ns, files, subdirs]
+                            for rel_dir, (mtime_ns, files, subdirs) in directories.items()]
+        }
+        
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix='folder_index_', dir=self.cache_dir)
+            try:
+                with os.fdopen(temp_fd, 'wb') as raw_file:
+                    with gzip.GzipFile(fileobj=raw_file, mode='wb', compresslevel=1, mtime=0) as cache_file:
+                        cache_file.write(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+                os.replace(temp_path, self.cache_path(root))
+            except Exception:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            # Caching is best effort; a failed write only costs the next cold start
+            print(f"Warning: Failed to write folder index cache for {root}: {e}")
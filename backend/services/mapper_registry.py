@@ -0,0 +1,274 @@
+"""
+Mapper Registry Service for keeping one folder index per active project
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from ..models.file_event import FileEvent
+from .file_path_mapper import FilePathMapper
+from .folder_watcher import FolderWatcher
+from .index_cache import FolderIndexCache
+from .metrics import StageTimings
+
+
+def project_key(path: str) -> str:
+    """Canonical form of a project path: absolute, symlinks resolved, no trailing separator"""
+    return os.path.realpath(path)
+
+
+class _MapperEntry:
+    """One project's mapper and the watcher keeping it current"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.mapper: Optional[FilePathMapper] = None
+        self.watcher: Optional[FolderWatcher] = None
+        self.bytes = 0
+        self.last_used = time.time()
+        self.checked_at = time.monotonic()  # When the index was last brought up to date without a watcher
+        self.closed = False  # Evicted; its watcher must not be (re)started
+        self.lock = threading.Lock()  # Serializes building, rescanning and closing this entry
+
+
+class MapperRegistry:
+    """
+    Bounded LRU of FilePathMappers keyed by monitored path
+    
+    Sessions select a mapper through their project path, so sessions on the same
+    project share one index and switching between active projects is a dictionary
+    lookup. Paths are keyed by their real path, so "/repo", "/repo/" and a
+    symlink to it share one entry. The least recently used mappers (and their watchers) are dropped when
+    the entry count or the estimated index memory goes over its limit; a dropped
+    project is rebuilt on next use, warm-started from the index cache if enabled.
+    """
+    
+    def __init__(self, index_cache: Optional[FolderIndexCache] = None, scan_workers: int = 1,
+                 max_entries: int = 8, max_bytes: int = 512 * 1024 * 1024, watch_mode: str = 'off',
+                 poll_interval: float = 2.0, on_events: Optional[Callable[[str, List[FileEvent]], None]] = None):
+        """
+        Initialize the registry
+        
+        Args:
+            index_cache: Optional on-disk cache for warm starts
+            scan_workers: Threads listing directories during a full scan
+            max_entries: Most mappers kept
+            max_bytes: Most estimated index memory kept across all mappers
+            watch_mode: Folder watch mode for each mapper ('auto', 'watchdog', 'polling' or 'off')
+            poll_interval: Seconds between mtime checks when polling, and between the
+                checks get() makes for a project no watcher keeps current
+            on_events: Called with (monitored path, file events) when a watcher applies changes
+        """
+        self.index_cache = index_cache
+        self.scan_workers = scan_workers
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.watch_mode = watch_mode
+        self.poll_interval = poll_interval
+        self.on_events = on_events
+        self.watching = True  # False while preloading before a fork; see start_watching()
+        
+        self._entries: "OrderedDict[str, _MapperEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.rescans = 0
+        self.evictions = 0
+    
+    def get(self, path: str, timings: Optional[StageTimings] = None) -> FilePathMapper:
+        """
+        Get the mapper for a monitored path, building or refreshing it only when needed
+        
+        A project no watcher keeps current (watching is off, or its watcher died) is
+        checked at most once per poll_interval, re-listing only the directories whose
+        mtime changed.
+        
+        Args:
+            path: The project folder
+            timings: Optional request timings; counts the files and directories scanned
+        
+        Returns:
+            A mapper whose index reflects path
+        """
+        path = project_key(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = self._entries[path] = _MapperEntry(path)
+                self.misses += 1
+            else:
+                self._entries.move_to_end(path)
+                self.hits += 1
+            entry.last_used = time.time()
+        
+        events = []
+        with entry.lock:
+            scanned = True
+            if entry.mapper is None:
+                entry.mapper = FilePathMapper(path, index_cache=self.index_cache, scan_workers=self.scan_workers)
+                entry.watcher = FolderWatcher(entry.mapper, mode=self.watch_mode, poll_interval=self.poll_interval,
+                                              on_events=self._events_callback(path))
+                if not entry.closed and self.watching:
+                    entry.watcher.start()
+            elif not entry.watcher.is_watching(path) and time.monotonic() - entry.checked_at >= self.poll_interval:
+                if entry.mapper.snapshot().directories:
+                    changed = entry.mapper.changed_directories()
+                    if changed:
+                        events = entry.mapper.refresh_directories(changed)
+                    scanned = bool(changed)
+                else:
+                    # The folder was missing or empty when last scanned
+                    entry.mapper.update_monitored_path(path)
+                entry.checked_at = time.monotonic()
+                if not entry.closed and self.watching:
+                    entry.watcher.start()
+                if scanned:
+                    with self._lock:
+                        self.rescans += 1
+            else:
+                scanned = False
+            mapper = entry.mapper
+            if scanned and timings is not None:
+                snapshot = mapper.snapshot()
+                timings.count('files_scanned', snapshot.files_listed)
+                timings.count('directories_scanned', snapshot.directories_listed)
+        if events and self.on_events:
+            self.on_events(path, events)
+        
+        self._evict(keep=path)
+        return mapper
+    
+    def start_watching(self):
+        """
+        Start watchers for mappers built while watching was off
+        
+        Used after a fork: threads do not survive it, so indexes preloaded in the
+        parent are watched from the worker. Changes made since they were scanned
+        are applied first, which only re-lists directories whose mtime changed.
+        """
+        self.watching = True
+        with self._lock:
+            entries = list(self._entries.values())
+        for entry in entries:
+            with entry.lock:
+                if entry.mapper is None or entry.closed or entry.watcher.is_watching(entry.path):
+                    continue
+                events = entry.mapper.refresh_directories(entry.mapper.changed_directories())
+                entry.watcher.start()
+            if events and self.on_events:
+                self.on_events(entry.path, events)
+    
+    def peek(self, path: str) -> Optional[FilePathMapper]:
+        """Get the mapper for path if it is already built, without scanning"""
+        if not path:
+            return None
+        with self._lock:
+            entry = self._entries.get(project_key(path))
+            return entry.mapper if entry is not None else None
+    
+    def watch_backend(self, path: str) -> Optional[str]:
+        """The watcher backend keeping path current ('watchdog' or 'polling'), if any"""
+        if not path:
+            return None
+        with self._lock:
+            entry = self._entries.get(project_key(path))
+        return entry.watcher.backend if entry is not None and entry.watcher is not None else None
+    
+    def discard(self, path: str):
+        """Drop the mapper for path and stop its watcher"""
+        with self._lock:
+            entry = self._entries.pop(project_key(path), None)
+        if entry is not None:
+            self._close(entry)
+    
+    def discard_unless(self, path: str, in_use: Callable[[str], bool]) -> bool:
+        """
+        Drop the mapper for path unless in_use(path) says it is still needed
+        
+        The check and the removal happen under the registry lock, so a get() for
+        the same project cannot build a mapper in between that is then dropped.
+        
+        Returns:
+            True if a mapper was dropped
+        """
+        path = project_key(path)
+        with self._lock:
+            if in_use(path):
+                return False
+            entry = self._entries.pop(path, None)
+        if entry is None:
+            return False
+        self._close(entry)
+        return True
+    
+    def close(self):
+        """Stop every watcher and drop all mappers"""
+        with self._lock:
+            entries, self._entries = list(self._entries.values()), OrderedDict()
+        for entry in entries:
+            self._close(entry)
+    
+    def get_stats(self) -> dict:
+        """Get occupancy, memory accounting and hit counters for status endpoints"""
+        with self._lock:
+            entries = list(self._entries.values())
+            stats = {
+                'entries': len(entries),
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'rescans': self.rescans,
+                'evictions': self.evictions
+            }
+        
+        projects = []
+        for entry in reversed(entries):  # Most recently used first
+            mapper = entry.mapper
+            projects.append({
+                'path': entry.path,
+                'files_tracked': len(mapper.snapshot().index) if mapper else 0,
+                'estimated_bytes': mapper.memory_estimate() if mapper else 0,
+                'watch_backend': entry.watcher.backend if entry.watcher else None,
+                'last_used': entry.last_used
+            })
+        stats['estimated_bytes'] = sum(project['estimated_bytes'] for project in projects)
+        stats['projects'] = projects
+        return stats
+    
+    def _events_callback(self, path: str) -> Optional[Callable[[List[FileEvent]], None]]:
+        if self.on_events is None:
+            return None
+        return lambda events: self.on_events(path, events)
+    
+    def _evict(self, keep: str):
+        """Drop least recently used mappers until the registry is within its limits"""
+        evicted = []
+        with self._lock:
+            # Matchers and fuzzy indexes are built lazily, so sizes are re-read on every check
+            for entry in self._entries.values():
+                if entry.mapper is not None:
+                    entry.bytes = entry.mapper.memory_estimate()
+            total = sum(entry.bytes for entry in self._entries.values())
+            
+            for path in list(self._entries):
+                if len(self._entries) <= self.max_entries and total <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                entry = self._entries.pop(path)
+                total -= entry.bytes
+                evicted.append(entry)
+                self.evictions += 1
+        
+        for entry in evicted:
+            self._close(entry)
+    
+    def _close(self, entry: _MapperEntry):
+        """Stop an entry's watcher once any build or rescan in progress has finished"""
+        with entry.lock:
+            entry.closed = True
+            if entry.watcher is not None:
+                entry.watcher.stop()
@@ -0,0 +1,208 @@
+"""
+Metrics Service for timing the transcription path and exporting Prometheus metrics
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the stage latency buckets
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Prometheus text exposition format served by /api/v1/metrics
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(label: Optional[str], value: Optional[str], extra: str = '') -> str:
+    pairs = []
+    if label is not None:
+        pairs.append(f'{label}="{value}"')
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class MetricsRegistry:
+    """
+    Holds every metric and renders them in the Prometheus text format
+    
+    When disabled, observations return immediately, so instrumented code costs
+    one attribute check per call.
+    """
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List = []
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+    
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+class Counter:
+    """Monotonic counter, optionally split by one label"""
+    
+    def __init__(self, registry: MetricsRegistry, name: str, help_text: str, label: Optional[str] = None):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self._values: Dict[Optional[str], float] = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+    
+    def inc(self, amount: float = 1, label_value: Optional[str] = None):
+        if not self.registry.enabled:
+            return
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items(), key=lambda item: item[0] or '')
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        if not values and self.label is None:
+            values = [(None, 0)]
+        for label_value, value in values:
+            lines.append(f"{self.name}{_labels(self.label, label_value)} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Bucketed distribution of observed values, optionally split by one label"""
+    
+    def __init__(self, registry: MetricsRegistry, name: str, help_text: str,
+                 buckets: Tuple[float, ...] = STAGE_BUCKETS, label: Optional[str] = None):
+        self.registry = registry
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        self._series: Dict[Optional[str], list] = {}  # label value -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+        registry.register(self)
+    
+    def observe(self, value: float, label_value: Optional[str] = None):
+        if not self.registry.enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted(((key, [list(value[0]), value[1], value[2]]) for key, value in self._series.items()),
+                            key=lambda item: item[0] or '')
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_value, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label, label_value, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label, label_value)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label, label_value)} {count}")
+        return lines
+
+
+# Process-wide registry; create_app switches it on or off from METRICS_ENABLED
+METRICS = MetricsRegistry()
+
+STAGE_SECONDS = Histogram(
+    METRICS, 'lazy_coder_transcribe_stage_seconds',
+    'Time spent in each stage of a transcription (upload_read includes spill_write)', label='stage')
+FILES_SCANNED = Counter(
+    METRICS, 'lazy_coder_index_files_scanned_total', 'Files listed by folder index scans and refreshes')
+DIRECTORIES_SCANNED = Counter(
+    METRICS, 'lazy_coder_index_directories_scanned_total', 'Directories listed by folder index scans and refreshes')
+MATCH_ATTEMPTS = Counter(
+    METRICS, 'lazy_coder_replace_match_attempts_total', 'Word boundaries tried for a filename match while replacing')
+REPLACEMENTS = Counter(
+    METRICS, 'lazy_coder_replacements_total', 'Spoken filenames and extensions replaced in transcripts')
+AMBIGUOUS_MATCHES = Counter(
+    METRICS, 'lazy_coder_ambiguous_matches_total', 'Filenames left unreplaced because several files matched')
+
+
+class StageTimings:
+    """
+    Durations and counts for one transcription
+    
+    Stages may be entered more than once and on different threads (a queued job
+    continues on a worker); their times add up. finish() feeds the stage
+    histograms once, so each request counts once per stage.
+    """
+    
+    def __init__(self, report: bool = False):
+        """
+        Args:
+            report: Whether the caller asked for the timings in its response
+        """
+        self.report = report
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._finished = False
+    
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+    
+    def add(self, name: str, seconds: float):
+        """Add time measured elsewhere (e.g., queue wait) to a stage"""
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def count(self, name: str, amount: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + amount
+    
+    def finish(self):
+        """Record the total and feed every stage to the histograms (once)"""
+        if self._finished:
+            return
+        self._finished = True
+        self.stages['total'] = time.perf_counter() - self._started
+        for name, seconds in self.stages.items():
+            STAGE_SECONDS.observe(seconds, name)
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in self.stages.items()},
+            'counts': dict(self.counts)
+        }
+
+
+_NO_STAGE = nullcontext()
+
+
+def stage(timings: Optional[StageTimings], name: str):
+    """Time a block as stage name of timings; a shared no-op when timings is None"""
+    return timings.stage(name) if timings is not None else _NO_STAGE
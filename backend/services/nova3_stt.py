@@ -1,82 +1,177 @@
 """
 Nova-3 STT Service for backend
 """
-import os
-from deepgram import DeepgramClient, PrerecordedOptions, FileSource
+from typing import Optional
 from .file_path_mapper import FilePathMapper
+from .folder_watcher import WATCH_MODES
+from .index_cache import FolderIndexCache
+from .mapper_registry import MapperRegistry
+from .metrics import StageTimings, stage
+from .stt_providers import AudioSource, DeepgramProvider, STTProvider
+from .transcript_cache import TranscriptCache, audio_digest
 
 class Nova3STTService:
-    """Nova-3 Speech-to-Text service with all features"""
+    """Speech-to-text pipeline: an STT provider (Deepgram Nova-3 by default) plus smart file path replacement"""
     
-    def __init__(self, api_key: str = None, monitored_path: str = "."):
-        """Initialize Nova-3 STT service"""
-        if api_key is None:
-            api_key = os.getenv('DEEPGRAM_API_KEY')
-        
-        if not api_key:
-            raise ValueError("Deepgram API key is required. Set DEEPGRAM_API_KEY environment variable.")
+    def __init__(self, api_key: str = None, monitored_path: Optional[str] = None, index_cache_dir: str = None,
+                 scan_workers: int = 1, provider: Optional[STTProvider] = None,
+                 transcript_cache: Optional[TranscriptCache] = None, max_projects: int = 8,
+                 max_index_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the STT service
         
-        self.client = DeepgramClient(api_key)
-        self.file_mapper = FilePathMapper(monitored_path)
+        Args:
+            api_key: Deepgram API key, used when no provider is given
+            monitored_path: Folder mapped when a request names no project; None maps nothing
+                until a session sets a project context
+            index_cache_dir: Where folder indexes are cached for warm starts
+            scan_workers: Threads listing directories during a full scan
+            provider: STT engine; defaults to Deepgram (which requires an API key)
+            transcript_cache: Optional cache of raw transcripts for identical audio
+            max_projects: Most project indexes kept loaded at once
+            max_index_bytes: Most estimated memory the loaded indexes may use
+        """
+        self.provider = provider if provider is not None else DeepgramProvider(api_key)
+        self.transcript_cache = transcript_cache
+        self.default_path = monitored_path
+        self._empty_mapper = FilePathMapper('')  # Used while no project is known; never scans
+        index_cache = FolderIndexCache(index_cache_dir) if index_cache_dir else None
+        self.mappers = MapperRegistry(index_cache=index_cache, scan_workers=scan_workers,
+                                      max_entries=max_projects, max_bytes=max_index_bytes)
+    
+    @property
+    def client(self):
+        """The DeepgramClient when the provider is Deepgram (the SDK is imported on first access), else None"""
+        return getattr(self.provider, 'client', None)
     
-    def transcribe_file(self, file_path: str) -> dict:
+    def transcribe_file(self, file_path: str, monitored_path: Optional[str] = None,
+                        timings: Optional[StageTimings] = None, mapper: Optional[FilePathMapper] = None,
+                        content_type: Optional[str] = None) -> dict:
         """
-        Transcribe audio file using Nova-3 with all features
+        Transcribe an audio file with the STT provider
         
         Args:
             file_path: Path to audio file
+            monitored_path: Project whose files are mapped in the transcript
+            timings: Optional per-stage timings to add to
+            mapper: Index already loaded for monitored_path (e.g., once per batch); skips the lookup
+            content_type: MIME type of the audio, sent upstream
             
         Returns:
             Dictionary with transcript and confidence
         """
         try:
-            # Read audio file
+            # Stream the file to the client rather than reading it into memory
             with open(file_path, "rb") as file:
-                buffer_data = file.read()
-
-            payload: FileSource = {
-                "buffer": buffer_data,
+                return self._transcribe(file, monitored_path, timings, mapper, content_type)
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'model': self.provider.model
             }
-
-            # Nova-3 with all features
-            options = PrerecordedOptions(
-                model="nova-3",
-                smart_format=True,
-                punctuate=True,
-                numerals=True,
-                filler_words=True
-            )
-
-            # Transcribe
-            response = self.client.listen.rest.v("1").transcribe_file(payload, options)
+    
+    def transcribe_buffer(self, audio_data: bytes, monitored_path: Optional[str] = None,
+                          timings: Optional[StageTimings] = None, mapper: Optional[FilePathMapper] = None,
+                          content_type: Optional[str] = None) -> dict:
+        """
+        Transcribe audio already held in memory with the STT provider
+        
+        Args:
+            audio_data: Encoded audio bytes (e.g., a WebM upload)
+            monitored_path: Project whose files are mapped in the transcript
+            timings: Optional per-stage timings to add to
+            mapper: Index already loaded for monitored_path (e.g., once per batch); skips the lookup
+            content_type: MIME type of the audio, sent upstream
+            
+        Returns:
+            Dictionary with transcript and confidence
+        """
+        return self._transcribe(audio_data, monitored_path, timings, mapper, content_type)
+    
+    def _transcribe(self, audio: AudioSource, monitored_path: Optional[str] = None,
+                    timings: Optional[StageTimings] = None, mapper: Optional[FilePathMapper] = None,
+                    content_type: Optional[str] = None) -> dict:
+        """Send audio to the provider (unless cached) and apply file path replacement"""
+        upstream_attempts = []
+        try:
+            cached = None
+            if self.transcript_cache:
+                with stage(timings, 'transcript_cache'):
+                    cache_key = TranscriptCache.make_key(audio_digest(audio), self.provider.cache_namespace)
+                    cached = self.transcript_cache.get(cache_key)
             
-            # Extract results
-            transcript = response['results']['channels'][0]['alternatives'][0]['transcript']
-            confidence = response['results']['channels'][0]['alternatives'][0]['confidence']
+            if cached:
+                transcript, confidence = cached
+            else:
+                with stage(timings, 'stt'):
+                    transcript, confidence = self.provider.transcribe(audio, timings=upstream_attempts,
+                                                                      content_type=content_type)
+                if self.transcript_cache:
+                    self.transcript_cache.put(cache_key, transcript, confidence)
             
-            # Apply smart file path replacement
-            enhanced_transcript = self.file_mapper.replace_filenames_in_text(transcript)
+            # Replacement runs on hits too, since the folder index may have changed
+            if mapper is None:
+                with stage(timings, 'index'):
+                    mapper = self.ensure_monitored_path(monitored_path, timings)
+            ambiguities = []
+            with stage(timings, 'replace'):
+                enhanced_transcript = mapper.replace_filenames_in_text(
+                    transcript, timings.counts if timings is not None else None, ambiguities)
             
             return {
                 'success': True,
                 'transcript': enhanced_transcript,
                 'original_transcript': transcript,  # Keep original for comparison
                 'confidence': confidence,
-                'model': 'nova-3',
-                'file_replacements_applied': enhanced_transcript != transcript
+                'model': self.provider.model,
+                'file_replacements_applied': enhanced_transcript != transcript,
+                'ambiguous_filenames': ambiguities,
+                'cached': cached is not None,
+                'upstream_attempts': upstream_attempts
             }
             
         except Exception as e:
             return {
                 'success': False,
                 'error': str(e),
-                'model': 'nova-3'
+                'model': self.provider.model,
+                'upstream_attempts': upstream_attempts
             }
     
-    def update_monitored_path(self, new_path: str):
-        """Update the monitored path for file mapping"""
-        self.file_mapper.update_monitored_path(new_path)
+    def enable_folder_watch(self, mode: str = 'auto', poll_interval: float = 2.0, on_events=None):
+        """
+        Keep project indexes current from filesystem events instead of rescanning
+        
+        Applies to projects loaded from now on.
+        
+        Args:
+            mode: 'auto', 'watchdog', 'polling' or 'off'
+            poll_interval: Seconds between mtime checks when polling
+            on_events: Called with (monitored path, file events) applied to that project's index
+        """
+        if mode not in WATCH_MODES:
+            raise ValueError(f"Unknown folder watch mode '{mode}'. Expected one of: {', '.join(WATCH_MODES)}")
+        self.mappers.watch_mode = mode
+        self.mappers.poll_interval = poll_interval
+        self.mappers.on_events = on_events
+    
+    def ensure_monitored_path(self, path: Optional[str] = None, timings: Optional[StageTimings] = None) -> FilePathMapper:
+        """
+        Get the mapper for a project, scanning only when it is not loaded or is stale
+        
+        Args:
+            path: Project folder; defaults to the service's default path
+            timings: Optional request timings; counts files scanned if a scan was needed
+        
+        Returns:
+            The project's mapper, or an empty one when there is no project to map
+        """
+        path = path or self.default_path
+        if not path:
+            return self._empty_mapper
+        return self.mappers.get(path, timings)
     
-    def get_folder_structure(self) -> dict:
-        """Get the current folder structure being monitored"""
-        return self.file_mapper.get_folder_structure_summary()
+    def get_folder_structure(self, path: Optional[str] = None) -> dict:
+        """Get the folder structure of a project"""
+        return self.ensure_monitored_path(path).get_folder_structure_summary()
@@ -0,0 +1,86 @@
+"""
+Path Suffix Index Service for telling apart files that share a name by the directories said before it
+"""
+from typing import Dict, List, Sequence, Tuple
+
+from .compact_index import CompactFileIndex
+from .spoken_names import tokenize
+
+# Most candidates listed when a mention stays ambiguous
+MAX_REPORTED_CANDIDATES = 10
+
+
+class PathSuffixIndex:
+    """
+    Reversed directory-name trie over each group of files sharing a name
+    
+    Narrowing a match walks back over the words before it ("monitoring dot py",
+    then "routes", then "backend") one trie edge per word, so picking the file whose
+    path ends in those directories costs the same however many files share the
+    name. Nodes that complete a directory name list the files whose paths end
+    there, so a suffix is only accepted on whole directory names.
+    
+    Tries are built on first use per group; groups of one file are walked without
+    keeping a trie.
+    """
+    
+    def __init__(self, index: CompactFileIndex):
+        self._index = index
+        self._tries: Dict[Tuple[int, ...], dict] = {}  # candidate file ids -> trie of their directories
+        self._directory_tokens: Dict[int, Tuple[str, ...]] = {}  # directory id -> tokens of its name
+    
+    def narrow(self, candidates: Tuple[int, ...], words: Sequence[str],
+               can_end: Sequence[bool]) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Narrow candidates by the words said before their name
+        
+        Args:
+            candidates: Files sharing the matched name
+            words: Tokens before the name, nearest first
+            can_end: Whether a qualifier may start at each word (it begins a word in the text)
+        
+        Returns:
+            (number of words consumed, files whose paths end in those directories)
+        """
+        node = self._tries.get(candidates)
+        if node is None:
+            node = self._build_trie(candidates)
+            if len(candidates) > 1:
+                self._tries[candidates] = node
+        
+        consumed, remaining = 0, candidates
+        for count, word in enumerate(words, 1):
+            node = node.get(word)
+            if node is None:
+                break
+            files = node.get(None)
+            if files and can_end[count - 1]:
+                consumed, remaining = count, tuple(files)
+        return consumed, remaining
+    
+    def describe(self, candidates: Sequence[int]) -> Dict[str, object]:
+        """Summarize an ambiguous match for API responses"""
+        paths = sorted(self._index.path(file_id) for file_id in candidates)
+        return {'candidates': [f"@{path}" for path in paths[:MAX_REPORTED_CANDIDATES]], 'total': len(paths)}
+    
+    def _build_trie(self, candidates: Tuple[int, ...]) -> dict:
+        """Insert each candidate's directories, nearest first, as reversed token paths"""
+        root: dict = {}
+        for file_id in candidates:
+            node = root
+            dir_id = self._index.file_directory(file_id)
+            while dir_id > 0:  # The root directory has no name to say
+                for token in reversed(self._tokens(dir_id)):
+                    node = node.setdefault(token, {})
+                files: List[int] = node.setdefault(None, [])
+                if not files or files[-1] != file_id:
+                    files.append(file_id)
+                dir_id = self._index.parent_directory(dir_id)
+        return root
+    
+    def _tokens(self, dir_id: int) -> Tuple[str, ...]:
+        tokens = self._directory_tokens.get(dir_id)
+        if tokens is None:
+            tokens = self._directory_tokens[dir_id] = tuple(
+                token.text for token in tokenize(self._index.directory_name(dir_id)))
+        return tokens
@@ -1,61 +1,227 @@
 """
 Session manager for handling monitoring sessions
 """
+import itertools
+import threading
 import uuid
-from datetime import datetime
-from typing import Dict, Optional, List
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional, List, Set, Tuple
 
-from ..models.monitoring_session import MonitoringSession
+from ..models.file_event import FileEvent
+from ..models.monitoring_session import MonitoringSession, RECENT_EVENTS_LIMIT
 from ..config import Config
 
 class SessionManager:
-    """Manages monitoring sessions and file events"""
+    """
+    Manages monitoring sessions and file events
+    
+    Several sessions can be active at once (e.g., two engineers on different
+    projects). Requests pick theirs by session ID; requests without one use the
+    most recently created session.
+    
+    Sessions idle for longer than MONITORING_TIMEOUT are expired by a background
+    reaper. Ended sessions are kept as a bounded history (the oldest ended ones
+    are dropped first) with only their most recent events, so memory stays flat
+    however long the server runs.
+    
+    The session table, the current session and history are only changed under
+    one lock, so concurrent requests and the reaper never see them half-updated;
+    each session guards its own event buffer.
+    """
     
     def __init__(self, config: Config):
         self.config = config
-        self.sessions: Dict[str, MonitoringSession] = {}
+        self.sessions: Dict[str, MonitoringSession] = OrderedDict()  # In creation order
         self.current_session: Optional[MonitoringSession] = None
+        self.timeout = config.get('MONITORING_TIMEOUT', 300)
+        self.history_limit = config.get('SESSION_HISTORY_LIMIT', 500)
+        self.on_sessions_ended: Optional[Callable[[List[MonitoringSession]], None]] = None
+        
+        self._ended: deque = deque()  # IDs of ended sessions, oldest first
+        self._sequence = itertools.count(1)
+        self._lock = threading.RLock()
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+        self.expired = 0
     
     def create_session(self, path: str) -> MonitoringSession:
         """Create a new monitoring session"""
         session_id = str(uuid.uuid4())
+        now = datetime.now()
         session = MonitoringSession(
             session_id=session_id,
             path=path,
-            start_time=datetime.now()
+            start_time=now,
+            recent_events=deque(maxlen=self.config.get('MAX_EVENTS_STORED', 1000)),
+            sequence=next(self._sequence),
+            last_activity=now
         )
         
-        self.sessions[session_id] = session
-        self.current_session = session
+        with self._lock:
+            self.sessions[session_id] = session
+            self.current_session = session
         
         return session
     
+    def end_session(self, session_id: str, reason: str = 'stopped') -> Optional[MonitoringSession]:
+        """End a specific session"""
+        with self._lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                return None
+            if session.is_active:
+                self._end(session, reason)
+        self._notify_ended([session])
+        return session
+    
     def end_current_session(self) -> Optional[MonitoringSession]:
         """End the current monitoring session"""
-        if self.current_session:
-            self.current_session.is_active = False
-            ended_session = self.current_session
-            self.current_session = None
-            return ended_session
-        return None
+        with self._lock:
+            session = self.current_session
+            if session is None:
+                return None
+            self._end(session, 'stopped')
+        self._notify_ended([session])
+        return session
     
+    def expire_idle_sessions(self, now: Optional[datetime] = None) -> List[MonitoringSession]:
+        """
+        End active sessions that have been idle for longer than the timeout
+        
+        Returns:
+            The sessions that were expired
+        """
+        if self.timeout <= 0:
+            return []
+        cutoff = (now or datetime.now()) - timedelta(seconds=self.timeout)
+        with self._lock:
+            idle = [session for session in self.sessions.values()
+                    if session.is_active and (session.last_activity or session.start_time) < cutoff]
+            for session in idle:
+                self._end(session, 'expired')
+            self.expired += len(idle)
+        self._notify_ended(idle)
+        return idle
+    
+    def start_reaper(self, interval: Optional[float] = None):
+        """Expire idle sessions in the background every interval seconds"""
+        if self.timeout <= 0 or self._reaper is not None:
+            return
+        if interval is None:
+            interval = self.config.get('SESSION_REAP_INTERVAL', 30.0)
+        
+        def run():
+            while not self._reaper_stop.wait(interval):
+                try:
+                    self.expire_idle_sessions()
+                except Exception as e:
+                    print(f"Warning: Failed to expire idle sessions: {e}")
+        
+        self._reaper_stop.clear()
+        self._reaper = threading.Thread(target=run, name='session-reaper', daemon=True)
+        self._reaper.start()
+    
+    def stop_reaper(self):
+        """Stop the background reaper"""
+        self._reaper_stop.set()
+        if self._reaper is not None:
+            self._reaper.join(timeout=5)
+        self._reaper = None
+    
+    def record_events(self, path: str, events: List[FileEvent]):
+        """Attach file events from a project's folder watcher to the active sessions on that project"""
+        with self._lock:
+            sessions = [session for session in self.sessions.values() if session.is_active and session.path == path]
+        for session in sessions:
+            for event in events:
+                session.record_event(event)
     
     def get_current_session(self) -> Optional[MonitoringSession]:
         """Get the current active session"""
-        return self.current_session
+        with self._lock:
+            return self.current_session
     
     def get_session(self, session_id: str) -> Optional[MonitoringSession]:
         """Get a specific session by ID"""
-        return self.sessions.get(session_id)
+        with self._lock:
+            return self.sessions.get(session_id)
+    
+    def resolve_session(self, session_id: Optional[str] = None) -> Optional[MonitoringSession]:
+        """
+        Find the session a request belongs to and mark it as used
+        
+        A session that expired while idle is reactivated, so a client coming back
+        after a break keeps its session (its project index is reloaded on demand).
+        
+        Args:
+            session_id: ID sent with the request, if any
+        
+        Returns:
+            That session (None if unknown), or the current session when no ID was sent
+        """
+        with self._lock:
+            session = self.sessions.get(session_id) if session_id else self.current_session
+            if session is None:
+                return None
+            if not session.is_active and session.end_reason == 'expired':
+                self._reactivate(session)
+            session.touch()
+            return session
+    
+    def active_paths(self) -> Set[str]:
+        """Project paths of all active sessions"""
+        with self._lock:
+            return {session.path for session in self.sessions.values() if session.is_active}
     
     def get_all_sessions(self) -> List[MonitoringSession]:
-        """Get all sessions"""
-        return list(self.sessions.values())
+        """Get all retained sessions (active ones plus the bounded history)"""
+        with self._lock:
+            return list(self.sessions.values())
     
-    def get_session_status(self) -> dict:
-        """Get current session status"""
-        if self.current_session:
-            return self.current_session.to_dict()
+    def list_sessions(self, limit: int = 50, before: Optional[int] = None,
+                      active_only: bool = False) -> Tuple[List[MonitoringSession], Optional[int]]:
+        """
+        Get one page of sessions, newest first
+        
+        Args:
+            limit: Most sessions returned
+            before: Cursor from the previous page; only older sessions are returned
+            active_only: Skip ended sessions
+        
+        Returns:
+            Tuple of (sessions, cursor for the next page or None on the last page)
+        """
+        page = []
+        with self._lock:
+            for session in reversed(self.sessions.values()):
+                if before is not None and session.sequence >= before:
+                    continue
+                if active_only and not session.is_active:
+                    continue
+                if len(page) == limit:
+                    return page, page[-1].sequence
+                page.append(session)
+        return page, None
+    
+    def get_stats(self) -> dict:
+        """Get session counts for status endpoints"""
+        with self._lock:
+            retained = len(self.sessions)
+            ended = len(self._ended)
+        return {
+            'active': retained - ended,
+            'history': ended,
+            'history_limit': self.history_limit,
+            'expired': self.expired,
+            'timeout': self.timeout
+        }
+    
+    def get_session_status(self, session: Optional[MonitoringSession] = None) -> dict:
+        """Get a session's status (the current session's by default)"""
+        session = session or self.get_current_session()
+        if session:
+            return session.to_dict()
         return {
             'session_id': None,
             'path': None,
@@ -64,3 +230,34 @@ class SessionManager:
             'total_events': 0,
             'recent_events': []
         }
+    
+    def _end(self, session: MonitoringSession, reason: str):
+        """Move a session into the bounded history (caller holds the lock)"""
+        session.is_active = False
+        session.end_time = datetime.now()
+        session.end_reason = reason
+        # Ended sessions only ever show their latest events
+        session.resize_events(RECENT_EVENTS_LIMIT)
+        if self.current_session is session:
+            self.current_session = None
+        
+        self._ended.append(session.session_id)
+        while len(self._ended) > self.history_limit:
+            dropped = self.sessions.pop(self._ended.popleft(), None)
+            if dropped is self.current_session:
+                self.current_session = None
+    
+    def _reactivate(self, session: MonitoringSession):
+        """Bring an expired session back (caller holds the lock)"""
+        self._ended.remove(session.session_id)
+        session.is_active = True
+        session.end_time = None
+        session.end_reason = None
+        session.resize_events(self.config.get('MAX_EVENTS_STORED', 1000))
+    
+    def _notify_ended(self, sessions: List[MonitoringSession]):
+        if sessions and self.on_sessions_ended:
+            try:
+                self.on_sessions_ended(sessions)
+            except Exception as e:
+                print(f"Warning: Failed to release resources of ended sessions: {e}")
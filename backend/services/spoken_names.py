@@ -0,0 +1,289 @@
+"""
+Spoken Names Service for normalizing filenames and transcripts into comparable token streams
+"""
+import re
+import sys
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .compact_index import CompactFileIndex
+
+# Token standing for both a literal "." inside a word and the spoken word "dot"
+DOT = '.'
+
+# Extra spoken forms STT produces for some extensions (besides letter-by-letter and whole)
+EXTENSION_ALIASES: Dict[str, List[List[str]]] = {
+    'json': [['j', 'son'], ['jason']],
+    'py': [['pie']],
+}
+
+# camelCase / PascalCase / ACRONYMWord pieces, digit runs, and any other letters
+_TOKEN_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+|[^\W\d_]+')
+
+# What may separate two tokens of one spoken name: whitespace, snake/kebab separators, or nothing
+_JOINER_PATTERN = re.compile(r'[\s_\-]*')
+
+# Prefix marking trie edges keyed by phonetic key (stem words) rather than exact text
+_PHONETIC = '~'
+
+# Prefix marking the stem-node key of an extension said without "dot"; shares the DOT path's list
+_IMPLICIT_DOT = '+'
+
+# Extensions also matched without a spoken "dot" ("frontend app tsx") unless they are common words
+_NO_IMPLICIT_DOT = frozenset({'am', 'an', 'as', 'at', 'be', 'by', 'do', 'go', 'if', 'in', 'is', 'it',
+                              'me', 'my', 'no', 'of', 'on', 'or', 'so', 'to', 'up', 'us', 'we'})
+
+
+class Token(NamedTuple):
+    """A normalized word piece of a transcript or filename"""
+    start: int
+    end: int
+    text: str  # lowercase word, digits, or DOT
+    spoken_dot: bool  # True for the word "dot", False for a literal "."
+
+
+def tokenize(text: str) -> List[Token]:
+    """
+    Split text into normalized tokens
+    
+    Splits camelCase, snake_case, kebab-case and letter/digit runs. A "." directly
+    between two word pieces ("app.py") and the spoken word "dot" both become DOT.
+    """
+    tokens: List[Token] = []
+    previous_end = None
+    for match in _TOKEN_PATTERN.finditer(text):
+        start = match.start()
+        if previous_end is not None and start == previous_end + 1 and text[previous_end] == '.':
+            tokens.append(Token(previous_end, start, DOT, False))
+        
+        word = match.group().lower()
+        if word == 'dot':
+            tokens.append(Token(start, match.end(), DOT, True))
+        else:
+            tokens.append(Token(start, match.end(), word, False))
+        previous_end = match.end()
+    return tokens
+
+
+def joinable_flags(text: str, tokens: List[Token]) -> List[bool]:
+    """For each token, whether it may continue a name started by the previous token"""
+    flags = [False] * len(tokens)
+    for index in range(1, len(tokens)):
+        gap = text[tokens[index - 1].end:tokens[index].start]
+        flags[index] = _JOINER_PATTERN.fullmatch(gap) is not None
+    return flags
+
+
+@lru_cache(maxsize=65536)
+def phonetic_key(word: str) -> str:
+    """
+    Simplified Metaphone-style key so near-homophones share a key
+    
+    "manager" and "manger" both become "mnjr"; "session" and "sesion" become "ssn".
+    Non-ASCII or non-alphabetic words are returned unchanged.
+    """
+    if not word.isalpha() or not word.isascii():
+        return word
+    
+    word = word.lower()
+    for prefix in ('kn', 'gn', 'pn', 'wr', 'ae'):
+        if word.startswith(prefix):
+            word = word[1:]
+            break
+    if word.startswith('x'):
+        word = 's' + word[1:]
+    for written, sound in (('ph', 'f'), ('ck', 'k'), ('sch', 'sk'), ('tch', 'ch'), ('qu', 'kw'), ('dg', 'j')):
+        word = word.replace(written, sound)
+    
+    key: List[str] = []
+    previous = ''
+    for index, char in enumerate(word):
+        following = word[index + 1] if index + 1 < len(word) else ''
+        if char == previous:
+            continue  # Doubled letters sound like one
+        previous = char
+        
+        if char in 'aeiou':
+            code = 'a' if index == 0 else ''
+        elif char == 'c':
+            code = 'x' if following == 'h' else ('s' if following and following in 'eiy' else 'k')
+        elif char == 'g':
+            code = 'j' if following and following in 'eiy' else 'k'
+        elif char == 's':
+            code = 'x' if following == 'h' else 's'
+        elif char == 't':
+            code = '0' if following == 'h' else 't'
+        elif char == 'h':
+            code = 'h' if index == 0 and following and following in 'aeiou' else ''
+        elif char in 'wy':
+            code = char if following and following in 'aeiou' else ''
+        else:
+            code = {'d': 't', 'q': 'k', 'x': 'ks', 'z': 's', 'v': 'f'}.get(char, char)
+        key.append(code)
+    
+    return ''.join(key) or word
+
+
+def _stem_key(token: str) -> str:
+    """Trie edge key for a token in the name part of a filename"""
+    if token == DOT or not token.isalpha():
+        return token
+    return _PHONETIC + phonetic_key(token)
+
+
+def extension_spoken_forms(ext: str) -> List[List[str]]:
+    """All token sequences that may be said for an extension ("py" -> [p, y], [py], [pie])"""
+    ext = ext.lower()
+    forms: List[List[str]] = []
+    for form in ([char for char in ext if char.isalnum()],
+                 [token.text for token in tokenize(ext)]) + tuple(EXTENSION_ALIASES.get(ext, [])):
+        if form and form not in forms:
+            forms.append(form)
+    return forms
+
+
+class SpokenNameIndex:
+    """
+    Token trie mapping spoken forms of every tracked filename to its file id
+    
+    Built once per scan. Name words are compared by phonetic key, the extension
+    exactly, so "session manger dot p y", "SessionManager.py" and
+    "session manager dot py" all reach session_manager.py in one walk. An
+    extension said as one word may follow the name without "dot" ("app tsx").
+    Every file sharing a spoken form is kept, so callers can tell them apart.
+    """
+    
+    def __init__(self, index: CompactFileIndex):
+        self._names: dict = {}  # token trie; None key holds [(stem tokens, file id or ids)]
+        self._extensions: dict = {}  # token trie after DOT; None key holds the extension
+        
+        # Files sharing stem tokens at a node share one entry, so scoring a name
+        # costs the same however many folders hold it; (list id, stem) -> (list, position)
+        groups: Dict[Tuple[int, Tuple[str, ...]], Tuple[list, int]] = {}
+        for file_id, filename in index.files():
+            if '.' not in filename:
+                continue
+            # Dunder files are never spoken by name (matches the old alias rule)
+            if filename.startswith('__'):
+                continue
+            
+            stem, ext = filename.rsplit('.', 1)
+            stem_tokens = tuple(token.text for token in tokenize(stem))
+            if not stem_tokens:
+                continue
+            
+            stem_node = self._names
+            for token in stem_tokens:
+                stem_node = stem_node.setdefault(_stem_key(token), {})
+            
+            dot_node = stem_node.setdefault(DOT, {})
+            for form in extension_spoken_forms(ext):
+                node = dot_node
+                for token in form:
+                    node = node.setdefault(token, {})
+                candidates = node.setdefault(None, [])
+                group = groups.get((id(candidates), stem_tokens))
+                if group is None:
+                    groups[(id(candidates), stem_tokens)] = (candidates, len(candidates))
+                    candidates.append((stem_tokens, [file_id]))
+                else:
+                    file_ids = group[0][group[1]][1]
+                    if file_ids[-1] != file_id:  # A file's forms are added together
+                        file_ids.append(file_id)
+                if len(form) == 1 and form[0] == ext.lower() and len(ext) > 1 and form[0] not in _NO_IMPLICIT_DOT:
+                    stem_node.setdefault(sys.intern(_IMPLICIT_DOT + form[0]), candidates)
+                
+                node = self._extensions
+                for token in form:
+                    node = node.setdefault(token, {})
+                node.setdefault(None, ext)
+        
+        for candidates, position in groups.values():
+            stem_tokens, file_ids = candidates[position]
+            candidates[position] = (stem_tokens, file_ids[0] if len(file_ids) == 1 else tuple(file_ids))
+    
+    def __bool__(self) -> bool:
+        return bool(self._names) or bool(self._extensions)
+    
+    def match_name(self, tokens: List[Token], joinable: List[bool], first: int) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        """
+        Find the longest tracked filename spoken starting at tokens[first]
+        
+        Returns:
+            (index of the last token matched, ids of the files heard equally well), or None
+        """
+        best: Optional[Tuple[int, int, Tuple[int, ...]]] = None  # (last token, exact words, file ids)
+        stack = [(self._names, first)]
+        while stack:
+            node, index = stack.pop()
+            
+            candidates = node.get(None)
+            if candidates:
+                accepted = self._pick_candidate(tokens, first, candidates)
+                if accepted and (best is None or (index - 1, accepted[0]) > best[:2]):
+                    best = (index - 1, accepted[0], accepted[1])
+            
+            if index >= len(tokens) or (index > first and not joinable[index]):
+                continue
+            text = tokens[index].text
+            child = node.get(text)
+            if child:
+                stack.append((child, index + 1))
+            if index > first:
+                candidates = node.get(_IMPLICIT_DOT + text)
+                if candidates:
+                    accepted = self._pick_candidate(tokens, first, candidates)
+                    if accepted and (best is None or (index, accepted[0]) > best[:2]):
+                        best = (index, accepted[0], accepted[1])
+            if text.isalpha():
+                child = node.get(_PHONETIC + phonetic_key(text))
+                if child:
+                    stack.append((child, index + 1))
+        
+        return (best[0], best[2]) if best else None
+    
+    @staticmethod
+    def _pick_candidate(tokens: List[Token], first: int,
+                        candidates: List[Tuple[Tuple[str, ...], Union[int, Tuple[int, ...]]]]) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        """
+        Choose the candidates whose name words were heard most exactly
+        
+        A phonetic-only word is accepted only when at least half of a multi-word
+        name matched exactly, so "sun manager" cannot become session_manager.py
+        and a single misheard word never becomes a path.
+        
+        Returns:
+            (exact words, ids of every file heard that exactly), or None
+        """
+        best_exact = -1
+        best: Tuple[int, ...] = ()
+        for stem_tokens, file_ids in candidates:
+            exact = sum(1 for offset, token in enumerate(stem_tokens) if tokens[first + offset].text == token)
+            if exact < len(stem_tokens) and (len(stem_tokens) < 2 or exact * 2 < len(stem_tokens)):
+                continue
+            if isinstance(file_ids, int):
+                file_ids = (file_ids,)
+            if exact > best_exact:
+                best_exact, best = exact, file_ids
+            elif exact == best_exact:
+                best = best + file_ids
+        return (best_exact, best) if best else None
+    
+    def match_extension(self, tokens: List[Token], joinable: List[bool], dot: int) -> Optional[Tuple[int, str]]:
+        """
+        Find the longest tracked extension spoken after the DOT token at tokens[dot]
+        
+        Returns:
+            (index of the last token matched, extension), or None
+        """
+        best = None
+        node = self._extensions
+        index = dot + 1
+        while index < len(tokens) and joinable[index]:
+            node = node.get(tokens[index].text)
+            if node is None:
+                break
+            if None in node:
+                best = (index, node[None])
+            index += 1
+        return best
@@ -0,0 +1,220 @@
+"""
+Streaming STT Service for live transcription of audio chunks as they are recorded
+"""
+import queue
+import re
+import threading
+from typing import Callable, List, Optional
+
+# Called with (text, is_final) for every transcript a stream produces
+TranscriptCallback = Callable[[str, bool], None]
+
+# Where the fake stream ends a finalized segment
+_SENTENCE_END = re.compile(r'[.!?](?=\s)')
+
+
+class StreamingSTTSession:
+    """One live transcription stream: audio chunks in, transcript callbacks out"""
+    
+    def send(self, chunk: bytes):
+        """Forward one encoded audio chunk (e.g., a MediaRecorder WebM slice)"""
+        raise NotImplementedError
+    
+    def finish(self):
+        """Flush the stream; every final transcript is delivered before this returns"""
+        raise NotImplementedError
+
+
+class StreamingSTTBackend:
+    """Opens live transcription streams against one STT engine"""
+    
+    name = ''
+    
+    def open_session(self, on_transcript: TranscriptCallback) -> StreamingSTTSession:
+        """
+        Open a live transcription stream
+        
+        Args:
+            on_transcript: Called with (text, is_final); may run on another thread
+        
+        Returns:
+            The open session
+        """
+        raise NotImplementedError
+
+
+class _DeepgramStreamingSession(StreamingSTTSession):
+    """Deepgram live WebSocket connection"""
+    
+    def __init__(self, client, on_transcript: TranscriptCallback):
+        from deepgram import LiveOptions, LiveTranscriptionEvents  # Imported with the SDK client, on first stream
+        
+        def handle_transcript(_connection, result, **kwargs):
+            alternatives = result.channel.alternatives
+            text = alternatives[0].transcript if alternatives else ''
+            if text:
+                on_transcript(text, bool(result.is_final))
+        
+        self._connection = client.listen.websocket.v("1")
+        self._connection.on(LiveTranscriptionEvents.Transcript, handle_transcript)
+        
+        # Container (WebM/Opus) audio is detected by Deepgram, so no encoding is given
+        options = LiveOptions(
+            model="nova-3",
+            smart_format=True,
+            punctuate=True,
+            numerals=True,
+            filler_words=True,
+            interim_results=True
+        )
+        if not self._connection.start(options):
+            raise RuntimeError("Failed to open Deepgram live transcription stream")
+    
+    def send(self, chunk: bytes):
+        self._connection.send(chunk)
+    
+    def finish(self):
+        self._connection.finish()
+
+
+class DeepgramStreamingBackend(StreamingSTTBackend):
+    """Live transcription through Deepgram's streaming API"""
+    
+    name = 'deepgram'
+    
+    def __init__(self, provider):
+        self.provider = provider  # DeepgramProvider; its SDK client is created on the first stream
+    
+    def open_session(self, on_transcript: TranscriptCallback) -> StreamingSTTSession:
+        return _DeepgramStreamingSession(self.provider.client, on_transcript)
+
+
+class _FakeStreamingSession(StreamingSTTSession):
+    """Treats each chunk as UTF-8 text; emits interims per chunk and finals per sentence"""
+    
+    def __init__(self, on_transcript: TranscriptCallback):
+        self._on_transcript = on_transcript
+        self._pending = ''
+    
+    def send(self, chunk: bytes):
+        self._pending += bytes(chunk).decode('utf-8', errors='replace')
+        
+        # Everything up to the last sentence end is final; the rest is still interim
+        last_end = None
+        for match in _SENTENCE_END.finditer(self._pending):
+            last_end = match.end()
+        if last_end is not None:
+            final, self._pending = self._pending[:last_end], self._pending[last_end:]
+            self._on_transcript(final.strip(), True)
+        if self._pending.strip():
+            self._on_transcript(self._pending.strip(), False)
+    
+    def finish(self):
+        if self._pending.strip():
+            self._on_transcript(self._pending.strip(), True)
+        self._pending = ''
+
+
+class FakeStreamingBackend(StreamingSTTBackend):
+    """Local, deterministic stand-in for a streaming STT engine"""
+    
+    name = 'fake'
+    
+    def open_session(self, on_transcript: TranscriptCallback) -> StreamingSTTSession:
+        return _FakeStreamingSession(on_transcript)
+
+
+STREAMING_BACKENDS = {
+    DeepgramStreamingBackend.name: DeepgramStreamingBackend,
+    FakeStreamingBackend.name: FakeStreamingBackend,
+}
+
+
+def create_streaming_backend(name: str, provider=None) -> StreamingSTTBackend:
+    """
+    Create a streaming backend by name
+    
+    Args:
+        name: 'deepgram' or 'fake'
+        provider: The STT provider; 'deepgram' requires the deepgram provider
+    """
+    if name not in STREAMING_BACKENDS:
+        raise ValueError(f"Unknown streaming STT backend '{name}'. Expected one of: {', '.join(STREAMING_BACKENDS)}")
+    if name == DeepgramStreamingBackend.name:
+        if getattr(provider, 'name', None) != 'deepgram':
+            raise ValueError("Streaming STT backend 'deepgram' requires the deepgram STT provider.")
+        return DeepgramStreamingBackend(provider)
+    return STREAMING_BACKENDS[name]()
+
+
+class LiveTranscription:
+    """
+    Runs one streaming STT session and applies file path replacement to final segments
+    
+    Transcripts may arrive on the STT engine's thread, so they are queued as
+    JSON-ready messages for the connection thread to send.
+    """
+    
+    def __init__(self, backend: StreamingSTTBackend, replace_filenames: Callable[[str], str]):
+        self.backend = backend
+        self.replace_filenames = replace_filenames
+        self.messages: "queue.Queue[dict]" = queue.Queue()
+        self.segments: List[str] = []  # Final segments with replacement applied
+        self.original_segments: List[str] = []
+        self._session: Optional[StreamingSTTSession] = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Open the STT stream"""
+        self._session = self.backend.open_session(self._on_transcript)
+    
+    def send(self, chunk: bytes):
+        """Forward one audio chunk"""
+        self._session.send(chunk)
+    
+    def finish(self) -> dict:
+        """
+        Flush the stream and summarize the full transcription
+        
+        Returns:
+            Dictionary shaped like the /transcribe response
+        """
+        if self._session is not None:
+            self._session.finish()
+            self._session = None
+        
+        with self._lock:
+            transcription = ' '.join(self.segments)
+            original = ' '.join(self.original_segments)
+        return {
+            'transcription': transcription,
+            'original_transcript': original,
+            'file_replacements_applied': transcription != original,
+            'model': self.backend.name
+        }
+    
+    def take_messages(self) -> List[dict]:
+        """Drain the messages queued since the last call"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+    
+    def _on_transcript(self, text: str, is_final: bool):
+        if not is_final:
+            self.messages.put({'type': 'interim', 'text': text})
+            return
+        
+        # Finalized segments never change again, so each is replaced exactly once
+        replaced = self.replace_filenames(text)
+        with self._lock:
+            self.segments.append(replaced)
+            self.original_segments.append(text)
+        self.messages.put({
+            'type': 'final',
+            'text': replaced,
+            'original_text': text,
+            'file_replacements_applied': replaced != text
+        })
@@ -0,0 +1,238 @@
+"""
+STT Providers Service for the speech-to-text engines behind the transcription pipeline
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+from .upstream_http import UpstreamClient, UpstreamError, UpstreamPolicy
+
+# Audio handed to a provider: bytes already in memory, or an open binary file
+AudioSource = Union[bytes, BinaryIO]
+
+DEEPGRAM_API_URL = 'https://api.deepgram.com'
+
+# Content-Type sent when the audio's type is unknown (browser MediaRecorder uploads)
+DEFAULT_AUDIO_CONTENT_TYPE = 'audio/webm'
+
+# Transcript the local provider returns when it has no fixtures
+DEFAULT_LOCAL_TRANSCRIPT = "Open the session manager dot py file and check the config dot py settings."
+
+
+class STTProvider:
+    """Turns encoded audio into a transcript"""
+    
+    name = ''
+    
+    @property
+    def model(self) -> str:
+        """Model name reported in transcription results"""
+        return self.name
+    
+    @property
+    def cache_namespace(self) -> str:
+        """Identifies provider, model and options, so cached transcripts are only reused for the same setup"""
+        return f"{self.name}:{self.model}"
+    
+    def transcribe(self, audio: AudioSource, timings: Optional[List[dict]] = None,
+                   content_type: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Transcribe one recording
+        
+        Args:
+            audio: Encoded audio (e.g., WebM) as bytes or an open binary file
+            timings: If given, per-attempt upstream timings are appended to it
+            content_type: MIME type of audio (DEFAULT_AUDIO_CONTENT_TYPE when None)
+        
+        Returns:
+            Tuple of (transcript, confidence)
+        """
+        raise NotImplementedError
+    
+    def close(self):
+        """Release connections or other resources held by the provider"""
+
+
+class DeepgramProvider(STTProvider):
+    """
+    Deepgram Nova-3 prerecorded transcription
+    
+    Requests go through a long-lived UpstreamClient (keep-alive pool, deadlines,
+    retries, optional hedging) rather than the SDK's per-call HTTP client; the
+    SDK client is only needed for live streaming, so the SDK is imported and the
+    client built on first use.
+    """
+    
+    name = 'deepgram'
+    
+    # Nova-3 with all features
+    OPTIONS = {
+        'model': 'nova-3',
+        'smart_format': True,
+        'punctuate': True,
+        'numerals': True,
+        'filler_words': True
+    }
+    
+    def __init__(self, api_key: str = None, base_url: str = DEEPGRAM_API_URL, policy: Optional[UpstreamPolicy] = None,
+                 pool_size: int = 8):
+        """
+        Initialize the Deepgram provider
+        
+        Args:
+            api_key: Deepgram API key; defaults to DEEPGRAM_API_KEY
+            base_url: API root, overridable for on-prem deployments or a local stub server
+            policy: Deadlines, retries and hedging for upstream requests
+            pool_size: Most idle keep-alive connections kept open
+        """
+        if api_key is None:
+            api_key = os.getenv('DEEPGRAM_API_KEY')
+        
+        if not api_key:
+            raise ValueError("Deepgram API key is required. Set DEEPGRAM_API_KEY environment variable.")
+        
+        self._api_key = api_key
+        self._client = None
+        self._client_lock = threading.Lock()
+        self.upstream = UpstreamClient(base_url, policy, max_idle=pool_size, max_workers=max(pool_size, 4) * 2)
+        self._headers = {'Authorization': f"Token {api_key}", 'Accept': 'application/json'}
+        self._path = '/v1/listen?' + urlencode({key: str(value).lower() if isinstance(value, bool) else value
+                                                for key, value in self.OPTIONS.items()})
+    
+    @property
+    def client(self):
+        """The Deepgram SDK client, imported and created on first use"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from deepgram import DeepgramClient  # Heavy import, only needed for live streaming
+                    self._client = DeepgramClient(self._api_key)
+        return self._client
+    
+    @property
+    def model(self) -> str:
+        return self.OPTIONS['model']
+    
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{json.dumps(self.OPTIONS, sort_keys=True)}"
+    
+    def transcribe(self, audio: AudioSource, timings: Optional[List[dict]] = None,
+                   content_type: Optional[str] = None) -> Tuple[str, float]:
+        # Buffers go as-is; files are streamed rather than read into memory
+        headers = dict(self._headers, **{'Content-Type': content_type or DEFAULT_AUDIO_CONTENT_TYPE})
+        try:
+            response = self.upstream.request('POST', self._path, body=audio, headers=headers)
+        except UpstreamError as e:
+            if timings is not None:
+                timings.extend(e.attempts)
+            raise
+        if timings is not None:
+            timings.extend(response.attempts)
+        
+        alternative = json.loads(response.body)['results']['channels'][0]['alternatives'][0]
+        return alternative['transcript'], alternative['confidence']
+    
+    def close(self):
+        self.upstream.close()
+
+
+class LocalProvider(STTProvider):
+    """
+    Deterministic offline provider for benchmarks and load tests
+    
+    Replays transcript fixtures keyed by the audio's SHA-256 (fixtures_dir/<sha256>.txt),
+    otherwise picks one of the other fixtures by hash, otherwise returns the canned
+    transcript. Latency is latency + a hash-derived share of jitter, so the same
+    audio always takes the same time.
+    """
+    
+    name = 'local'
+    
+    def __init__(self, transcript: str = DEFAULT_LOCAL_TRANSCRIPT, fixtures_dir: Optional[str] = None,
+                 latency: float = 0.0, jitter: float = 0.0):
+        """
+        Initialize the local provider
+        
+        Args:
+            transcript: Returned when no fixture applies
+            fixtures_dir: Directory of .txt transcript fixtures
+            latency: Seconds every transcription takes
+            jitter: Up to this many extra seconds, derived from the audio hash
+        """
+        self.transcript = transcript
+        self.latency = latency
+        self.jitter = jitter
+        self.fixtures_dir = fixtures_dir
+        self._fixtures: List[str] = []
+        if fixtures_dir:
+            self._fixtures = sorted(name for name in os.listdir(fixtures_dir) if name.endswith('.txt'))
+    
+    @property
+    def cache_namespace(self) -> str:
+        return f"{self.name}:{self.fixtures_dir or ''}:{self.transcript}"
+    
+    def transcribe(self, audio: AudioSource, timings: Optional[List[dict]] = None,
+                   content_type: Optional[str] = None) -> Tuple[str, float]:
+        data = audio if isinstance(audio, (bytes, bytearray)) else audio.read()
+        digest = hashlib.sha256(data).hexdigest()
+        
+        delay = self.latency + self.jitter * (int(digest[:8], 16) / 0xFFFFFFFF)
+        if delay > 0:
+            time.sleep(delay)
+        
+        return self._transcript_for(digest), 1.0
+    
+    def _transcript_for(self, digest: str) -> str:
+        if not self._fixtures:
+            return self.transcript
+        
+        fixture = f"{digest}.txt"
+        if fixture not in self._fixtures:
+            fixture = self._fixtures[int(digest[:8], 16) % len(self._fixtures)]
+        with open(os.path.join(self.fixtures_dir, fixture), encoding='utf-8') as file:
+            return file.read().strip()
+
+
+STT_PROVIDERS = {
+    DeepgramProvider.name: DeepgramProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+
+def create_stt_provider(name: str, config) -> STTProvider:
+    """
+    Create the STT provider named in configuration
+    
+    Args:
+        name: 'deepgram' or 'local'
+        config: Mapping with the LOCAL_STT_* and STT_*/DEEPGRAM_API_URL upstream settings
+    """
+    if name not in STT_PROVIDERS:
+        raise ValueError(f"Unknown STT provider '{name}'. Expected one of: {', '.join(STT_PROVIDERS)}")
+    if name == LocalProvider.name:
+        return LocalProvider(
+            transcript=config.get('LOCAL_STT_TRANSCRIPT') or DEFAULT_LOCAL_TRANSCRIPT,
+            fixtures_dir=config.get('LOCAL_STT_FIXTURES_DIR') or None,
+            latency=config.get('LOCAL_STT_LATENCY_MS', 0) / 1000,
+            jitter=config.get('LOCAL_STT_JITTER_MS', 0) / 1000
+        )
+    
+    hedge_after = str(config.get('STT_HEDGE_AFTER_MS') or '').strip().lower()
+    policy = UpstreamPolicy(
+        attempt_timeout=config.get('STT_ATTEMPT_TIMEOUT', 30.0),
+        total_timeout=config.get('STT_TOTAL_TIMEOUT', 90.0),
+        max_retries=config.get('STT_MAX_RETRIES', 2),
+        backoff_base=config.get('STT_BACKOFF_BASE_MS', 200) / 1000,
+        hedge_after=float(hedge_after) / 1000 if hedge_after not in ('', 'p95') else None,
+        hedge_adaptive=hedge_after == 'p95'
+    )
+    return DeepgramProvider(
+        base_url=config.get('DEEPGRAM_API_URL') or DEEPGRAM_API_URL,
+        policy=policy,
+        pool_size=config.get('STT_POOL_SIZE', 8)
+    )
@@ -0,0 +1,207 @@
+"""
+Transcript Cache Service for reusing STT results of identical audio
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import BinaryIO, Optional, Tuple, Union
+
+# Bytes read at a time when hashing a spilled upload
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Check the disk tier against its size limit every this many writes
+_DISK_PRUNE_INTERVAL = 64
+
+
+def audio_digest(audio: Union[bytes, BinaryIO]) -> str:
+    """SHA-256 of audio bytes or of an open file (rewound afterwards)"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(audio).hexdigest()
+    
+    digest = hashlib.sha256()
+    start = audio.tell()
+    while True:
+        chunk = audio.read(_HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+    audio.seek(start)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    LRU + TTL cache of raw (pre-replacement) transcripts keyed by audio and model
+    
+    Memory is bounded by entry count and total transcript size. With a cache_dir
+    entries are also written through to disk, so they survive restarts and
+    evicted entries can be promoted back on a later hit.
+    """
+    
+    def __init__(self, max_entries: int = 256, max_bytes: int = 4 * 1024 * 1024, ttl: float = 3600.0,
+                 cache_dir: Optional[str] = None, max_disk_entries: int = 4096):
+        """
+        Initialize the transcript cache
+        
+        Args:
+            max_entries: Most transcripts kept in memory
+            max_bytes: Most transcript bytes (UTF-8) kept in memory
+            ttl: Seconds an entry stays valid
+            cache_dir: Optional directory for the write-through disk tier
+            max_disk_entries: Most entries kept on disk (oldest removed first)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        
+        self._entries: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()  # key -> (transcript, confidence, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._disk_writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    @staticmethod
+    def make_key(digest: str, namespace: str) -> str:
+        """Combine the audio hash with the provider/model/options namespace"""
+        return hashlib.sha256(f"{namespace}\0{digest}".encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached transcript
+        
+        Returns:
+            (transcript, confidence), or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[2] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0], entry[1]
+                self._remove(key)
+                self.expirations += 1
+        
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._insert(key, entry)
+        return entry[0], entry[1]
+    
+    def put(self, key: str, transcript: str, confidence: float):
+        """Store a raw transcript"""
+        entry = (transcript, confidence, time.time())
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._insert(key, entry)
+        self._write_disk(key, entry)
+    
+    def get_stats(self) -> dict:
+        """Get hit/miss counters and occupancy for status endpoints"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'persistent': bool(self.cache_dir)
+            }
+    
+    def _insert(self, key: str, entry: Tuple[str, float, float]):
+        """Add an entry and evict least recently used ones over the limits (caller holds the lock)"""
+        size = len(entry[0].encode('utf-8'))
+        if size > self.max_bytes:
+            return  # Never worth evicting everything else for one transcript
+        self._entries[key] = entry
+        self._bytes += size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+    
+    def _remove(self, key: str):
+        """Drop an entry from memory (caller holds the lock)"""
+        transcript = self._entries.pop(key)[0]
+        self._bytes -= len(transcript.encode('utf-8'))
+    
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+    
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[str, float, float]]:
+        """Load an unexpired entry from the disk tier"""
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding='utf-8') as file:
+                data = json.load(file)
+            entry = (data['transcript'], data['confidence'], data['stored_at'])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Warning: Ignoring unreadable transcript cache entry {path}: {e}")
+            return None
+        
+        if now - entry[2] > self.ttl:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return entry
+    
+    def _write_disk(self, key: str, entry: Tuple[str, float, float]):
+        """Write an entry through to the disk tier (atomically)"""
+        if not self.cache_dir:
+            return
+        path = self._disk_path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump({'transcript': entry[0], 'confidence': entry[1], 'stored_at': entry[2]}, file)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Failed to write transcript cache entry {path}: {e}")
+            return
+        
+        with self._lock:
+            self._disk_writes += 1
+            prune = self._disk_writes % _DISK_PRUNE_INTERVAL == 0
+        if prune:
+            self._prune_disk()
+    
+    def _prune_disk(self):
+        """Remove the oldest disk entries beyond max_disk_entries"""
+        try:
+            entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json')]
+            if len(entries) <= self.max_disk_entries:
+                return
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self.max_disk_entries]:
+                os.unlink(entry.path)
+        except OSError as e:
+            print(f"Warning: Failed to prune transcript cache {self.cache_dir}: {e}")
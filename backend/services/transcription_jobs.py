@@ -0,0 +1,184 @@
+"""
+Transcription Jobs Service for running uploads through STT on a bounded worker pool
+"""
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from ..models.transcription_job import JOB_FAILED, JOB_RUNNING, JOB_SUCCEEDED, TranscriptionJob
+from .audio_handler import AudioHandler, AudioUpload
+from .metrics import StageTimings, stage
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class TranscriptionJobQueue:
+    """
+    Runs transcriptions in the background so request threads return immediately
+    
+    The STT service only needs transcribe_buffer(data, project_path, timings, content_type=...)
+    and transcribe_file(path, project_path, timings, content_type=...), each returning
+    the usual result dict, so a fake client can stand in for Deepgram.
+    """
+    
+    def __init__(self, stt_service, audio_handler: AudioHandler, max_concurrency: int = 4,
+                 queue_depth: int = 32, queue_timeout: float = 120.0, result_ttl: float = 600.0):
+        """
+        Initialize the job queue
+        
+        Args:
+            stt_service: Service used to transcribe uploads
+            audio_handler: Handler that releases uploads once transcribed
+            max_concurrency: Jobs transcribed at the same time
+            queue_depth: Jobs allowed to wait for a worker before submissions are refused
+            queue_timeout: Seconds a job may wait for a worker before it fails unsent
+            result_ttl: Seconds finished jobs are kept for polling
+        """
+        self.stt_service = stt_service
+        self.audio_handler = audio_handler
+        self.max_concurrency = max_concurrency
+        self.queue_depth = queue_depth
+        self.queue_timeout = queue_timeout
+        self.result_ttl = result_ttl
+        
+        self.jobs: Dict[str, TranscriptionJob] = {}
+        self._pending = 0  # Jobs queued or running
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='transcribe')
+    
+    def submit(self, upload: AudioUpload, path: Optional[str], timings: Optional[StageTimings] = None,
+               on_finish: Optional[Callable[[], None]] = None) -> TranscriptionJob:
+        """
+        Queue an upload for transcription
+        
+        Args:
+            upload: The audio to transcribe; released once the job finishes
+            path: Monitored path whose folder index is used for file path replacement (None: the default project)
+            timings: Optional request timings the job keeps adding to (queue_wait and later stages)
+            on_finish: Called once the upload is released (e.g., to return admission capacity);
+                not called when submit raises
+        
+        Returns:
+            The queued job
+        
+        Raises:
+            JobQueueFullError: If max_concurrency + queue_depth jobs are already pending
+        """
+        with self._condition:
+            self._prune_finished()
+            if self._pending >= self.max_concurrency + self.queue_depth:
+                raise JobQueueFullError(
+                    f"Transcription queue is full ({self._pending} jobs pending). Try again shortly.")
+            job = TranscriptionJob(job_id=str(uuid.uuid4()), filename=upload.filename, path=path)
+            self.jobs[job.job_id] = job
+            self._pending += 1
+        
+        try:
+            self._executor.submit(self._run, job, upload, timings, on_finish)
+        except Exception:
+            self._finish(job, error='Transcription queue is shut down')
+            self.audio_handler.release_upload(upload)
+            raise
+        return job
+    
+    def get_job(self, job_id: str) -> Optional[TranscriptionJob]:
+        """Get a job by ID"""
+        with self._condition:
+            return self.jobs.get(job_id)
+    
+    def wait_for_update(self, job_id: str, seen_version: int, timeout: float) -> Optional[TranscriptionJob]:
+        """
+        Block until a job changes past seen_version, finishes, or timeout elapses
+        
+        Returns:
+            The job (possibly unchanged on timeout), or None if it is unknown
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: job_id not in self.jobs or self.jobs[job_id].version != seen_version
+                or self.jobs[job_id].is_finished,
+                timeout=timeout
+            )
+            return self.jobs.get(job_id)
+    
+    def get_stats(self) -> dict:
+        """Get queue occupancy for status endpoints"""
+        with self._condition:
+            running = sum(1 for job in self.jobs.values() if job.status == JOB_RUNNING)
+            return {
+                'pending': self._pending,
+                'running': running,
+                'max_concurrency': self.max_concurrency,
+                'queue_depth': self.queue_depth
+            }
+    
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs; queued jobs are dropped unless wait is True"""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+    
+    def _run(self, job: TranscriptionJob, upload: AudioUpload, timings: Optional[StageTimings] = None,
+             on_finish: Optional[Callable[[], None]] = None):
+        """Transcribe one job on a worker thread"""
+        try:
+            with self._condition:
+                waited = (datetime.now() - job.submitted_at).total_seconds()
+                if timings is not None:
+                    timings.add('queue_wait', waited)
+                if waited > self.queue_timeout:
+                    self._finish(job, error=f'Timed out after waiting {waited:.1f}s for a worker')
+                    return
+                job.status = JOB_RUNNING
+                job.started_at = datetime.now()
+                job.version += 1
+                self._condition.notify_all()
+            
+            try:
+                with stage(timings, 'preprocess'):
+                    audio_stats = self.audio_handler.preprocess_upload(upload)
+                if upload.in_memory:
+                    result = self.stt_service.transcribe_buffer(upload.data, job.path, timings,
+                                                                content_type=upload.content_type)
+                else:
+                    result = self.stt_service.transcribe_file(upload.path, job.path, timings,
+                                                              content_type=upload.content_type)
+                if audio_stats:
+                    result['audio'] = audio_stats
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            if timings is not None:
+                timings.finish()
+                if timings.report:
+                    result['timings'] = timings.to_dict()
+            
+            with self._condition:
+                if result.get('success'):
+                    self._finish(job, result=result)
+                else:
+                    self._finish(job, error=result.get('error', 'Unknown error'))
+        finally:
+            self.audio_handler.release_upload(upload)
+            if on_finish is not None:
+                on_finish()
+    
+    def _finish(self, job: TranscriptionJob, result: Optional[dict] = None, error: Optional[str] = None):
+        """Mark a job finished and wake waiters"""
+        with self._condition:
+            job.status = JOB_SUCCEEDED if error is None else JOB_FAILED
+            job.result = result
+            job.error = error
+            job.finished_at = datetime.now()
+            job.version += 1
+            self._pending -= 1
+            self._condition.notify_all()
+    
+    def _prune_finished(self):
+        """Forget finished jobs older than result_ttl (caller holds the lock)"""
+        cutoff = datetime.now() - timedelta(seconds=self.result_ttl)
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job.is_finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self.jobs[job_id]
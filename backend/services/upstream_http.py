@@ -0,0 +1,452 @@
+"""
+Upstream HTTP Service for pooled, deadline-bound requests to the STT API
+"""
+import http.client
+import os
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import BinaryIO, Deque, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+# Statuses worth another attempt (throttling and transient server errors)
+RETRYABLE_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Errors a reused keep-alive connection raises when the server already closed it
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Recent attempt latencies kept for the adaptive hedge threshold
+_LATENCY_WINDOW = 200
+
+# Latency samples needed before adaptive hedging kicks in
+_MIN_HEDGE_SAMPLES = 20
+
+RequestBody = Union[bytes, BinaryIO]
+
+
+class UpstreamError(Exception):
+    """A request that failed after all attempts; carries the per-attempt timings"""
+    
+    def __init__(self, message: str, attempts: List[dict], status: Optional[int] = None):
+        super().__init__(message)
+        self.attempts = attempts
+        self.status = status
+
+
+class UpstreamTimeout(UpstreamError):
+    """A request that ran out of its total deadline"""
+
+
+@dataclass
+class UpstreamPolicy:
+    """Deadlines, retries and hedging for upstream requests"""
+    
+    attempt_timeout: float = 30.0  # seconds one attempt may take
+    total_timeout: float = 90.0  # seconds for the whole request, retries included
+    max_retries: int = 2  # attempts after the first on retryable failures
+    backoff_base: float = 0.2  # seconds; doubles per retry, full jitter
+    backoff_max: float = 2.0
+    hedge_after: Optional[float] = None  # seconds before a duplicate attempt is sent (None = never)
+    hedge_adaptive: bool = False  # hedge after the recent p95 latency instead of hedge_after
+    
+    def backoff(self, retry: int) -> float:
+        """Jittered delay before the given retry (1-based)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (retry - 1)))
+
+
+@dataclass
+class UpstreamResponse:
+    """A completed upstream response"""
+    
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    attempts: List[dict] = field(default_factory=list)
+
+
+class ConnectionPool:
+    """Idle keep-alive connections to one host, reused across requests"""
+    
+    def __init__(self, base_url: str, max_idle: int = 8, idle_timeout: float = 30.0):
+        """
+        Initialize the pool
+        
+        Args:
+            base_url: Scheme and host (e.g., https://api.deepgram.com)
+            max_idle: Most idle connections kept open
+            idle_timeout: Seconds an idle connection is trusted before being closed
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported upstream URL '{base_url}'. Expected http:// or https://")
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port
+        self.base_path = parts.path.rstrip('/')
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self._ssl_context: Optional[ssl.SSLContext] = None  # Loading CA certificates is slow; done on first connect
+        self._idle: Deque[Tuple[http.client.HTTPConnection, float]] = deque()
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+    
+    def acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        """
+        Take an idle connection, or create one
+        
+        Returns:
+            Tuple of (connection, whether it was reused)
+        """
+        now = time.monotonic()
+        stale = []
+        connection = None
+        with self._lock:
+            while self._idle:
+                candidate, idle_since = self._idle.pop()  # Most recently used first
+                if now - idle_since <= self.idle_timeout:
+                    connection = candidate
+                    self.reused += 1
+                    break
+                stale.append(candidate)
+        for candidate in stale:
+            candidate.close()
+        
+        if connection is not None:
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            return connection, True
+        return self.connection(timeout), False
+    
+    def connection(self, timeout: float) -> http.client.HTTPConnection:
+        """Create a new (not yet connected) connection"""
+        with self._lock:
+            self.opened += 1
+            if self.scheme == 'https' and self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+    
+    def release(self, connection: http.client.HTTPConnection):
+        """Return a healthy connection for reuse"""
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+    
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection, _ in idle:
+            connection.close()
+    
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {'idle': len(self._idle), 'opened': self.opened, 'reused': self.reused}
+
+
+class _Attempt:
+    """One try of a request, run on a worker thread and abortable from the caller"""
+    
+    def __init__(self, pool: ConnectionPool, number: int, hedge: bool, offset: float, deadline: float):
+        self.pool = pool
+        self.deadline = deadline
+        self.timing = {
+            'attempt': number,
+            'hedge': hedge,
+            'started_ms': round(offset * 1000, 2),
+            'duration_ms': None,
+            'connect_ms': None,
+            'reused_connection': None,
+            'status': None,
+            'outcome': 'pending',
+            'error': None
+        }
+        self.response: Optional[UpstreamResponse] = None
+        self.aborted: Optional[str] = None
+        self._connection: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()
+    
+    def run(self, method: str, path: str, body: RequestBody, headers: Dict[str, str]) -> '_Attempt':
+        start = time.monotonic()
+        try:
+            try:
+                self._send(method, path, body, headers, reuse=True)
+            except _STALE_CONNECTION_ERRORS:
+                if self.aborted or not self.timing['reused_connection']:
+                    raise
+                # The server closed the idle connection; that says nothing about the request itself
+                self._send(method, path, body, headers, reuse=False)
+            
+            status = self.response.status
+            self.timing['outcome'] = 'ok' if status < 400 else 'http_error'
+        except (OSError, http.client.HTTPException) as e:
+            self.timing['outcome'] = self.aborted or ('timeout' if isinstance(e, socket.timeout) else 'error')
+            self.timing['error'] = self.aborted or str(e) or type(e).__name__
+        finally:
+            self.timing['duration_ms'] = round((time.monotonic() - start) * 1000, 2)
+        return self
+    
+    def _send(self, method: str, path: str, body: RequestBody, headers: Dict[str, str], reuse: bool):
+        timeout = max(0.001, self.deadline - time.monotonic())
+        if reuse:
+            connection, reused = self.pool.acquire(timeout)
+        else:
+            connection, reused = self.pool.connection(timeout), False
+        with self._lock:
+            if self.aborted:
+                connection.close()
+                raise socket.timeout(self.aborted)
+            self._connection = connection
+        self.timing['reused_connection'] = reused
+        
+        try:
+            if connection.sock is None:
+                connect_start = time.monotonic()
+                connection.connect()
+                # Headers and a streamed body go out in separate writes; don't let Nagle hold the body back
+                connection.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                self.timing['connect_ms'] = round((time.monotonic() - connect_start) * 1000, 2)
+            if not isinstance(body, (bytes, bytearray)):
+                body.seek(0)
+            connection.request(method, self.pool.base_path + path, body=body, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except BaseException:
+            connection.close()
+            raise
+        
+        self.timing['status'] = response.status
+        self.response = UpstreamResponse(response.status, dict(response.getheaders()), data)
+        with self._lock:
+            self._connection = None
+        if response.will_close:
+            connection.close()
+        else:
+            self.pool.release(connection)
+    
+    def abort(self, reason: str):
+        """Stop the attempt, unblocking any socket operation it is waiting on"""
+        with self._lock:
+            if self.aborted:
+                return
+            self.aborted = reason
+            connection = self._connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+
+class UpstreamClient:
+    """
+    Long-lived HTTP client for one upstream API
+    
+    Connections are pooled and kept alive between requests. Each request gets a
+    total deadline and a per-attempt deadline, retries retryable failures with
+    jittered exponential backoff (honoring Retry-After), and can hedge by sending
+    a duplicate attempt when the first one is slower than usual; the first
+    response wins. Every attempt's timing is returned with the response.
+    """
+    
+    def __init__(self, base_url: str, policy: Optional[UpstreamPolicy] = None, max_idle: int = 8,
+                 idle_timeout: float = 30.0, max_workers: int = 16):
+        """
+        Initialize the client
+        
+        Args:
+            base_url: Scheme and host of the upstream API
+            policy: Deadlines, retries and hedging
+            max_idle: Most idle keep-alive connections kept open
+            idle_timeout: Seconds an idle connection is reused for
+            max_workers: Most attempts in flight across all requests
+        """
+        self.policy = policy or UpstreamPolicy()
+        self.pool = ConnectionPool(base_url, max_idle=max_idle, idle_timeout=idle_timeout)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='upstream')
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self.requests = 0
+        self.failures = 0
+        self.attempts = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.timeouts = 0
+    
+    def request(self, method: str, path: str, body: RequestBody = b'',
+                headers: Optional[Dict[str, str]] = None) -> UpstreamResponse:
+        """
+        Send a request under the client's policy
+        
+        Args:
+            method: HTTP method
+            path: Path and query string, appended to the base URL's path
+            body: Bytes, or a seekable binary file (replayed from its start on retry; never hedged)
+            headers: Extra request headers
+        
+        Returns:
+            The first successful response, with every attempt's timing
+        
+        Raises:
+            UpstreamTimeout: When the total deadline passed
+            UpstreamError: On a non-retryable status, or when retries ran out
+        """
+        policy = self.policy
+        headers = dict(headers or {})
+        if not isinstance(body, (bytes, bytearray)):
+            headers.setdefault('Content-Length', str(os.fstat(body.fileno()).st_size))
+        hedge_delay = self._hedge_delay() if isinstance(body, (bytes, bytearray)) else None
+        
+        start = time.monotonic()
+        deadline = start + policy.total_timeout
+        records: List[dict] = []
+        in_flight = {}
+        failures = 0
+        last_failure = None
+        launch_at: Optional[float] = start
+        with self._lock:
+            self.requests += 1
+        
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline:
+                    self._count('timeouts')
+                    raise UpstreamTimeout(f"Upstream request exceeded its {policy.total_timeout:g}s deadline", records)
+                
+                if launch_at is not None and now >= launch_at:
+                    hedge = bool(in_flight)
+                    attempt = _Attempt(self.pool, len(records) + 1, hedge, now - start,
+                                       min(deadline, now + policy.attempt_timeout))
+                    records.append(attempt.timing)
+                    in_flight[self._executor.submit(attempt.run, method, path, body, headers)] = attempt
+                    self._count('attempts')
+                    if hedge or failures:
+                        self._count('hedges' if hedge else 'retries')
+                    launch_at = None
+                    if hedge_delay is not None and not hedge:
+                        launch_at = now + hedge_delay
+                        hedge_delay = None  # At most one hedge per request
+                
+                wake = min([deadline] + [attempt.deadline for attempt in in_flight.values()] +
+                           ([launch_at] if launch_at is not None else []))
+                done, _ = wait(list(in_flight), timeout=max(0.0, wake - now), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    attempt = in_flight.pop(future)
+                    response = attempt.response
+                    if response is not None and response.status not in RETRYABLE_STATUSES:
+                        if attempt.timing['outcome'] == 'ok':
+                            self._record_latency(attempt.timing['duration_ms'] / 1000)
+                            if attempt.timing['hedge']:
+                                self._count('hedge_wins')
+                        response.attempts = records
+                        if response.status >= 400:
+                            raise UpstreamError(f"Upstream returned HTTP {response.status}: {_snippet(response.body)}",
+                                                records, response.status)
+                        return response
+                    
+                    failures += 1
+                    last_failure = attempt
+                    if in_flight:
+                        continue  # The other attempt may still succeed
+                    if failures > policy.max_retries:
+                        raise UpstreamError(f"Upstream request failed after {len(records)} attempts: "
+                                            f"{_describe(last_failure)}", records,
+                                            response.status if response is not None else None)
+                    
+                    delay = policy.backoff(failures)
+                    retry_after = _retry_after(response)
+                    if retry_after is not None:
+                        delay = max(delay, retry_after)
+                    launch_at = time.monotonic() + delay
+                    if launch_at >= deadline:
+                        self._count('timeouts')
+                        raise UpstreamTimeout(f"Upstream request failed and no time is left to retry: "
+                                              f"{_describe(last_failure)}", records)
+                
+                now = time.monotonic()
+                for attempt in in_flight.values():
+                    if now >= attempt.deadline:
+                        attempt.abort('timeout')
+        except UpstreamError:
+            self._count('failures')
+            raise
+        finally:
+            for attempt in in_flight.values():
+                attempt.abort('cancelled')
+    
+    def get_stats(self) -> dict:
+        """Get request, retry and hedge counters plus pool usage for status endpoints"""
+        with self._lock:
+            stats = {
+                'requests': self.requests,
+                'failures': self.failures,
+                'attempts': self.attempts,
+                'retries': self.retries,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'timeouts': self.timeouts,
+                'latency_p95_ms': round(self._p95() * 1000, 2) if self._latencies else None
+            }
+        stats['connections'] = self.pool.get_stats()
+        return stats
+    
+    def close(self):
+        """Close pooled connections and stop the attempt workers"""
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Seconds before a hedged attempt is sent, or None to not hedge"""
+        if not self.policy.hedge_adaptive:
+            return self.policy.hedge_after
+        with self._lock:
+            if len(self._latencies) < _MIN_HEDGE_SAMPLES:
+                return None
+            return self._p95()
+    
+    def _p95(self) -> float:
+        """95th percentile of recent attempt latencies (caller holds the lock)"""
+        samples = sorted(self._latencies)
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    
+    def _record_latency(self, seconds: float):
+        with self._lock:
+            self._latencies.append(seconds)
+    
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+
+def _retry_after(response: Optional[UpstreamResponse]) -> Optional[float]:
+    """Seconds from a Retry-After header given in seconds, if any"""
+    if response is None:
+        return None
+    value = next((v for k, v in response.headers.items() if k.lower() == 'retry-after'), None)
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None  # HTTP-date form; fall back to backoff
+
+
+def _describe(attempt: _Attempt) -> str:
+    if attempt.response is not None:
+        return f"HTTP {attempt.response.status}"
+    return attempt.timing['error'] or attempt.timing['outcome']
+
+
+def _snippet(body: bytes, limit: int = 200) -> str:
+    return body[:limit].decode('utf-8', errors='replace')
@@ -0,0 +1,71 @@
+"""
+Shared fixtures for the backend tests
+
+Run from the backend folder (python -m pytest) or from the repository root. Every
+app uses the offline 'local' STT provider, so no API key or network is needed.
+"""
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from backend.app import create_app  # noqa: E402
+
+# Transcript the local provider returns unless a test overrides it
+TEST_TRANSCRIPT = 'Open the session manager dot py file and check the config dot py settings.'
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A small project whose filenames the test transcript mentions"""
+    root = tmp_path / 'project'
+    for relative in ('backend/services/session_manager.py', 'backend/config.py', 'frontend/src/App.tsx'):
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return str(root)
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """
+    Build apps on the local provider; settings override the test defaults
+    
+    Background threads of every app built are stopped when the test ends.
+    """
+    apps = []
+    
+    def make(**overrides):
+        settings = {
+            'STT_PROVIDER': 'local',
+            'LOCAL_STT_TRANSCRIPT': TEST_TRANSCRIPT,
+            'INDEX_CACHE_DIR': '',
+            'TRANSCRIPT_CACHE_DIR': '',
+            'AUDIO_PREPROCESS': 'off',
+            'FOLDER_WATCH_MODE': 'off'
+        }
+        settings.update(overrides)
+        app = create_app('testing', settings)
+        apps.append(app)
+        return app
+    
+    yield make
+    for app in apps:
+        app.job_queue.shutdown()
+        app.batch_transcriber.shutdown()
+        app.session_manager.stop_reaper()
+        app.stt_service.mappers.close()
+
+
+@pytest.fixture
+def start_session():
+    """Start a session on a project through set-context and return its ID"""
+    def start(client, path: str) -> str:
+        response = client.post('/api/v1/monitoring/set-context', json={'projectContext': path})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['session_id']
+    return start
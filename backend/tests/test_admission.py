@@ -0,0 +1,82 @@
+"""
+Tests for admission control on uploads: 413 and 429 refusals with Retry-After
+"""
+import io
+
+import pytest
+
+from backend.services.admission import MAX_RETRY_AFTER, MIN_RETRY_AFTER, AdmissionController, AdmissionRejected
+
+TRANSCRIBE = '/api/v1/monitoring/transcribe'
+
+
+def upload(client, session_id: str, audio: bytes = b'fake audio', mode: str = 'sync'):
+    return client.post(f"{TRANSCRIBE}?mode={mode}", headers={'X-Session-ID': session_id},
+                       data={'audio': (io.BytesIO(audio), 'clip.webm')}, content_type='multipart/form-data')
+
+
+def assert_retry_after(response):
+    assert MIN_RETRY_AFTER <= int(response.headers['Retry-After']) <= MAX_RETRY_AFTER
+
+
+def test_upload_over_the_size_limit_gets_413(make_app, project, start_session):
+    app = make_app(MAX_UPLOAD_BYTES=4096)
+    client = app.test_client()
+    session_id = start_session(client, project)
+    
+    response = upload(client, session_id, audio=b'x' * 8192)
+    
+    assert response.status_code == 413
+    assert 'byte limit' in response.get_json()['error']
+    assert_retry_after(response)
+    assert app.admission.get_stats()['in_flight'] == 0
+    assert upload(client, session_id).status_code == 200
+
+
+def test_upload_over_the_buffer_budget_gets_413(make_app, project, start_session):
+    client = make_app(MAX_UPLOAD_BYTES=0, MAX_BUFFERED_UPLOAD_BYTES=4096).test_client()
+    session_id = start_session(client, project)
+    
+    response = upload(client, session_id, audio=b'x' * 8192)
+    
+    assert response.status_code == 413
+    assert 'buffer budget' in response.get_json()['error']
+    assert_retry_after(response)
+
+
+def test_busy_server_gets_429(make_app, project, start_session):
+    app = make_app(MAX_INFLIGHT_TRANSCRIPTIONS=1, LOCAL_STT_LATENCY_MS=1000)
+    client = app.test_client()
+    session_id = start_session(client, project)
+    
+    assert upload(client, session_id, mode='job').status_code == 202  # Holds the only slot until it finishes
+    response = upload(client, session_id)
+    
+    assert response.status_code == 429
+    assert 'Server busy' in response.get_json()['error']
+    assert_retry_after(response)
+    assert app.admission.get_stats()['rejected'] == 1
+
+
+def test_released_tickets_free_capacity():
+    controller = AdmissionController(max_in_flight=2, max_buffered_bytes=100)
+    first = controller.admit(60)
+    
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit(60)
+    assert rejected.value.status == 429 and rejected.value.retry_after >= MIN_RETRY_AFTER
+    
+    first.release()
+    first.release()  # A second release is ignored
+    second = controller.admit(60)
+    assert controller.get_stats()['in_flight'] == 1 and controller.get_stats()['buffered_bytes'] == 60
+    second.release()
+
+
+def test_unknown_length_reserves_the_largest_upload():
+    controller = AdmissionController(max_buffered_bytes=100, max_upload_bytes=200)
+    
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.admit(None)
+    
+    assert rejected.value.status == 413 and rejected.value.retry_after >= MIN_RETRY_AFTER
@@ -0,0 +1,61 @@
+"""
+Tests for silence trimming and its limits (WAV input, so ffmpeg is not needed)
+"""
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from backend.services.audio_preprocessor import AudioPreprocessor  # noqa: E402
+
+
+def wav_clip(lead: float, speech: float, tail: float, rate: int = 48000, channels: int = 2) -> bytes:
+    """A tone between stretches of silence"""
+    signal = np.zeros(int((lead + speech + tail) * rate))
+    start = int(lead * rate)
+    t = np.arange(int(speech * rate)) / rate
+    signal[start:start + len(t)] = 0.3 * np.sin(2 * np.pi * 220 * t)
+    pcm = (np.repeat(signal[:, None], channels, axis=1) * 32767).astype('<i2')
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def test_silence_is_trimmed_and_downsampled():
+    clip = wav_clip(lead=2.0, speech=1.0, tail=2.0)
+    
+    result = AudioPreprocessor(ffmpeg_path='').process(clip)
+    
+    assert result.applied and result.format == 'wav' and result.content_type == 'audio/wav'
+    assert result.original_duration == pytest.approx(5.0)
+    assert result.processed_duration == pytest.approx(1.5, abs=0.05)  # speech plus 250 ms padding each side
+    assert result.processed_bytes < result.original_bytes / 10
+
+
+def test_original_is_kept_when_saving_is_too_small():
+    clip = wav_clip(lead=0.0, speech=3.0, tail=0.0, rate=16000, channels=1)
+    
+    result = AudioPreprocessor(ffmpeg_path='', min_saving=0.1).process(clip)
+    
+    assert not result.applied
+    assert result.data is clip
+    assert result.original_duration == pytest.approx(3.0)
+
+
+def test_long_recordings_are_not_decoded():
+    clip = wav_clip(lead=2.0, speech=1.0, tail=2.0)
+    preprocessor = AudioPreprocessor(ffmpeg_path='', max_seconds=4.0)
+    
+    result = preprocessor.process(clip)
+    
+    assert not result.applied
+    assert result.data is clip and result.original_duration is None
+    preprocessor.max_seconds = 0
+    assert preprocessor.process(clip).applied
+
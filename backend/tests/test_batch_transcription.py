@@ -0,0 +1,107 @@
+"""
+Tests for batch transcription (POST /transcribe/batch) streaming NDJSON results
+"""
+import hashlib
+import io
+import json
+
+import pytest
+
+BATCH = '/api/v1/monitoring/transcribe/batch'
+
+# Transcript the local provider replays for each clip
+CLIPS = {
+    b'first clip': 'Open the config dot py file.',
+    b'second clip': 'Check App dot tsx.',
+    b'third clip': 'Nothing to replace here.'
+}
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path):
+    directory = tmp_path / 'fixtures'
+    directory.mkdir()
+    for audio, transcript in CLIPS.items():
+        (directory / f"{hashlib.sha256(audio).hexdigest()}.txt").write_text(transcript)
+    return str(directory)
+
+
+@pytest.fixture
+def manifest_root(tmp_path):
+    """Recordings a manifest may name, next to one it may not"""
+    root = tmp_path / 'recordings'
+    root.mkdir()
+    for number, audio in enumerate(CLIPS):
+        (root / f"clip_{number}.webm").write_bytes(audio)
+    (tmp_path / 'outside.webm').write_bytes(b'first clip')
+    return str(root)
+
+
+def read_lines(response) -> list:
+    assert response.status_code == 200, response.get_data(as_text=True)
+    assert response.mimetype == 'application/x-ndjson'
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def check_results(lines: list, names: list):
+    results = sorted(lines[:-1], key=lambda line: line['index'])
+    assert [line['type'] for line in lines] == ['result'] * len(names) + ['summary']
+    assert [line['name'] for line in results] == names
+    assert [line['transcription'] for line in results] == [
+        'Open the @backend/config.py file.', 'Check @frontend/src/App.tsx.', 'Nothing to replace here.']
+    assert all('timings' in line for line in results)
+    assert lines[-1]['items'] == len(names)
+    assert (lines[-1]['succeeded'], lines[-1]['failed']) == (len(names), 0)
+
+
+def test_uploaded_parts_stream_one_line_each(make_app, project, start_session, fixtures_dir):
+    client = make_app(LOCAL_STT_FIXTURES_DIR=fixtures_dir).test_client()
+    session_id = start_session(client, project)
+    names = ['one.webm', 'two.webm', 'three.webm']
+    
+    response = client.post(BATCH, headers={'X-Session-ID': session_id}, content_type='multipart/form-data',
+                           data={'audio': [(io.BytesIO(audio), name) for audio, name in zip(CLIPS, names)]})
+    
+    check_results(read_lines(response), names)
+
+
+def test_manifest_reads_files_under_the_root(make_app, project, start_session, fixtures_dir, manifest_root):
+    client = make_app(LOCAL_STT_FIXTURES_DIR=fixtures_dir, BATCH_MANIFEST_ROOT=manifest_root).test_client()
+    session_id = start_session(client, project)
+    names = ['clip_0.webm', 'clip_1.webm', 'clip_2.webm']
+    
+    response = client.post(BATCH, headers={'X-Session-ID': session_id}, json={'files': names})
+    
+    check_results(read_lines(response), names)
+
+
+@pytest.mark.parametrize('path', ['../outside.webm', 'clip_0.webm/../../outside.webm', '/etc/passwd'])
+def test_manifest_paths_outside_the_root_are_rejected(make_app, project, start_session, manifest_root, path):
+    client = make_app(BATCH_MANIFEST_ROOT=manifest_root).test_client()
+    session_id = start_session(client, project)
+    
+    response = client.post(BATCH, headers={'X-Session-ID': session_id}, json={'files': ['clip_0.webm', path]})
+    
+    assert response.status_code == 400
+    assert 'outside BATCH_MANIFEST_ROOT' in response.get_json()['error']
+
+
+def test_manifests_are_disabled_without_a_root(make_app, project, start_session, manifest_root):
+    client = make_app(BATCH_MANIFEST_ROOT='').test_client()
+    session_id = start_session(client, project)
+    
+    response = client.post(BATCH, headers={'X-Session-ID': session_id}, json={'files': ['clip_0.webm']})
+    
+    assert response.status_code == 400
+    assert 'BATCH_MANIFEST_ROOT' in response.get_json()['error']
+
+
+def test_batch_over_the_item_limit_is_rejected(make_app, project, start_session):
+    client = make_app(BATCH_MAX_ITEMS=2).test_client()
+    session_id = start_session(client, project)
+    
+    response = client.post(BATCH, headers={'X-Session-ID': session_id}, content_type='multipart/form-data',
+                           data={'audio': [(io.BytesIO(audio), f"{number}.webm") for number, audio in enumerate(CLIPS)]})
+    
+    assert response.status_code == 400
+    assert 'at most 2' in response.get_json()['error']
@@ -0,0 +1,53 @@
+"""
+Tests for the interned path trie and file columns behind the folder index (CompactFileIndex)
+"""
+import os
+
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+from backend.services.spoken_names import SpokenNameIndex, joinable_flags, tokenize
+
+FILES = ('README.md', 'backend/config.py', 'backend/services/config.py', 'backend/services/session_manager.py',
+         'frontend/src/App.tsx', 'tools/config.py')
+
+
+@pytest.fixture
+def index(tmp_path):
+    for relative in FILES:
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return FilePathMapper(str(tmp_path)).snapshot().index
+
+
+def test_paths_are_joined_from_the_directory_trie(index):
+    assert len(index) == len(FILES)
+    assert sorted(index.path(file_id) for file_id, _ in index.files()) == sorted(FILES)
+    # Each directory is one node, however many files sit under it
+    directories = {os.path.dirname(relative) for relative in FILES}
+    directories |= {os.path.dirname(directory) for directory in directories}
+    assert index.directory_count == len(directories)
+    assert sorted(index.directory_paths()) == sorted(directories)
+
+
+def test_names_are_interned_and_every_file_is_listed(index):
+    names = [index.name(file_id) for file_id, name in index.files() if name == 'config.py']
+    assert len(names) == 3
+    assert all(name is names[0] for name in names)
+    
+    structure = index.files_by_directory()
+    assert structure['backend'] == ['config.py']
+    assert sorted(structure['backend/services']) == ['config.py', 'session_manager.py']
+    assert structure['tools'] == ['config.py']
+
+
+def test_spoken_name_trie_keeps_every_file_sharing_a_name(index):
+    text = 'open config dot py'
+    tokens = tokenize(text)
+    
+    last, file_ids = SpokenNameIndex(index).match_name(tokens, joinable_flags(text, tokens), 1)
+    
+    assert last == len(tokens) - 1
+    assert sorted(index.path(file_id) for file_id in file_ids) == [
+        'backend/config.py', 'backend/services/config.py', 'tools/config.py']
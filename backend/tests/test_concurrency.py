@@ -0,0 +1,43 @@
+"""
+Short run of the concurrency stress workload (benchmarks/stress_concurrency.py)
+
+A few seconds of set-context, transcribe, folder-structure and resolve from many
+threads while files churn, checking that no request fails and that session and
+project index bookkeeping stays consistent afterwards.
+"""
+import os
+import random
+
+from backend.benchmarks.stress_concurrency import STRESS_SETTINGS, build_project, run_stress
+
+SECONDS = 3.0
+THREADS = 8
+
+
+def test_stress_run_has_no_failures_and_consistent_sessions(make_app, tmp_path):
+    rng = random.Random(1)
+    projects = [str(tmp_path / name) for name in ('alpha', 'beta')]
+    for project in projects:
+        build_project(project, 300, rng)
+    app = make_app(**STRESS_SETTINGS)
+    
+    counts, failures, _ = run_stress(app, projects, SECONDS, THREADS, seed=1)
+    
+    assert not failures, failures.most_common(10)
+    for operation in ('set-context', 'transcribe', 'folder-structure', 'resolve', 'churn'):
+        assert counts[operation] > 0, counts
+    
+    sessions = app.session_manager.get_all_sessions()
+    stats = app.session_manager.get_stats()
+    active = [session for session in sessions if session.is_active]
+    assert stats['active'] == len(active)
+    assert stats['history'] == len(sessions) - len(active)
+    assert stats['history'] <= stats['history_limit']
+    assert stats['active'] + stats['history'] <= counts['set-context']
+    
+    # One index per project, however the sessions spelled its path
+    real_projects = {os.path.realpath(project) for project in projects}
+    assert app.session_manager.active_paths() <= real_projects
+    registry = app.stt_service.mappers.get_stats()
+    assert registry['entries'] <= len(projects)
+    assert {project['path'] for project in registry['projects']} <= real_projects
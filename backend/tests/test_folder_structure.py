@@ -0,0 +1,85 @@
+"""
+Tests for GET /folder-structure: weak ETags, ?since= diffs and gzip
+
+Folder watching is off in tests; FOLDER_POLL_INTERVAL=0 has every request pick up file changes.
+"""
+import gzip
+import json
+import os
+
+STRUCTURE = '/api/v1/monitoring/folder-structure'
+
+
+def test_unchanged_structure_gets_304(make_app, project, start_session):
+    client = make_app().test_client()
+    headers = {'X-Session-ID': start_session(client, project)}
+    
+    first = client.get(STRUCTURE, headers=headers)
+    etag = first.headers['ETag']
+    repeat = client.get(STRUCTURE, headers=dict(headers, **{'If-None-Match': etag}))
+    
+    assert first.status_code == 200 and etag.startswith('W/')
+    assert first.get_json()['folder_structure']['backend'] == ['config.py']
+    assert repeat.status_code == 304
+    assert repeat.headers['ETag'] == etag
+    assert repeat.get_data() == b''
+
+
+def test_changed_structure_gets_a_new_etag(make_app, project, start_session):
+    client = make_app(FOLDER_POLL_INTERVAL=0).test_client()
+    headers = {'X-Session-ID': start_session(client, project)}
+    etag = client.get(STRUCTURE, headers=headers).headers['ETag']
+    
+    with open(os.path.join(project, 'backend', 'app.py'), 'w'):
+        pass
+    response = client.get(STRUCTURE, headers=dict(headers, **{'If-None-Match': etag}))
+    
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert sorted(response.get_json()['folder_structure']['backend']) == ['app.py', 'config.py']
+
+
+def test_since_returns_only_the_changes(make_app, project, start_session):
+    client = make_app(FOLDER_POLL_INTERVAL=0).test_client()
+    headers = {'X-Session-ID': start_session(client, project)}
+    version = client.get(STRUCTURE, headers=headers).get_json()['version']
+    
+    with open(os.path.join(project, 'frontend', 'src', 'index.tsx'), 'w'):
+        pass
+    os.remove(os.path.join(project, 'backend', 'config.py'))
+    body = client.get(f"{STRUCTURE}?since={version}", headers=headers).get_json()
+    
+    assert body['since'] == version and body['version'] != version
+    assert body['added'] == {'frontend/src': ['index.tsx']}
+    assert body['removed'] == {'backend': ['config.py']}
+    assert 'folder_structure' not in body
+    
+    # Nothing changed since the latest version
+    latest = client.get(f"{STRUCTURE}?since={body['version']}", headers=headers).get_json()
+    assert (latest['added'], latest['removed']) == ({}, {})
+
+
+def test_unknown_since_falls_back_to_the_whole_structure(make_app, project, start_session):
+    client = make_app().test_client()
+    headers = {'X-Session-ID': start_session(client, project)}
+    
+    body = client.get(f"{STRUCTURE}?since=1", headers=headers).get_json()
+    
+    assert 'folder_structure' in body and 'added' not in body
+    assert client.get(f"{STRUCTURE}?since=latest", headers=headers).status_code == 400
+
+
+def test_large_structure_is_gzipped(make_app, project, start_session):
+    for number in range(100):
+        with open(os.path.join(project, 'backend', f"module_{number:03d}.py"), 'w'):
+            pass
+    client = make_app().test_client()
+    headers = {'X-Session-ID': start_session(client, project)}
+    
+    response = client.get(STRUCTURE, headers=dict(headers, **{'Accept-Encoding': 'gzip'}))
+    
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['Vary'] == 'Accept-Encoding'
+    body = json.loads(gzip.decompress(response.get_data()))
+    assert len(body['folder_structure']['backend']) == 101
+    assert client.get(STRUCTURE, headers=headers).get_json() == body
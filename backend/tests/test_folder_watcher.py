@@ -0,0 +1,103 @@
+"""
+Tests for the folder watcher keeping a project's index current
+"""
+import os
+import time
+
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+from backend.services.folder_watcher import FolderWatcher
+
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"Condition not met within {timeout}s")
+
+
+@pytest.fixture(params=['polling', 'watchdog'])
+def watched(request, project):
+    """A mapper on the project with a running watcher, and the file events it applied"""
+    mapper = FilePathMapper(project)
+    events = []
+    watcher = FolderWatcher(mapper, mode=request.param, poll_interval=0.05, debounce=0.05, on_events=events.extend)
+    watcher.start()
+    assert watcher.backend == request.param
+    yield mapper, events
+    watcher.stop()
+
+
+def test_created_file_is_indexed(watched, project):
+    mapper, events = watched
+    
+    with open(os.path.join(project, 'backend', 'services', 'job_queue.py'), 'w'):
+        pass
+    
+    wait_for(lambda: 'job_queue.py' in mapper.file_map)
+    assert mapper.file_map['job_queue.py'] == 'backend/services/job_queue.py'
+    assert ('created', 'backend/services/job_queue.py') in [(event.event_type, event.path) for event in events]
+
+
+def test_deleted_file_is_dropped(watched, project):
+    mapper, events = watched
+    
+    os.remove(os.path.join(project, 'backend', 'config.py'))
+    
+    wait_for(lambda: 'config.py' not in mapper.file_map)
+    assert ('deleted', 'backend/config.py') in [(event.event_type, event.path) for event in events]
+
+
+def test_renamed_file_is_reindexed(watched, project):
+    mapper, events = watched
+    
+    os.rename(os.path.join(project, 'backend', 'config.py'), os.path.join(project, 'backend', 'settings.py'))
+    
+    wait_for(lambda: 'settings.py' in mapper.file_map and 'config.py' not in mapper.file_map)
+    assert mapper.file_map['settings.py'] == 'backend/settings.py'
+    applied = [(event.event_type, event.path) for event in events]
+    assert ('deleted', 'backend/config.py') in applied
+    assert ('created', 'backend/settings.py') in applied
+
+
+def test_file_moved_across_directories(watched, project):
+    mapper, events = watched
+    
+    os.rename(os.path.join(project, 'backend', 'config.py'), os.path.join(project, 'frontend', 'src', 'config.py'))
+    
+    wait_for(lambda: mapper.file_map.get('config.py') == 'frontend/src/config.py')
+    wait_for(lambda: any(event.event_type == 'moved' for event in events))
+    moved = [event for event in events if event.event_type == 'moved']
+    assert (moved[0].path, moved[0].dest_path) == ('backend/config.py', 'frontend/src/config.py')
+
+
+def test_new_directory_is_indexed(watched, project):
+    mapper, _ = watched
+    
+    os.makedirs(os.path.join(project, 'backend', 'routes'))
+    with open(os.path.join(project, 'backend', 'routes', 'monitoring.py'), 'w'):
+        pass
+    
+    wait_for(lambda: 'monitoring.py' in mapper.file_map)
+    assert mapper.file_map['monitoring.py'] == 'backend/routes/monitoring.py'
+    assert 'backend/routes' in mapper.snapshot().directories
+
+
+def test_refresh_directories_without_watcher(project):
+    mapper = FilePathMapper(project)
+    version = mapper.snapshot().version
+    
+    os.remove(os.path.join(project, 'backend', 'config.py'))
+    with open(os.path.join(project, 'backend', 'app.py'), 'w'):
+        pass
+    changed = mapper.changed_directories()
+    events = mapper.refresh_directories(changed)
+    
+    assert 'backend' in changed
+    assert sorted((event.event_type, event.path) for event in events) == [
+        ('created', 'backend/app.py'), ('deleted', 'backend/config.py')]
+    assert mapper.snapshot().version != version
+    assert 'app.py' in mapper.file_map and 'config.py' not in mapper.file_map
@@ -0,0 +1,43 @@
+"""
+Tests for ranked filename lookups (FilePathMapper.find_file_path / resolve_filename)
+"""
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+
+
+@pytest.fixture
+def mapper(tmp_path):
+    for relative in ('app.py', 'src/App.tsx', 'main.py', 'backend/config.py', 'tools/config.py',
+                     'services/session_manager.py'):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return FilePathMapper(str(tmp_path))
+
+
+def test_exact_names_score_one(mapper):
+    assert mapper.resolve_filename('app.py', limit=1) == [('app.py', 'app.py', 1.0)]
+    assert mapper.find_file_path('APP.PY') == '@app.py'
+    assert mapper.find_file_path('backend/config.py') == '@backend/config.py'
+
+
+def test_names_without_extension_score_below_exact(mapper):
+    [(filename, path, score)] = mapper.resolve_filename('main', limit=1)
+    
+    assert (filename, path) == ('main.py', 'main.py')
+    assert score < 1.0
+    assert mapper.find_file_path('main') == '@main.py'
+
+
+def test_near_misses_are_ranked(mapper):
+    assert mapper.find_file_path('session manger') == '@services/session_manager.py'
+    assert mapper.find_file_path('nothing like it') is None
+
+
+@pytest.mark.parametrize('query', ['config.py', 'conf', 'app'])
+def test_ties_for_the_best_score_find_nothing(mapper, query):
+    candidates = mapper.resolve_filename(query, limit=2)
+    
+    assert len(candidates) == 2 and candidates[0][2] == candidates[1][2]
+    assert mapper.find_file_path(query) is None
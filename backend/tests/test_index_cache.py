@@ -0,0 +1,79 @@
+"""
+Tests for warm-starting folder indexes from the on-disk cache
+"""
+import os
+import time
+
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+from backend.services.index_cache import FolderIndexCache
+
+
+def settle(root: str):
+    """Backdate every directory's mtime, so listings are not re-checked as recently modified"""
+    past = time.time() - 60
+    for current, _, _ in os.walk(root):
+        os.utime(current, (past, past))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    for top in ('backend', 'frontend', 'docs'):
+        for sub in range(4):
+            directory = root / top / f"module_{sub}"
+            directory.mkdir(parents=True)
+            for number in range(5):
+                (directory / f"{top}_{sub}_{number}.py").write_text('')
+    settle(str(root))
+    return str(root)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return FolderIndexCache(str(tmp_path / 'index-cache'))
+
+
+def test_warm_start_matches_cold_scan(tree, cache):
+    cold = FilePathMapper(tree)
+    FilePathMapper(tree, index_cache=cache)  # Fills the cache
+    
+    warm = FilePathMapper(tree, index_cache=cache)
+    
+    assert warm.snapshot().directories_listed == 0
+    assert warm.snapshot().directories == cold.snapshot().directories
+    assert warm.snapshot().index.files_by_directory() == cold.snapshot().index.files_by_directory()
+    assert warm.file_map == cold.file_map
+
+
+def test_warm_start_relists_only_changed_directories(tree, cache):
+    FilePathMapper(tree, index_cache=cache)
+    os.remove(os.path.join(tree, 'docs', 'module_2', 'docs_2_0.py'))
+    with open(os.path.join(tree, 'docs', 'module_2', 'index.md'), 'w'):
+        pass
+    
+    warm = FilePathMapper(tree, index_cache=cache)
+    
+    assert warm.snapshot().directories_listed == 1
+    assert warm.snapshot().directories == FilePathMapper(tree).snapshot().directories
+    assert 'index.md' in warm.file_map and 'docs_2_0.py' not in warm.file_map
+
+
+def test_cache_is_keyed_by_ignored_directories(tree, cache):
+    mapper = FilePathMapper(tree, index_cache=cache)
+    
+    assert cache.load(tree, mapper.ignored_dirs) is not None
+    assert cache.load(tree, mapper.ignored_dirs | {'frontend'}) is None
+
+
+def test_changed_ignore_set_discards_cached_listings(tree, cache):
+    FilePathMapper(tree, index_cache=cache)
+    
+    mapper = FilePathMapper(tree, index_cache=cache)
+    mapper.add_ignored_directory('frontend')
+    mapper.scan_folder_structure()
+    
+    assert not any(rel_dir.startswith('frontend') for rel_dir in mapper.snapshot().directories)
+    assert not any(name.startswith('frontend_') for name in mapper.file_map)
+    assert cache.load(tree, mapper.ignored_dirs) is not None
@@ -0,0 +1,79 @@
+"""
+Tests for the registry of per-project folder indexes
+"""
+import os
+import time
+
+from backend.services.mapper_registry import MapperRegistry
+from backend.services.metrics import StageTimings
+
+
+def add_file(project: str, relative: str):
+    path = os.path.join(project, relative)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w'):
+        pass
+
+
+def settle(root: str):
+    """Backdate every directory's mtime, so listings are not re-checked as recently modified"""
+    past = time.time() - 60
+    for current, _, _ in os.walk(root):
+        os.utime(current, (past, past))
+
+
+def test_paths_share_one_mapper(project):
+    registry = MapperRegistry()
+    try:
+        mapper = registry.get(project)
+        
+        assert registry.get(project + os.sep) is mapper
+        assert registry.get_stats()['hits'] == 1 and registry.get_stats()['misses'] == 1
+    finally:
+        registry.close()
+
+
+def test_unwatched_project_relists_only_changed_directories(project):
+    events = []
+    registry = MapperRegistry(poll_interval=0, on_events=lambda path, applied: events.extend(applied))
+    settle(project)
+    try:
+        registry.get(project)
+        add_file(project, 'backend/services/job_queue.py')
+        timings = StageTimings()
+        
+        mapper = registry.get(project, timings)
+        
+        assert mapper.file_map['job_queue.py'] == 'backend/services/job_queue.py'
+        assert [(event.event_type, event.path) for event in events] == [('created', 'backend/services/job_queue.py')]
+        assert timings.counts['directories_scanned'] == 1
+        assert registry.get_stats()['rescans'] == 1
+    finally:
+        registry.close()
+
+
+def test_unwatched_project_is_checked_at_most_once_per_interval(project):
+    registry = MapperRegistry(poll_interval=3600)
+    try:
+        registry.get(project)
+        add_file(project, 'backend/app.py')
+        
+        assert 'app.py' not in registry.get(project).file_map
+        assert registry.get_stats()['rescans'] == 0
+        
+        registry.poll_interval = 0
+        assert 'app.py' in registry.get(project).file_map
+    finally:
+        registry.close()
+
+
+def test_missing_project_is_scanned_once_it_appears(tmp_path):
+    project = str(tmp_path / 'later')
+    registry = MapperRegistry(poll_interval=0)
+    try:
+        assert len(registry.get(project).snapshot().index) == 0
+        add_file(project, 'src/main.py')
+        
+        assert registry.get(project).file_map == {'main.py': 'src/main.py'}
+    finally:
+        registry.close()
@@ -0,0 +1,36 @@
+"""
+Tests for listing directories on a thread pool during full scans
+"""
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """Wide and deep directories, duplicate filenames, and folders the scan must skip"""
+    root = tmp_path / 'tree'
+    paths = ['README.md', 'config.py']
+    for top in range(6):
+        for sub in range(3):
+            base = f"pkg_{top}/sub_{sub}"
+            paths += [f"{base}/config.py", f"{base}/module_{top}_{sub}.py", f"{base}/deep/er/leaf_{top}_{sub}.ts"]
+    paths += ['node_modules/left-pad/index.js', 'pkg_0/__pycache__/config.cpython-311.pyc', 'pkg_1/.hidden.py']
+    for relative in paths:
+        path = root / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return str(root)
+
+
+@pytest.mark.parametrize('workers', [2, 8])
+def test_parallel_scan_matches_serial_scan(tree, workers):
+    serial = FilePathMapper(tree, scan_workers=1)
+    parallel = FilePathMapper(tree, scan_workers=workers)
+    
+    assert parallel.snapshot().directories == serial.snapshot().directories
+    assert parallel.snapshot().index.files_by_directory() == serial.snapshot().index.files_by_directory()
+    assert list(parallel.file_map.items()) == list(serial.file_map.items())
+    assert parallel.resolve_filename('config dot py', limit=50) == serial.resolve_filename('config dot py', limit=50)
+    assert 'node_modules' not in parallel.snapshot().directories
+    assert '.hidden.py' not in parallel.file_map
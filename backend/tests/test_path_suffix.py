@@ -0,0 +1,52 @@
+"""
+Tests for telling apart files that share a name by the directories said before it
+"""
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+
+
+@pytest.fixture
+def mapper(tmp_path):
+    for relative in ('frontend/App.tsx', 'mobile/App.tsx', 'backend/routes/monitoring.py',
+                     'backend/services/monitoring.py', 'backend/config.py', 'tools/config.py', 'build/notes.in'):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('')
+    return FilePathMapper(str(tmp_path))
+
+
+def replace(mapper, text: str):
+    counts = {}
+    ambiguities = []
+    return mapper.replace_filenames_in_text(text, counts, ambiguities), counts, ambiguities
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('check frontend App tsx please', 'check @frontend/App.tsx please'),
+    ('open the routes monitoring dot py file', 'open the @backend/routes/monitoring.py file'),
+    ('open backend services monitoring.py', 'open @backend/services/monitoring.py'),
+    ('and the tools config dot py', 'and the @tools/config.py'),
+])
+def test_directories_said_before_a_shared_name_pick_the_file(mapper, text, expected):
+    replaced, counts, ambiguities = replace(mapper, text)
+    
+    assert replaced == expected
+    assert counts['ambiguous'] == 0 and ambiguities == []
+
+
+def test_extension_without_dot_is_not_taken_from_common_words(mapper):
+    assert replace(mapper, 'put the notes in the build folder')[0] == 'put the notes in the build folder'
+
+
+@pytest.mark.parametrize('text, mention, candidates', [
+    ('edit the config dot py file', 'config dot py', ['@backend/config.py', '@tools/config.py']),
+    ('edit the config.py file', 'config.py', ['@backend/config.py', '@tools/config.py']),
+    ('check App tsx please', 'App tsx', ['@frontend/App.tsx', '@mobile/App.tsx']),
+])
+def test_shared_names_without_directories_are_reported_not_replaced(mapper, text, mention, candidates):
+    replaced, counts, ambiguities = replace(mapper, text)
+    
+    assert replaced == text
+    assert counts['ambiguous'] == 1
+    assert ambiguities == [{'mention': mention, 'candidates': candidates, 'total': 2}]
@@ -0,0 +1,70 @@
+"""
+FilePathMapper.replace_filenames_in_text against the legacy per-filename regex loop
+
+The single-pass matcher must give the legacy output for everything the legacy loop
+handled: written filenames and extensions spelled out after "dot". The one
+documented difference is extensions sharing a prefix (js/json, ts/tsx), where the
+legacy result depended on set iteration order and the matcher takes the longest.
+"""
+import os
+import random
+
+import pytest
+
+from backend.benchmarks.bench_replace import legacy_replace
+from backend.services.file_path_mapper import FilePathMapper
+
+WORDS = ['session', 'manager', 'audio', 'handler', 'config', 'routes', 'monitoring',
+         'health', 'index', 'utils', 'client', 'server', 'model', 'view']
+# No extension here is a prefix of another, so the legacy output does not depend on order
+EXTENSIONS = ['py', 'tsx', 'json', 'html', 'md', 'css']
+FILLER = ['open', 'the', 'file', 'and', 'then', 'update', 'please', 'check', 'in', 'with']
+
+
+def build_tree(root: str, files: int, rng: random.Random):
+    """Create files named like "utils12.py" and "session_manager7.md"; returns the filenames"""
+    filenames = []
+    for index in range(files):
+        directory = os.path.join(root, f"pkg{index % 20}", f"mod{index % 7}")
+        os.makedirs(directory, exist_ok=True)
+        stem = '_'.join(rng.choice(WORDS) for _ in range(1 + index % 2))
+        filename = f"{stem}{index}.{rng.choice(EXTENSIONS)}"
+        open(os.path.join(directory, filename), 'w').close()
+        filenames.append(filename)
+    return filenames
+
+
+def legacy_mention(filename: str, rng: random.Random) -> str:
+    """Mention a file in a form the legacy loop resolved: written, or "<stem> dot <spelled extension>" """
+    stem, extension = filename.rsplit('.', 1)
+    if '_' in stem or rng.random() < 0.5:
+        return filename
+    return f"{stem} dot {' '.join(extension)}"
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_matcher_output_is_identical_to_the_legacy_loop(tmp_path, seed):
+    rng = random.Random(seed)
+    filenames = build_tree(str(tmp_path), 300, rng)
+    mapper = FilePathMapper(str(tmp_path))
+    
+    for _ in range(200):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 20))]
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randrange(len(words)), legacy_mention(rng.choice(filenames), rng))
+        text = ' '.join(words) + '.'
+        
+        assert mapper.replace_filenames_in_text(text) == legacy_replace(mapper.file_map, text), text
+
+
+@pytest.mark.parametrize('short, long', [('js', 'json'), ('ts', 'tsx')])
+def test_prefix_sharing_extensions_take_the_longest(tmp_path, short, long):
+    for filename in (f"data.{short}", f"data.{long}"):
+        (tmp_path / filename).write_text('')
+    mapper = FilePathMapper(str(tmp_path))
+    text = f"open data dot {' '.join(long)} now"
+    
+    assert mapper.replace_filenames_in_text(text) == f"open @data.{long} now"
+    # The legacy loop could rewrite the shorter extension first and strand the rest of the letters
+    stranded = f"open @data.{short} {' '.join(long[len(short):])} now"
+    assert legacy_replace(mapper.file_map, text) in (f"open @data.{long} now", stranded)
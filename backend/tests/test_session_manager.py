@@ -0,0 +1,98 @@
+"""
+Tests for idle session expiry and paginated session listings
+"""
+import time
+from datetime import datetime, timedelta
+
+from backend.services.session_manager import SessionManager
+
+SESSIONS = '/api/v1/monitoring/sessions'
+
+
+def test_idle_sessions_expire():
+    manager = SessionManager({'MONITORING_TIMEOUT': 60})
+    idle = manager.create_session('/projects/idle')
+    busy = manager.create_session('/projects/busy')
+    ended = []
+    manager.on_sessions_ended = ended.extend
+    
+    later = datetime.now() + timedelta(seconds=90)
+    busy.last_activity = later - timedelta(seconds=10)
+    expired = manager.expire_idle_sessions(now=later)
+    
+    assert expired == [idle] and ended == [idle]
+    assert not idle.is_active and idle.end_reason == 'expired'
+    assert busy.is_active
+    assert manager.get_stats()['expired'] == 1
+    assert manager.active_paths() == {'/projects/busy'}
+
+
+def test_reaper_expires_sessions_in_the_background():
+    manager = SessionManager({'MONITORING_TIMEOUT': 1})
+    session = manager.create_session('/projects/idle')
+    manager.start_reaper(interval=0.05)
+    try:
+        deadline = time.monotonic() + 5
+        while session.is_active and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        manager.stop_reaper()
+    
+    assert session.end_reason == 'expired'
+    assert manager.get_stats()['expired'] == 1
+    assert manager.get_current_session() is None
+
+
+def test_expired_session_is_reactivated_on_use():
+    manager = SessionManager({'MONITORING_TIMEOUT': 60})
+    session = manager.create_session('/projects/app')
+    manager.expire_idle_sessions(now=datetime.now() + timedelta(seconds=120))
+    
+    assert manager.resolve_session(session.session_id) is session
+    assert session.is_active and session.end_reason is None
+    assert manager.get_stats()['history'] == 0
+
+
+def test_history_is_bounded():
+    manager = SessionManager({'SESSION_HISTORY_LIMIT': 3})
+    sessions = [manager.create_session(f"/projects/{number}") for number in range(6)]
+    for session in sessions[:5]:
+        manager.end_session(session.session_id)
+    
+    assert manager.get_all_sessions() == sessions[2:]
+    assert manager.get_stats()['history'] == 3
+
+
+def test_list_sessions_pages_newest_first():
+    manager = SessionManager({})
+    sessions = [manager.create_session(f"/projects/{number}") for number in range(7)]
+    manager.end_session(sessions[5].session_id)
+    
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = manager.list_sessions(limit=3, before=cursor)
+        pages.append(page)
+        if cursor is None:
+            break
+    
+    assert pages == [sessions[6:3:-1], sessions[3:0:-1], sessions[:1]]
+    active, cursor = manager.list_sessions(limit=10, active_only=True)
+    assert active == sessions[6:5:-1] + sessions[4::-1] and cursor is None
+
+
+def test_sessions_route_follows_cursor(make_app, project, start_session):
+    client = make_app().test_client()
+    started = [start_session(client, project) for _ in range(5)]
+    
+    seen = []
+    url = f"{SESSIONS}?limit=2"
+    while url:
+        body = client.get(url).get_json()
+        assert body['total'] == 5
+        seen.extend(session['session_id'] for session in body['sessions'])
+        url = f"{SESSIONS}?limit=2&cursor={body['next_cursor']}" if body['next_cursor'] else None
+    
+    assert seen == started[::-1]
+    assert client.get(f"{SESSIONS}?cursor=abc").status_code == 400
+    assert client.get(f"{SESSIONS}?limit=0").status_code == 400
@@ -0,0 +1,44 @@
+"""
+Tests for matching spoken filenames through the phonetic token trie (SpokenNameIndex)
+"""
+import pytest
+
+from backend.services.file_path_mapper import FilePathMapper
+from backend.services.spoken_names import DOT, phonetic_key, tokenize
+
+
+@pytest.fixture
+def mapper(project):
+    return FilePathMapper(project)
+
+
+def test_tokenize_splits_names_and_dots():
+    assert [token.text for token in tokenize('SessionManager.py')] == ['session', 'manager', DOT, 'py']
+    assert [token.text for token in tokenize('session_manager dot p y')] == ['session', 'manager', DOT, 'p', 'y']
+    assert [token.spoken_dot for token in tokenize('app.py dot')] == [False, False, False, True]
+
+
+def test_phonetic_key_merges_near_homophones():
+    assert phonetic_key('manger') == phonetic_key('manager')
+    assert phonetic_key('sesion') == phonetic_key('session')
+    assert phonetic_key('sun') != phonetic_key('session')
+
+
+@pytest.mark.parametrize('spoken', [
+    'session manger dot p y',
+    'session manager dot py',
+    'session manager dot pie',
+    'SessionManager.py',
+    'session_manager.py',
+])
+def test_spoken_forms_reach_the_file(mapper, spoken):
+    assert mapper.replace_filenames_in_text(f"open {spoken} now") == 'open @backend/services/session_manager.py now'
+
+
+@pytest.mark.parametrize('spoken', [
+    'sun manager dot py',  # "sun" is not heard as "session"
+    'sesion manger dot py',  # No word of the name heard exactly
+    'konfig dot py',  # A single-word name must be heard exactly
+])
+def test_names_heard_too_loosely_are_left_alone(mapper, spoken):
+    assert '@' not in mapper.replace_filenames_in_text(f"open {spoken} now")
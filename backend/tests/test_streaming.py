@@ -0,0 +1,94 @@
+"""
+Tests for the live transcription WebSocket against the local fake streaming backend
+
+The fake backend treats each binary chunk as UTF-8 text, so a test can "speak" by
+sending words. The app is served by Werkzeug on a free port because the Flask
+test client does not speak WebSocket.
+"""
+import json
+import threading
+
+import pytest
+
+simple_websocket = pytest.importorskip('simple_websocket')  # flask-sock's dependency
+from werkzeug.serving import make_server  # noqa: E402
+
+
+@pytest.fixture
+def serve():
+    """Serve an app on a free local port; returns the ws:// base URL"""
+    servers = []
+    
+    def start(app) -> str:
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"ws://127.0.0.1:{server.server_port}"
+    
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+def close(ws):
+    """Close a client connection the server may already have closed"""
+    try:
+        ws.close()
+    except simple_websocket.ConnectionClosed:
+        pass
+
+
+def receive_until_done(ws, timeout: float = 10.0):
+    messages = []
+    while True:
+        message = ws.receive(timeout=timeout)
+        assert message is not None, f"no message within {timeout}s; got {messages}"
+        messages.append(json.loads(message))
+        if messages[-1]['type'] in ('done', 'error'):
+            return messages
+
+
+def test_stream_sends_interims_and_replaced_finals(make_app, project, start_session, serve):
+    app = make_app(STREAMING_STT_BACKEND='fake')
+    session_id = start_session(app.test_client(), project)
+    base_url = serve(app)
+    
+    ws = simple_websocket.Client.connect(f"{base_url}/api/v1/monitoring/stream?session_id={session_id}")
+    try:
+        assert json.loads(ws.receive(timeout=10)) == {'type': 'ready', 'model': 'fake'}
+        for chunk in ('Open the session ', 'manager dot py file. ', 'Then check ', 'config dot py.'):
+            ws.send(chunk.encode())
+        ws.send(json.dumps({'type': 'stop'}))
+        messages = receive_until_done(ws)
+    finally:
+        close(ws)
+    
+    interims = [message['text'] for message in messages if message['type'] == 'interim']
+    finals = [message for message in messages if message['type'] == 'final']
+    done = messages[-1]
+    
+    assert 'Open the session' in interims
+    assert 'Then check' in interims
+    assert [final['original_text'] for final in finals] == [
+        'Open the session manager dot py file.', 'Then check config dot py.']
+    assert [final['text'] for final in finals] == [
+        'Open the @backend/services/session_manager.py file.', 'Then check @backend/config.py.']
+    assert all(final['file_replacements_applied'] for final in finals)
+    
+    assert done['type'] == 'done'
+    assert done['transcription'] == (
+        'Open the @backend/services/session_manager.py file. Then check @backend/config.py.')
+    assert done['original_transcript'] == 'Open the session manager dot py file. Then check config dot py.'
+    assert done['file_replacements_applied'] is True
+
+
+def test_stream_rejects_unknown_session(make_app, serve):
+    base_url = serve(make_app(STREAMING_STT_BACKEND='fake'))
+    
+    ws = simple_websocket.Client.connect(f"{base_url}/api/v1/monitoring/stream?session_id=missing")
+    try:
+        message = json.loads(ws.receive(timeout=10))
+    finally:
+        close(ws)
+    
+    assert message == {'type': 'error', 'error': 'Session missing not found'}
@@ -0,0 +1,40 @@
+"""
+Tests for per-stage timings of POST /transcribe (?timings=1)
+"""
+import io
+
+from backend.services.metrics import StageTimings
+
+TRANSCRIBE = '/api/v1/monitoring/transcribe'
+
+
+def test_each_stage_is_entered_once(make_app, project, start_session, monkeypatch):
+    client = make_app().test_client()
+    session_id = start_session(client, project)
+    entered = []
+    original_stage = StageTimings.stage
+    
+    def counting_stage(self, name):
+        entered.append(name)
+        return original_stage(self, name)
+    
+    monkeypatch.setattr(StageTimings, 'stage', counting_stage)
+    response = client.post(f"{TRANSCRIBE}?timings=1", headers={'X-Session-ID': session_id},
+                           data={'audio': (io.BytesIO(b'fake audio'), 'clip.webm')}, content_type='multipart/form-data')
+    
+    assert response.status_code == 200
+    assert sorted(entered) == sorted(set(entered))
+    stages = response.get_json()['timings']['stages_ms']
+    assert {'upload_read', 'preprocess', 'stt', 'replace', 'total'} <= set(stages)
+    assert stages['upload_read'] <= stages['total']
+
+
+def test_missing_audio_is_rejected(make_app):
+    client = make_app().test_client()
+    
+    missing = client.post(TRANSCRIBE, data={'other': 'field'}, content_type='multipart/form-data')
+    unnamed = client.post(TRANSCRIBE, data={'audio': (io.BytesIO(b'fake audio'), '')},
+                          content_type='multipart/form-data')
+    
+    assert missing.status_code == 400 and missing.get_json()['error'] == 'No audio file provided'
+    assert unnamed.status_code == 400 and unnamed.get_json()['error'] == 'No audio file selected'
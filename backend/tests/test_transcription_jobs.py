@@ -0,0 +1,97 @@
+"""
+Tests for background transcription jobs (POST /transcribe?mode=job) on the local STT provider
+"""
+import io
+import json
+import time
+
+TRANSCRIBE = '/api/v1/monitoring/transcribe'
+
+
+def upload(client, session_id: str, audio: bytes = b'fake audio', mode: str = 'job'):
+    return client.post(f"{TRANSCRIBE}?mode={mode}", headers={'X-Session-ID': session_id},
+                       data={'audio': (io.BytesIO(audio), 'clip.webm')}, content_type='multipart/form-data')
+
+
+def poll_until_finished(client, status_url: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = client.get(status_url).get_json()
+        if body['status'] in ('succeeded', 'failed'):
+            return body
+        time.sleep(0.02)
+    raise AssertionError(f"Job at {status_url} did not finish within {timeout}s")
+
+
+def test_submit_returns_202_with_location(make_app, project, start_session):
+    client = make_app().test_client()
+    session_id = start_session(client, project)
+    
+    response = upload(client, session_id)
+    
+    assert response.status_code == 202
+    body = response.get_json()
+    assert response.headers['Location'].endswith(body['status_url'])
+    assert body['status_url'] == f"{TRANSCRIBE}/{body['job_id']}"
+    assert body['events_url'] == f"{TRANSCRIBE}/{body['job_id']}/events"
+    assert body['status'] in ('queued', 'running', 'succeeded')
+
+
+def test_polling_reaches_done_with_paths_replaced(make_app, project, start_session):
+    client = make_app().test_client()
+    session_id = start_session(client, project)
+    
+    submitted = upload(client, session_id).get_json()
+    body = poll_until_finished(client, submitted['status_url'])
+    
+    assert body['status'] == 'succeeded'
+    assert body['error'] is None
+    assert body['result']['transcription'] == (
+        'Open the @backend/services/session_manager.py file and check the @backend/config.py settings.')
+    assert body['result']['file_replacements_applied'] is True
+
+
+def test_event_stream_delivers_result(make_app, project, start_session):
+    client = make_app(LOCAL_STT_LATENCY_MS=100).test_client()
+    session_id = start_session(client, project)
+    
+    submitted = upload(client, session_id).get_json()
+    response = client.get(submitted['events_url'])
+    
+    assert response.status_code == 200
+    assert response.mimetype == 'text/event-stream'
+    events = []
+    for block in response.get_data(as_text=True).split('\n\n'):
+        lines = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':'))
+        if 'event' in lines:
+            events.append((lines['event'], json.loads(lines['data'])))
+    
+    assert events, 'no events were streamed'
+    assert all(name == 'status' for name, _ in events[:-1])
+    name, data = events[-1]
+    assert name == 'result'
+    assert data['job_id'] == submitted['job_id']
+    assert data['status'] == 'succeeded'
+    assert '@backend/services/session_manager.py' in data['result']['transcription']
+
+
+def test_full_queue_returns_503_with_retry_after(make_app, project, start_session):
+    app = make_app(
+        LOCAL_STT_LATENCY_MS=1000,
+        TRANSCRIBE_MAX_CONCURRENCY=1,
+        TRANSCRIBE_QUEUE_DEPTH=1,
+        MAX_INFLIGHT_TRANSCRIPTIONS=0  # Let the job queue, not admission control, do the refusing
+    )
+    client = app.test_client()
+    session_id = start_session(client, project)
+    
+    # One job runs and one waits; the worker may not have taken the first yet, so send a spare
+    responses = [upload(client, session_id, audio=f"clip {index}".encode()) for index in range(4)]
+    
+    assert responses[0].status_code == 202
+    refused = [response for response in responses if response.status_code == 503]
+    assert refused, [response.status_code for response in responses]
+    for response in refused:
+        assert int(response.headers['Retry-After']) >= 1
+        assert 'error' in response.get_json()
+    assert all(response.status_code in (202, 503) for response in responses)
@@ -0,0 +1,244 @@
+"""
+Tests for UpstreamClient against a scripted local stub of the STT API
+
+Each test queues the stub's replies (status, delay, headers) in order, so retries
+and hedges can be driven deterministically without network access.
+"""
+import io
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.services.stt_providers import DeepgramProvider
+from backend.services.upstream_http import UpstreamClient, UpstreamPolicy, UpstreamTimeout
+
+STUB_BODY = b'{"results": {"channels": [{"alternatives": [{"transcript": "ok", "confidence": 1.0}]}]}}'
+
+
+class StubUpstream:
+    """Keep-alive HTTP/1.1 server answering POSTs from a queue of scripted replies"""
+    
+    def __init__(self, latency: float = 0.005):
+        self.latency = latency  # Delay of replies not scripted
+        self.replies = []  # (status, delay, headers) for the next requests, in order
+        self.connections = 0
+        self.requests = 0
+        self.headers = []  # Headers of each request received
+        self._lock = threading.Lock()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+            
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub._lock:
+                    stub.headers.append(dict(self.headers))
+                status, delay, headers = stub._next_reply()
+                time.sleep(delay)
+                body = STUB_BODY if status == 200 else b'{"err_msg": "stub"}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            
+            def handle_error(self, request, client_address):
+                pass  # Aborted attempts hang up mid-reply
+        
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def script(self, *replies):
+        """Queue replies as (status, delay) or (status, delay, headers)"""
+        with self._lock:
+            self.replies.extend((reply + ({},))[:3] for reply in replies)
+    
+    def _next_reply(self):
+        with self._lock:
+            self.requests += 1
+            if self.replies:
+                return self.replies.pop(0)
+        return 200, self.latency, {}
+    
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubUpstream()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_client(stub):
+    clients = []
+    
+    def make(**policy) -> UpstreamClient:
+        client = UpstreamClient(stub.url, UpstreamPolicy(**policy))
+        clients.append(client)
+        return client
+    
+    yield make
+    for client in clients:
+        client.close()
+
+
+def wait_until_settled(records, timeout: float = 5.0):
+    """Wait for attempts still running on worker threads (e.g. aborted losers) to record their outcome"""
+    deadline = time.monotonic() + timeout
+    while any(record['outcome'] == 'pending' for record in records):
+        assert time.monotonic() < deadline, records
+        time.sleep(0.01)
+
+
+def test_sequential_requests_reuse_one_connection(stub, make_client):
+    client = make_client()
+    
+    for _ in range(5):
+        response = client.request('POST', '/v1/listen', body=b'audio')
+        assert response.status == 200
+        assert response.body == STUB_BODY
+    
+    assert stub.connections == 1
+    assert client.get_stats()['connections'] == {'idle': 1, 'opened': 1, 'reused': 4}
+
+
+def test_retries_503_until_success(stub, make_client):
+    client = make_client(backoff_base=0.01)
+    stub.script((503, 0), (503, 0))
+    
+    response = client.request('POST', '/v1/listen', body=b'audio')
+    
+    assert response.status == 200
+    assert [attempt['status'] for attempt in response.attempts] == [503, 503, 200]
+    assert [attempt['hedge'] for attempt in response.attempts] == [False, False, False]
+    stats = client.get_stats()
+    assert (stats['attempts'], stats['retries'], stats['failures']) == (3, 2, 0)
+
+
+def test_retry_after_past_the_deadline_fails_fast(stub, make_client):
+    client = make_client(total_timeout=1.0, backoff_base=0.01)
+    stub.script((503, 0, {'Retry-After': '5'}))
+    
+    start = time.monotonic()
+    with pytest.raises(UpstreamTimeout) as raised:
+        client.request('POST', '/v1/listen', body=b'audio')
+    
+    assert time.monotonic() - start < 0.5  # Not worth waiting 5s that the deadline does not have
+    assert [attempt['status'] for attempt in raised.value.attempts] == [503]
+    assert stub.requests == 1
+
+
+def test_retries_stop_at_the_total_deadline(stub, make_client):
+    client = make_client(total_timeout=0.5, attempt_timeout=10.0, max_retries=5, backoff_base=0.01)
+    stub.script((503, 0), (200, 3.0))
+    
+    start = time.monotonic()
+    with pytest.raises(UpstreamTimeout) as raised:
+        client.request('POST', '/v1/listen', body=b'audio')
+    elapsed = time.monotonic() - start
+    
+    assert 0.5 <= elapsed < 1.0
+    attempts = raised.value.attempts
+    wait_until_settled(attempts)
+    assert [attempt['status'] for attempt in attempts] == [503, None]
+    assert attempts[1]['outcome'] == 'timeout'  # The retry's own deadline is capped by the request's
+    assert client.get_stats()['timeouts'] == 1
+
+
+def test_hedge_fires_after_p95_and_aborts_the_loser(stub, make_client):
+    client = make_client(hedge_adaptive=True)
+    for _ in range(25):  # Enough samples for the adaptive threshold
+        client.request('POST', '/v1/listen', body=b'audio')
+    before = client.get_stats()  # Warm-ups slower than p95 may have hedged already
+    threshold_ms = before['latency_p95_ms']
+    assert threshold_ms is not None
+    
+    stub.script((200, 2.0))  # The first attempt is stuck in the slow tail; the hedge gets a normal reply
+    start = time.monotonic()
+    response = client.request('POST', '/v1/listen', body=b'audio')
+    elapsed = time.monotonic() - start
+    
+    assert response.status == 200
+    assert elapsed < 1.0
+    first, hedge = response.attempts
+    assert (first['hedge'], hedge['hedge']) == (False, True)
+    assert hedge['started_ms'] >= threshold_ms - 0.01  # Both are rounded to 0.01 ms
+    assert hedge['outcome'] == 'ok'
+    wait_until_settled(response.attempts)
+    assert first['outcome'] == 'cancelled'
+    stats = client.get_stats()
+    assert stats['hedges'] - before['hedges'] == 1
+    assert stats['hedge_wins'] - before['hedge_wins'] == 1
+
+
+def test_file_bodies_are_never_hedged(stub, make_client):
+    client = make_client(hedge_after=0.02)
+    
+    # Bytes bodies are hedged under this policy...
+    stub.script((200, 0.3))
+    assert len(client.request('POST', '/v1/listen', body=b'audio').attempts) == 2
+    
+    # ...but a file body is only sent once at a time
+    stub.script((200, 0.3))
+    with tempfile.TemporaryFile() as body:
+        body.write(b'audio' * 1000)
+        response = client.request('POST', '/v1/listen', body=body)
+    
+    assert response.status == 200
+    assert [attempt['hedge'] for attempt in response.attempts] == [False]
+    assert client.get_stats()['hedges'] == 1
+
+
+def test_deepgram_provider_sends_the_audio_content_type(stub):
+    provider = DeepgramProvider(api_key='test-key', base_url=stub.url)
+    try:
+        assert provider.transcribe(b'audio') == ('ok', 1.0)
+        provider.transcribe(b'audio', content_type='audio/wav')
+    finally:
+        provider.close()
+    
+    assert [headers['Content-Type'] for headers in stub.headers] == ['audio/webm', 'audio/wav']
+    assert stub.headers[0]['Authorization'] == 'Token test-key'
+
+
+@pytest.mark.parametrize('filename, declared, expected', [
+    ('clip.webm', 'audio/webm;codecs=opus', 'audio/webm'),
+    ('clip.wav', 'application/octet-stream', 'audio/wav'),
+    ('clip.ogg', 'application/octet-stream', 'audio/ogg'),
+    ('recording', None, 'audio/webm')
+])
+def test_transcribe_route_forwards_the_upload_type(stub, make_app, project, start_session, monkeypatch,
+                                                   filename, declared, expected):
+    monkeypatch.setenv('DEEPGRAM_API_KEY', 'test-key')
+    client = make_app(STT_PROVIDER='deepgram', DEEPGRAM_API_URL=stub.url).test_client()
+    session_id = start_session(client, project)
+    
+    audio = (io.BytesIO(b'audio'), filename, declared) if declared else (io.BytesIO(b'audio'), filename)
+    response = client.post('/api/v1/monitoring/transcribe', headers={'X-Session-ID': session_id},
+                           data={'audio': audio}, content_type='multipart/form-data')
+    
+    assert response.status_code == 200, response.get_json()
+    assert stub.headers[-1]['Content-Type'] == expected
@@ -0,0 +1,16 @@
+"""
+WSGI entry point for production servers
+
+    gunicorn -c backend/gunicorn.conf.py backend.wsgi:app
+
+The app is built with background threads deferred, so it can be loaded once in
+the server's parent process (preload) and forked: the STT client, caches and the
+indexes of PRELOAD_PROJECTS are then shared copy-on-write by every worker. Each
+worker starts its own session reaper and folder watchers.
+"""
+import os
+
+from .app import create_app, preload_projects
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'), start_background=False)
+preload_projects(app, app.config['PRELOAD_PROJECTS'])
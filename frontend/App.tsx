@@ -1,21 +1,63 @@
 import React, { useState, useEffect } from 'react';
 import { useAudioRecorder } from './hooks/useAudioRecorder';
+import { useLiveTranscription } from './hooks/useLiveTranscription';
 import RecorderButton from './components/RecorderButton';
 import TextCard from './components/TextCard';
 
+// Live transcription stream; recordings fall back to a single upload if it is unavailable
+const STREAM_URL = 'ws://localhost:5000/api/v1/monitoring/stream';
+
+// Identifies this client's session (and so its project) to the backend
+const SESSION_HEADER = 'X-Session-ID';
+
+// How often MediaRecorder hands a chunk to the live stream
+const STREAM_TIMESLICE_MS = 250;
+
+// Retries of an upload the backend turned away as busy (429/503), and the backoff between them
+const MAX_UPLOAD_RETRIES = 4;
+const RETRY_BASE_DELAY_MS = 500;
+const RETRY_MAX_DELAY_MS = 30000;
+
+const sleep = (ms: number) => new Promise<void>(resolve => setTimeout(resolve, ms));
+
+// Delay before retry number `attempt` (0-based): the server's Retry-After if it sent one,
+// else exponential backoff; jittered so clients refused together don't return together
+const retryDelayMs = (response: Response, attempt: number): number => {
+    const retryAfter = Number(response.headers.get('Retry-After'));
+    const base = Number.isFinite(retryAfter) && retryAfter > 0
+        ? retryAfter * 1000
+        : RETRY_BASE_DELAY_MS * 2 ** attempt;
+    return Math.min(RETRY_MAX_DELAY_MS, base) * (1 + Math.random() * 0.5);
+};
+
+// fetch() that retries while the backend is busy; `makeInit` builds a fresh request body per attempt
+const fetchWithBackoff = async (url: string, makeInit: () => RequestInit): Promise<Response> => {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(url, makeInit());
+        if ((response.status !== 429 && response.status !== 503) || attempt >= MAX_UPLOAD_RETRIES) {
+            return response;
+        }
+        const delay = retryDelayMs(response, attempt);
+        console.warn(`Backend busy (${response.status}); retrying in ${Math.round(delay)} ms`);
+        await sleep(delay);
+    }
+};
+
 // Function to send audio to backend and receive transcription
-const sendAudioToBackend = async (audioBlob: Blob): Promise<string> => {
+const sendAudioToBackend = async (audioBlob: Blob, sessionId: string | null): Promise<string> => {
     console.log(`Sending audio of size ${audioBlob.size} bytes to backend.`);
     
     try {
-        // Create FormData to send the audio file
-        const formData = new FormData();
-        formData.append('audio', audioBlob, 'recording.webm');
-        
-        // Send to backend transcribe endpoint
-        const response = await fetch('http://localhost:5000/api/v1/monitoring/transcribe', {
-            method: 'POST',
-            body: formData,
+        // Send to backend transcribe endpoint, backing off while it is busy
+        const response = await fetchWithBackoff('http://localhost:5000/api/v1/monitoring/transcribe', () => {
+            // Create FormData to send the audio file
+            const formData = new FormData();
+            formData.append('audio', audioBlob, 'recording.webm');
+            return {
+                method: 'POST',
+                headers: sessionId ? { [SESSION_HEADER]: sessionId } : undefined,
+                body: formData,
+            };
         });
         
         if (!response.ok) {
@@ -35,7 +77,7 @@ const sendAudioToBackend = async (audioBlob: Blob): Promise<string> => {
 };
 
 // Function to send project path to backend
-const sendPathToBackend = async (path: string): Promise<void> => {
+const sendPathToBackend = async (path: string, sessionId: string | null): Promise<string> => {
     console.log(`Sending project context to backend: '${path}'`);
     
     try {
@@ -43,6 +85,8 @@ const sendPathToBackend = async (path: string): Promise<void> => {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
+                // Ends this client's previous session only, not other clients'
+                ...(sessionId ? { [SESSION_HEADER]: sessionId } : {}),
             },
             body: JSON.stringify({
                 projectContext: path
@@ -56,6 +100,7 @@ const sendPathToBackend = async (path: string): Promise<void> => {
         
         const data = await response.json();
         console.log('Project context set successfully:', data);
+        return data.session_id;
         
     } catch (error) {
         console.error('Error sending project path to backend:', error);
@@ -71,8 +116,13 @@ const App: React.FC = () => {
     const [isProcessing, setIsProcessing] = useState(false);
     const [appError, setAppError] = useState<string | null>(null);
     const [isErrorVisible, setIsErrorVisible] = useState(true);
+    const [sessionId, setSessionId] = useState<string | null>(null);
     
-    const { isRecording, audioBlob, startRecording, stopRecording, error: recorderError } = useAudioRecorder();
+    const live = useLiveTranscription(sessionId ? `${STREAM_URL}?session_id=${encodeURIComponent(sessionId)}` : STREAM_URL);
+    const { isRecording, audioBlob, startRecording, stopRecording, error: recorderError } = useAudioRecorder({
+        timeslice: STREAM_TIMESLICE_MS,
+        onChunk: live.sendChunk,
+    });
 
     const handleError = (errorMessage: string) => {
         setAppError(errorMessage);
@@ -93,7 +143,7 @@ const App: React.FC = () => {
         setIsProcessing(true);
         
         try {
-            await sendPathToBackend(projectPath);
+            setSessionId(await sendPathToBackend(projectPath, sessionId));
             setPathSubmitted(true);
         } catch (error) {
             handleError(error instanceof Error ? error.message : 'Failed to set project context');
@@ -102,13 +152,29 @@ const App: React.FC = () => {
         }
     };
 
+    const handleStartRecording = async () => {
+        // Open the stream first so the chunk carrying the WebM header is not lost
+        await live.open();
+        startRecording();
+    };
+
     useEffect(() => {
         if (audioBlob) {
             const processAudio = async () => {
                 setIsProcessing(true);
                 setAppError(null);
                 try {
-                    const newText = await sendAudioToBackend(audioBlob);
+                    let newText: string;
+                    if (live.isOpen()) {
+                        try {
+                            newText = await live.finish();
+                        } catch (streamError) {
+                            console.warn('Live transcription failed, uploading recording instead:', streamError);
+                            newText = await sendAudioToBackend(audioBlob, sessionId);
+                        }
+                    } else {
+                        newText = await sendAudioToBackend(audioBlob, sessionId);
+                    }
                     setLatestTranscription(newText);
                 } catch (error) {
                     handleError(error instanceof Error ? error.message : 'Failed to transcribe audio');
@@ -235,7 +301,11 @@ const App: React.FC = () => {
                 className="w-full flex-grow flex flex-col items-center justify-center overflow-y-auto relative px-4 pb-4 animate-fade-in-up"
                 style={{ animationDelay: '300ms' }}
             >
-                {latestTranscription ? (
+                {isRecording && live.interimText ? (
+                    <div className="text-center text-slate-400 max-w-2xl">
+                        <p>{live.interimText}</p>
+                    </div>
+                ) : latestTranscription ? (
                     <TextCard key={latestTranscription} text={latestTranscription} />
                 ) : (
                     <div className="text-center text-slate-500">
@@ -260,7 +330,7 @@ const App: React.FC = () => {
                 <RecorderButton
                     isRecording={isRecording}
                     isProcessing={isProcessing}
-                    startRecording={startRecording}
+                    startRecording={handleStartRecording}
                     stopRecording={stopRecording}
                 />
             </div>
@@ -1,6 +1,24 @@
 
 import { useState, useRef, useCallback } from 'react';
 
+export interface AudioRecorderOptions {
+  // Emit a chunk every `timeslice` ms while recording instead of only at stop
+  timeslice?: number;
+  onChunk?: (chunk: Blob) => void;
+}
+
+// Speech only needs one channel at 16 kHz; the browser's DSP removes noise and echo
+// before encoding, and Opus at a low bitrate keeps uploads small.
+const SPEECH_CONSTRAINTS: MediaTrackConstraints = {
+  channelCount: 1,
+  sampleRate: 16000,
+  echoCancellation: true,
+  noiseSuppression: true,
+  autoGainControl: true,
+};
+const SPEECH_MIME_TYPE = 'audio/webm;codecs=opus';
+const SPEECH_BITS_PER_SECOND = 24000;
+
 export interface AudioRecorderState {
   isRecording: boolean;
   audioBlob: Blob | null;
@@ -9,25 +27,34 @@ export interface AudioRecorderState {
   error: string | null;
 }
 
-export const useAudioRecorder = (): AudioRecorderState => {
+export const useAudioRecorder = (options: AudioRecorderOptions = {}): AudioRecorderState => {
+  const { timeslice, onChunk } = options;
   const [isRecording, setIsRecording] = useState(false);
   const [audioBlob, setAudioBlob] = useState<Blob | null>(null);
   const [error, setError] = useState<string | null>(null);
 
   const mediaRecorderRef = useRef<MediaRecorder | null>(null);
   const audioChunksRef = useRef<Blob[]>([]);
+  const onChunkRef = useRef(onChunk);
+  onChunkRef.current = onChunk;
 
   const startRecording = useCallback(async () => {
     setError(null);
     setAudioBlob(null);
     if (navigator.mediaDevices && navigator.mediaDevices.getUserMedia) {
       try {
-        const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
-        mediaRecorderRef.current = new MediaRecorder(stream);
+        const stream = await navigator.mediaDevices.getUserMedia({ audio: SPEECH_CONSTRAINTS });
+        mediaRecorderRef.current = new MediaRecorder(stream, {
+          mimeType: MediaRecorder.isTypeSupported(SPEECH_MIME_TYPE) ? SPEECH_MIME_TYPE : undefined,
+          audioBitsPerSecond: SPEECH_BITS_PER_SECOND,
+        });
         audioChunksRef.current = [];
 
         mediaRecorderRef.current.ondataavailable = (event) => {
           audioChunksRef.current.push(event.data);
+          if (event.data.size > 0) {
+            onChunkRef.current?.(event.data);
+          }
         };
 
         mediaRecorderRef.current.onstop = () => {
@@ -36,7 +63,7 @@ export const useAudioRecorder = (): AudioRecorderState => {
           stream.getTracks().forEach(track => track.stop()); // Stop the microphone access
         };
 
-        mediaRecorderRef.current.start();
+        mediaRecorderRef.current.start(timeslice);
         setIsRecording(true);
       } catch (err) {
         console.error("Error accessing microphone:", err);
@@ -45,7 +72,7 @@ export const useAudioRecorder = (): AudioRecorderState => {
     } else {
         setError("Audio recording is not supported by this browser.");
     }
-  }, []);
+  }, [timeslice]);
 
   const stopRecording = useCallback(() => {
     if (mediaRecorderRef.current && mediaRecorderRef.current.state === 'recording') {
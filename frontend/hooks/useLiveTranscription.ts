@@ -0,0 +1,115 @@
+import { useState, useRef, useCallback } from 'react';
+
+interface StreamMessage {
+  type: 'ready' | 'interim' | 'final' | 'done' | 'error';
+  text?: string;
+  transcription?: string;
+  error?: string;
+}
+
+export interface LiveTranscriptionState {
+  interimText: string;
+  open: () => Promise<boolean>;
+  sendChunk: (chunk: Blob) => void;
+  finish: () => Promise<string>;
+  isOpen: () => boolean;
+}
+
+// How long to wait for the server to accept the stream before falling back to upload
+const CONNECT_TIMEOUT_MS = 3000;
+
+export const useLiveTranscription = (url: string): LiveTranscriptionState => {
+  const [interimText, setInterimText] = useState('');
+  const socketRef = useRef<WebSocket | null>(null);
+  const finalsRef = useRef<string[]>([]);
+  const doneRef = useRef<{ resolve: (text: string) => void; reject: (error: Error) => void } | null>(null);
+
+  const open = useCallback((): Promise<boolean> => {
+    setInterimText('');
+    finalsRef.current = [];
+    socketRef.current?.close(); // e.g. left open when microphone access was denied
+
+    return new Promise((resolve) => {
+      let socket: WebSocket;
+      try {
+        socket = new WebSocket(url);
+      } catch (err) {
+        console.warn('Live transcription unavailable:', err);
+        resolve(false);
+        return;
+      }
+      socketRef.current = socket;
+
+      const timer = setTimeout(() => {
+        socket.close();
+        socketRef.current = null;
+        resolve(false);
+      }, CONNECT_TIMEOUT_MS);
+
+      socket.onmessage = (event) => {
+        const message: StreamMessage = JSON.parse(event.data);
+        switch (message.type) {
+          case 'ready':
+            clearTimeout(timer);
+            resolve(true);
+            break;
+          case 'interim':
+            setInterimText([...finalsRef.current, message.text ?? ''].join(' '));
+            break;
+          case 'final':
+            finalsRef.current.push(message.text ?? '');
+            setInterimText(finalsRef.current.join(' '));
+            break;
+          case 'done':
+            doneRef.current?.resolve(message.transcription ?? finalsRef.current.join(' '));
+            doneRef.current = null;
+            socket.close();
+            break;
+          case 'error':
+            clearTimeout(timer);
+            doneRef.current?.reject(new Error(message.error || 'Live transcription failed'));
+            doneRef.current = null;
+            resolve(false);
+            break;
+        }
+      };
+
+      socket.onerror = () => {
+        clearTimeout(timer);
+        resolve(false);
+      };
+
+      socket.onclose = () => {
+        clearTimeout(timer);
+        if (socketRef.current === socket) {
+          socketRef.current = null;
+        }
+        doneRef.current?.reject(new Error('Live transcription connection closed'));
+        doneRef.current = null;
+        resolve(false);
+      };
+    });
+  }, [url]);
+
+  const sendChunk = useCallback((chunk: Blob) => {
+    const socket = socketRef.current;
+    if (socket && socket.readyState === WebSocket.OPEN) {
+      socket.send(chunk);
+    }
+  }, []);
+
+  const finish = useCallback((): Promise<string> => {
+    const socket = socketRef.current;
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+      return Promise.reject(new Error('Live transcription is not connected'));
+    }
+    return new Promise((resolve, reject) => {
+      doneRef.current = { resolve, reject };
+      socket.send(JSON.stringify({ type: 'stop' }));
+    });
+  }, []);
+
+  const isOpen = useCallback(() => socketRef.current?.readyState === WebSocket.OPEN, []);
+
+  return { interimText, open, sendChunk, finish, isOpen };
+};